@@ -0,0 +1,433 @@
+"""
+백엔드 엔드포인트 벤치마크
+
+합성 PDF(benchmarks/synthetic.py)로 각 엔드포인트의 지연 시간 백분위수, 처리량, 최대 메모리(RSS)를
+측정하고 결과를 JSON으로 저장합니다. backend 디렉토리에서 실행합니다.
+
+    # FastAPI 앱을 같은 프로세스에서 실행 (TestClient)
+    python -m benchmarks.run_benchmarks --pages 10,200 --content text,image,cjk --iterations 5
+
+    # 실제 서버(python -m pdf_processor)를 띄워 HTTP로 측정, 또는 --url로 실행 중인 서버 지정
+    python -m benchmarks.run_benchmarks --mode http --concurrency 4
+
+    # 이전 커밋의 결과와 비교 (지연 시간/처리량이 --threshold % 넘게 나빠지면 표시)
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/baseline.json
+    python -m benchmarks.run_benchmarks --compare old.json --input new.json --fail-on-regression
+
+- 결과 캐시는 끄고 측정하며(같은 요청을 반복하므로), 측정 전에 서버 예열(/health의 warm)을 기다립니다.
+- 최대 RSS는 서버 프로세스와 워커 프로세스의 합입니다 (psutil이 있으면 사용, 없으면 Linux의 /proc).
+- /convert-from-pdf는 poppler가 필요하며, 실패한 요청은 결과의 status_codes에 기록됩니다.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks import synthetic
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+ENDPOINTS = (
+    "merge", "split", "rotate", "add-watermark", "encrypt", "decrypt",
+    "edit", "convert-to-pdf", "convert-from-pdf",
+)
+PASSWORD = "benchmark"
+
+# 반복 요청이 캐시에서 처리되지 않도록 결과 캐시를 끕니다
+BENCHMARK_ENV = {"PDF_PROCESSOR_RESULT_CACHE_BYTES": "0"}
+
+
+# --- 메모리 측정 ---
+
+def _process_tree_rss(pid: int) -> Optional[int]:
+    """프로세스와 모든 자식 프로세스의 RSS 합(바이트)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for p in processes:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    if not Path("/proc").exists():
+        return None
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+            match = re.search(r"^VmRSS:\s+(\d+) kB", status, re.MULTILINE)
+            total += int(match.group(1)) * 1024 if match else 0
+            for task in Path(f"/proc/{current}/task").iterdir():
+                stack += [int(child) for child in (task / "children").read_text().split()]
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class RssSampler:
+    """측정하는 동안 일정 간격으로 RSS를 읽어 최댓값을 기록"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = _process_tree_rss(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if self.pid is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+# --- 클라이언트 ---
+
+def _wait_until_warm(get_health: Callable[[], dict], timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            health = get_health()
+            if health.get("warm") or health.get("warmup", {}).get("state") in ("failed", "idle"):
+                return health
+        except Exception:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("서버 예열이 끝나지 않았습니다")
+
+
+class InProcessClient:
+    """FastAPI 앱을 현재 프로세스에서 실행 (TestClient)"""
+
+    mode = "inprocess"
+
+    def __enter__(self):
+        os.environ.update(BENCHMARK_ENV)
+        sys.path.insert(0, str(BACKEND_DIR / "src"))
+        from fastapi.testclient import TestClient
+        from pdf_processor.main import app
+
+        self._client = TestClient(app)
+        self._client.__enter__()
+        self.health = _wait_until_warm(lambda: self._client.get("/health").json())
+        self.pid = os.getpid()
+        return self
+
+    def __exit__(self, *exc):
+        self._client.__exit__(*exc)
+
+    def post(self, path: str, files, data) -> tuple:
+        response = self._client.post(path, files=files, data=data)
+        return response.status_code, len(response.content)
+
+
+class HttpClient:
+    """실제 서버에 HTTP로 요청 (url이 없으면 python -m pdf_processor를 실행)"""
+
+    mode = "http"
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url
+        self._process = None
+        self.pid = None
+
+    def __enter__(self):
+        import httpx
+
+        if self.url is None:
+            self._process = subprocess.Popen(
+                [sys.executable, "-m", "pdf_processor"],
+                cwd=BACKEND_DIR / "src",
+                env={**os.environ, **BENCHMARK_ENV, "PYTHONPATH": str(BACKEND_DIR / "src")},
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            )
+            for line in self._process.stdout:
+                match = re.search(r"PORT=(\d+)", line)
+                if match:
+                    self.url = f"http://localhost:{match.group(1)}"
+                    break
+            else:
+                raise RuntimeError("서버가 PORT=를 출력하지 않았습니다")
+            # 출력 버퍼가 차서 서버가 멈추지 않도록 나머지 출력은 버립니다
+            threading.Thread(target=lambda: [None for _ in self._process.stdout], daemon=True).start()
+            self.pid = self._process.pid
+
+        self._client = httpx.Client(base_url=self.url, timeout=None)
+        self.health = _wait_until_warm(lambda: self._client.get("/health").json())
+        return self
+
+    def __exit__(self, *exc):
+        self._client.close()
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=30)
+
+    def post(self, path: str, files, data) -> tuple:
+        response = self._client.post(path, files=files, data=data)
+        return response.status_code, len(response.content)
+
+
+# --- 측정 항목 ---
+
+def _pdf(path: Path):
+    return (path.name, path.read_bytes(), "application/pdf")
+
+
+def build_cases(workdir: Path, pages: int, content: str, args) -> List[dict]:
+    """엔드포인트별 요청 (폼 필드와 업로드 파일)"""
+    pdf = synthetic.make_pdf(workdir / f"{content}_{pages}.pdf", pages, content, args.page_size, args.image_size)
+    other = synthetic.make_pdf(workdir / f"{content}_{pages}_b.pdf", pages, content, args.page_size,
+                               args.image_size, seed=1)
+    encrypted = synthetic.make_encrypted_pdf(pdf, workdir / f"{content}_{pages}_enc.pdf", PASSWORD)
+    elements = [
+        {"type": "text", "page": n, "x": 50, "y": 50, "text": "Benchmark 벤치마크", "fontSize": 14}
+        for n in range(1, min(pages, 10) + 1)
+    ]
+
+    cases = {
+        "merge": ([("files", _pdf(pdf)), ("files", _pdf(other))], {}),
+        "split": ([("file", _pdf(pdf))], {"pages": f"1-{max(1, pages // 2)}"}),
+        "rotate": ([("file", _pdf(pdf))], {"pages": "all", "angle": "90", "include_unspecified": "true"}),
+        "add-watermark": ([("file", _pdf(pdf))], {
+            "watermark_type": "text", "watermark_text": "CONFIDENTIAL 대외비", "pages": "all", "position": "tile",
+        }),
+        "encrypt": ([("file", _pdf(pdf))], {"password": PASSWORD}),
+        "decrypt": ([("file", _pdf(encrypted))], {"password": PASSWORD}),
+        "edit": ([("file", _pdf(pdf))], {"elements": json.dumps(elements, ensure_ascii=False)}),
+        "convert-from-pdf": ([("file", _pdf(pdf))], {
+            "target_format": "image", "image_format": "jpg", "dpi": "72", "pages": "all",
+        }),
+    }
+    if content == "image":
+        images = synthetic.make_images(workdir, pages, args.image_size)
+        cases["convert-to-pdf"] = ([("files", (p.name, p.read_bytes(), "image/jpeg")) for p in images],
+                                   {"source_format": "image"})
+    else:
+        txt = synthetic.make_text_file(workdir / f"{content}_{pages}.txt", pages, content)
+        cases["convert-to-pdf"] = ([("files", (txt.name, txt.read_bytes(), "text/plain"))],
+                                   {"source_format": "txt"})
+
+    return [
+        {
+            "endpoint": endpoint,
+            "case": f"{content}-{pages}p",
+            "pages": pages,
+            "input_bytes": sum(len(f[1][1]) for f in files),
+            "files": files,
+            "data": data,
+        }
+        for endpoint, (files, data) in cases.items()
+        if endpoint in args.endpoints
+    ]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(client, case: dict, iterations: int, concurrency: int, warmup_requests: int) -> dict:
+    """같은 요청을 iterations번(동시에 concurrency개씩) 보내 측정"""
+    path = f"/{case['endpoint']}"
+    for _ in range(warmup_requests):
+        client.post(path, case["files"], case["data"])
+
+    def timed(_):
+        started = time.perf_counter()
+        status, size = client.post(path, case["files"], case["data"])
+        return status, size, (time.perf_counter() - started) * 1000
+
+    with RssSampler(client.pid) as sampler:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, range(iterations)))
+        wall = time.perf_counter() - started
+
+    latencies = [latency for _, _, latency in samples]
+    status_codes: Dict[str, int] = {}
+    for status, _, _ in samples:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+    return {
+        "endpoint": case["endpoint"],
+        "case": case["case"],
+        "pages": case["pages"],
+        "input_bytes": case["input_bytes"],
+        "output_bytes": samples[-1][1],
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "status_codes": status_codes,
+        "latency_ms": {
+            "min": round(min(latencies), 2),
+            "p50": round(_percentile(latencies, 50), 2),
+            "p90": round(_percentile(latencies, 90), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2),
+            "mean": round(statistics.fmean(latencies), 2),
+        },
+        "throughput_rps": round(iterations / wall, 3),
+        "pages_per_s": round(iterations * case["pages"] / wall, 1),
+        "peak_rss_mb": round(sampler.peak / 2**20, 1) if sampler.peak else None,
+    }
+
+
+# --- 결과 저장/비교 ---
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """두 결과를 비교하여 표로 출력하고, 기준보다 나빠진 항목 수를 반환"""
+    base = {(r["endpoint"], r["case"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\n비교 기준: {baseline['meta'].get('commit')} -> {current['meta'].get('commit')} (임계값 {threshold}%)")
+    print(f"{'endpoint':<18} {'case':<14} {'p50 ms':>22} {'throughput rps':>24} {'peak RSS MB':>18}")
+    regressions = 0
+    for result in current["results"]:
+        old = base.get((result["endpoint"], result["case"], result["concurrency"]))
+        if old is None:
+            continue
+        p50_old, p50_new = old["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        rps_old, rps_new = old["throughput_rps"], result["throughput_rps"]
+        p50_delta = (p50_new - p50_old) / p50_old * 100 if p50_old else 0.0
+        rps_delta = (rps_new - rps_old) / rps_old * 100 if rps_old else 0.0
+        regressed = p50_delta > threshold or rps_delta < -threshold
+        regressions += regressed
+        rss = f"{old['peak_rss_mb']} -> {result['peak_rss_mb']}"
+        print(f"{result['endpoint']:<18} {result['case']:<14} "
+              f"{p50_old:>8.1f} -> {p50_new:>8.1f} {p50_delta:+5.0f}% "
+              f"{rps_old:>8.2f} -> {rps_new:>8.2f} {rps_delta:+5.0f}% {rss:>18}"
+              f"{'  << 느려짐' if regressed else ''}")
+    return regressions
+
+
+def _print_results(results: List[dict]):
+    print(f"{'endpoint':<18} {'case':<14} {'status':<10} {'p50':>9} {'p90':>9} {'p99':>9} {'rps':>8} {'pages/s':>9} {'RSS MB':>8}")
+    for r in results:
+        latency = r["latency_ms"]
+        status = ",".join(f"{k}x{v}" for k, v in r["status_codes"].items())
+        print(f"{r['endpoint']:<18} {r['case']:<14} {status:<10} {latency['p50']:>9.1f} {latency['p90']:>9.1f} "
+              f"{latency['p99']:>9.1f} {r['throughput_rps']:>8.2f} {r['pages_per_s']:>9.1f} {r['peak_rss_mb'] or '-':>8}")
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PDF 처리 백엔드 벤치마크")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--url", help="실행 중인 서버 주소 (--mode http, 생략하면 서버를 직접 실행)")
+    parser.add_argument("--pages", type=lambda v: [int(p) for p in _csv(v)], default=[10, 100],
+                        help="페이지 수 목록 (예: 10,100,1000)")
+    parser.add_argument("--content", type=_csv, default=list(synthetic.CONTENT_TYPES),
+                        help="콘텐츠 유형 목록 (text,image,cjk)")
+    parser.add_argument("--endpoints", type=_csv, default=list(ENDPOINTS), help="측정할 엔드포인트 목록")
+    parser.add_argument("--page-size", choices=sorted(synthetic.PAGE_SIZES), default="a4")
+    parser.add_argument("--image-size", type=int, default=600, help="image 콘텐츠의 이미지 가로 픽셀")
+    parser.add_argument("--iterations", type=int, default=5, help="항목마다 측정하는 요청 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 보내는 요청 수")
+    parser.add_argument("--warmup-requests", type=int, default=1, help="측정 전에 보내는 요청 수")
+    parser.add_argument("--output", type=Path, help="결과 JSON 경로 (기본값: benchmarks/results/<시각>-<커밋>.json)")
+    parser.add_argument("--input", type=Path, help="측정하지 않고 이 결과 파일을 --compare와 비교")
+    parser.add_argument("--compare", type=Path, help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="느려짐으로 표시할 변화율(%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="느려진 항목이 있으면 종료 코드 1")
+    args = parser.parse_args(argv)
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"알 수 없는 엔드포인트: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.input:
+        current = json.loads(args.input.read_text(encoding="utf-8"))
+    else:
+        client = InProcessClient() if args.mode == "inprocess" else HttpClient(args.url)
+        results = []
+        with tempfile.TemporaryDirectory(prefix="pdf-bench-") as tmp, client:
+            for content in args.content:
+                for pages in args.pages:
+                    workdir = Path(tmp) / f"{content}_{pages}"
+                    workdir.mkdir()
+                    for case in build_cases(workdir, pages, content, args):
+                        result = run_case(client, case, args.iterations, args.concurrency, args.warmup_requests)
+                        results.append(result)
+                        print(f"  {result['endpoint']:<18} {result['case']:<14} p50 {result['latency_ms']['p50']:.1f} ms",
+                              flush=True)
+            health = client.health
+
+        current = {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "mode": args.mode,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "workers": health.get("workers"),
+                "warmup": health.get("warmup"),
+                "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+            },
+            "results": results,
+        }
+        output = args.output or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{current['meta']['commit'] or 'local'}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print()
+        _print_results(results)
+        print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(baseline, current, args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+벤치마크용 합성 입력 파일 생성
+
+- text: 페이지마다 영문 텍스트가 가득한 PDF
+- image: 페이지마다 서로 다른 무작위 이미지가 있는 PDF (중복 제거로 작아지지 않도록)
+- cjk: 페이지마다 한글 텍스트가 있는 PDF (NotoSansKR이 있으면 임베드, 없으면 CID 폰트)
+
+변환 벤치마크용 TXT/HTML/이미지 파일도 같은 분량으로 만듭니다.
+같은 인자로 만든 파일은 항상 같은 내용이 되도록 난수 시드를 고정합니다.
+"""
+import random
+import sys
+from io import BytesIO
+from pathlib import Path
+from typing import List
+
+from PIL import Image
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfgen import canvas
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+CONTENT_TYPES = ("text", "image", "cjk")
+PAGE_SIZES = {"a4": A4, "letter": letter}
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua ut enim ad minim veniam quis nostrud"
+).split()
+_HANGUL = "가나다라마바사아자차카타파하 대한민국 문서 편집 워터마크 병합 분할 회전 암호화 변환 "
+
+
+def _text_line(rng: random.Random, cjk: bool, length: int = 70) -> str:
+    if cjk:
+        return "".join(rng.choice(_HANGUL) for _ in range(length // 2))
+    line = []
+    while sum(len(w) + 1 for w in line) < length:
+        line.append(rng.choice(_WORDS))
+    return " ".join(line)
+
+
+def _cjk_font() -> str:
+    """NotoSansKR(임베드)을 사용할 수 있으면 등록하고, 없으면 reportlab 내장 CID 폰트를 사용"""
+    try:
+        from pdf_processor import fonts
+        return fonts.ensure_font("NotoSansKR-Regular")
+    except Exception:
+        pdfmetrics.registerFont(UnicodeCIDFont("HYSMyeongJo-Medium"))
+        return "HYSMyeongJo-Medium"
+
+
+def random_image(rng: random.Random, width: int, height: int) -> Image.Image:
+    """압축이 잘 되지 않는 무작위 RGB 이미지"""
+    return Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+
+
+def make_pdf(path: Path, pages: int, content: str = "text", page_size: str = "a4",
+             image_size: int = 600, seed: int = 0) -> Path:
+    """합성 PDF 생성"""
+    if content not in CONTENT_TYPES:
+        raise ValueError(f"알 수 없는 콘텐츠 유형입니다: {content}")
+    rng = random.Random(f"{seed}-{content}-{pages}")
+    width, height = PAGE_SIZES[page_size]
+    c = canvas.Canvas(str(path), pagesize=(width, height))
+    font = _cjk_font() if content == "cjk" else "Helvetica"
+    for page_number in range(1, pages + 1):
+        if content == "image":
+            image = random_image(rng, image_size, image_size * 3 // 4)
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=85)
+            buffer.seek(0)
+            c.drawImage(ImageReader(buffer), 40, height / 3, width=width - 80, height=(width - 80) * 3 / 4)
+            c.setFont("Helvetica", 10)
+            c.drawString(40, 40, f"Page {page_number}")
+        else:
+            c.setFont(font, 10)
+            y = height - 50
+            while y > 50:
+                c.drawString(40, y, _text_line(rng, content == "cjk"))
+                y -= 14
+        c.showPage()
+    c.save()
+    return path
+
+
+def make_encrypted_pdf(src: Path, path: Path, password: str) -> Path:
+    """src를 AES-256으로 암호화한 PDF (복호화 벤치마크용)"""
+    writer = PdfWriter(clone_from=PdfReader(src))
+    writer.encrypt(user_password=password, owner_password=password, algorithm="AES-256-R5")
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def make_text_file(path: Path, pages: int, content: str = "text", seed: int = 0) -> Path:
+    """페이지 수만큼의 분량을 가진 TXT 파일 (페이지당 약 50줄)"""
+    rng = random.Random(f"{seed}-txt-{content}-{pages}")
+    lines = [_text_line(rng, content == "cjk") for _ in range(pages * 50)]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def make_html_file(path: Path, pages: int, content: str = "text", seed: int = 0) -> Path:
+    """페이지 수만큼의 분량을 가진 HTML 파일"""
+    rng = random.Random(f"{seed}-html-{content}-{pages}")
+    paragraphs = [
+        f"<h2>Section {i + 1}</h2><p>{' '.join(_text_line(rng, content == 'cjk') for _ in range(12))}</p>"
+        for i in range(pages * 2)
+    ]
+    path.write_text(f"<html><body>{''.join(paragraphs)}</body></html>", encoding="utf-8")
+    return path
+
+
+def make_images(directory: Path, count: int, image_size: int = 600, seed: int = 0) -> List[Path]:
+    """이미지 -> PDF 변환 벤치마크용 JPEG 파일들"""
+    rng = random.Random(f"{seed}-images-{count}")
+    paths = []
+    for i in range(count):
+        path = directory / f"image_{i + 1:04d}.jpg"
+        random_image(rng, image_size, image_size * 3 // 4).save(path, format="JPEG", quality=85)
+        paths.append(path)
+    return paths
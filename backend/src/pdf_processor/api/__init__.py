@@ -9,6 +9,13 @@ from .addWatermark import router as add_watermark_router
 from .encrypt import router as encrypt_router
 from .decrypt import router as decrypt_router
 from .edit import router as edit_router
+from .jobs import router as jobs_router
+from .cache import router as cache_router
+from .documents import router as documents_router
+from .pipeline import router as pipeline_router
+from .batch import router as batch_router
+from .health import router as health_router
+from .metrics import router as metrics_router
 
 # get_session_dir, parse_page_ranges는 utils에서 import
 from pdf_processor.utils import get_session_dir, parse_page_ranges
@@ -22,4 +29,11 @@ def register_routers(app: FastAPI):
     app.include_router(add_watermark_router)
     app.include_router(encrypt_router)
     app.include_router(decrypt_router)
-    app.include_router(edit_router)
\ No newline at end of file
+    app.include_router(edit_router)
+    app.include_router(jobs_router)
+    app.include_router(cache_router)
+    app.include_router(documents_router)
+    app.include_router(pipeline_router)
+    app.include_router(batch_router)
+    app.include_router(health_router)
+    app.include_router(metrics_router)
\ No newline at end of file
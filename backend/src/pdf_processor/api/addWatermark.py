@@ -5,19 +5,22 @@ from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 from typing import Literal
 from pathlib import Path
-from pypdf import PdfReader, PdfWriter
-import os
-import sys
+from pypdf import PdfWriter
+from collections import OrderedDict
+import hashlib
+import uuid
 import shutil
 from PIL import Image
 from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
 from reportlab.lib.colors import HexColor
 from io import BytesIO
 
-from pdf_processor.utils import get_session_dir, parse_page_ranges
+from pdf_processor import documents, fonts, metrics, pageops, cache as result_cache
+from pdf_processor.textmetrics import text_width
+from pdf_processor.utils import get_session_dir, save_upload, InvalidInputError
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
@@ -29,8 +32,8 @@ def draw_watermark_on_canvas(c, page_width, page_height, options):
     opacity = options.get('opacity', 0.5)
     
     if options['watermark_type'] == 'text':
-        font_key = 'NotoSansKR-Bold' if options.get('is_bold') else 'NotoSansKR-Regular'
-        element_width = pdfmetrics.stringWidth(options.get('watermark_text', ''), font_key, font_size_px)
+        font_key = fonts.ensure_font('NotoSansKR-Bold' if options.get('is_bold') else 'NotoSansKR-Regular')
+        element_width = text_width(options.get('watermark_text', ''), font_key, font_size_px)
         element_height = font_size_px
     elif options['watermark_type'] == 'image':
         element_width, element_height = options.get('image_size', (0, 0))
@@ -87,10 +90,143 @@ def draw_watermark_on_canvas(c, page_width, page_height, options):
                 draw_element_in_box(col * tile_w, page_height - (row + 1) * tile_h, tile_w, tile_h)
 
 
-# --- 이하 @router.post("/add-watermark") 부분은 이전과 동일하므로 변경 없음 ---
+# 렌더링된 워터마크 오버레이 PDF 캐시 (워커 프로세스마다 유지, 오래된 항목부터 제거)
+OVERLAY_CACHE_SIZE = 32
+_overlay_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+def _overlay_key(page_width, page_height, options, image_digest):
+    """오버레이는 페이지 크기와 워터마크 옵션, 이미지 내용에만 의존합니다"""
+    return (
+        round(page_width, 2),
+        round(page_height, 2),
+        tuple(sorted(options.items())),
+        image_digest,
+    )
+
+def _prepare_watermark_image(image_path, opacity):
+    """워터마크 이미지에 투명도를 적용하고 최대 크기로 축소"""
+    img = Image.open(image_path)
+    
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    
+    alpha = img.split()[3]
+    alpha = alpha.point(lambda i: i * opacity)
+    img.putalpha(alpha)
+
+    max_dim = 150
+    if img.width > max_dim or img.height > max_dim:
+        ratio = min(max_dim / img.width, max_dim / img.height)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.resize(new_size, Image.Resampling.LANCZOS)
+    return img
+
+def _get_overlay_pdf(key, page_width, page_height, watermark_options, image_path=None) -> bytes:
+    """워터마크 오버레이(한 페이지짜리 PDF)를 캐시에서 찾거나 새로 렌더링"""
+    overlay_pdf = _overlay_cache.get(key)
+    if overlay_pdf is not None:
+        _overlay_cache.move_to_end(key)
+        return overlay_pdf
+
+    with metrics.phase("render"):
+        options = dict(watermark_options)
+        if options['watermark_type'] == "image" and image_path:
+            img = _prepare_watermark_image(image_path, options['opacity'])
+            options['image_obj'] = ImageReader(img)
+            options['image_size'] = img.size
+
+        packet = BytesIO()
+        c = canvas.Canvas(packet, pagesize=(page_width, page_height))
+        draw_watermark_on_canvas(c, page_width, page_height, options)
+        c.save()
+        overlay_pdf = packet.getvalue()
+
+    _overlay_cache[key] = overlay_pdf
+    if len(_overlay_cache) > OVERLAY_CACHE_SIZE:
+        _overlay_cache.popitem(last=False)
+    return overlay_pdf
+
+def _watermark_file(temp_path, output_path, pages: str, watermark_options: dict, image_path=None,
+                    save_mode: str = "full", progress=None):
+    """워터마크 렌더링 및 페이지 병합 작업 (워커 프로세스에서 실행)
+
+    save_mode가 "incremental"이면 원본 파일 뒤에 워터마크를 적용한 페이지와 오버레이만 덧붙입니다.
+    증분 저장을 적용할 수 없는 문서(암호화 등)는 전체 문서를 다시 씁니다.
+    """
+    with documents.open_reader(temp_path) as reader:
+        _watermark_reader(reader, temp_path, output_path, pages, watermark_options, image_path, save_mode, progress)
+
+
+def _watermark_reader(reader, temp_path, output_path, pages: str, watermark_options: dict, image_path,
+                      save_mode: str, progress=None):
+    total_pages = pageops.page_count(reader)
+    page_numbers = sorted(pageops.select_pages(pages, total_pages))
+
+    incremental = save_mode == "incremental" and pageops.supports_incremental(reader)
+    if incremental:
+        target = pageops.IncrementalUpdate(temp_path, reader)
+        selected = list(zip(page_numbers, target.pages(page_numbers)))
+    else:
+        writer = PdfWriter()
+        target = pageops.WriterTarget(writer)
+        with metrics.phase("copy"):
+            all_pages = [writer.add_page(page) for page in reader.pages]
+        selected = [(page_number, all_pages[page_number - 1]) for page_number in page_numbers]
+
+    stamp_watermark(target, [page for _, page in selected], watermark_options, image_path, progress)
+    metrics.count("pages", len(selected))
+
+    if incremental:
+        for _, page in selected:
+            target.update_object(page.indirect_reference, page)
+        target.write(output_path)
+    else:
+        with metrics.phase("write"), open(output_path, "wb") as output_file:
+            writer.write(output_file)
+
+
+def stamp_watermark(target, pages, watermark_options: dict, image_path=None, progress=None):
+    """페이지들에 워터마크를 XObject로 추가하여 그림
+
+    Args:
+        target: 오버레이 객체를 추가할 문서 (pageops.IncrementalUpdate 또는 pageops.WriterTarget)
+        pages: 워터마크를 적용할 페이지 목록 (그 자리에서 수정됨)
+    """
+    image_digest = None
+    if watermark_options['watermark_type'] == "image" and image_path:
+        with open(image_path, "rb") as f:
+            image_digest = hashlib.sha256(f.read()).hexdigest()
+
+    # 이 문서에 추가된 오버레이 XObject (오버레이 키 -> (이름, 참조))와 그리기 스트림
+    xobjects = {}
+    draw_streams = {}
+    save_state_ref = None
+    # 이미 워터마크가 있는 문서에 다시 적용해도 리소스 이름이 겹치지 않도록 실행마다 접두사를 바꿉니다
+    name_prefix = f"/PDFStudioWm{uuid.uuid4().hex[:8]}_"
+    if progress:
+        progress.start(len(pages))
+    with metrics.phase("merge"):
+        for page in pages:
+            page_width = float(page.mediabox.width)
+            page_height = float(page.mediabox.height)
+            key = _overlay_key(page_width, page_height, watermark_options, image_digest)
+            if key not in xobjects:
+                overlay_pdf = _get_overlay_pdf(key, page_width, page_height, watermark_options, image_path)
+                xobjects[key] = (f"{name_prefix}{len(xobjects)}", pageops.overlay_xobject(target, overlay_pdf))
+            name, xobject_ref = xobjects[key]
+            origin = (name, float(page.mediabox.left), float(page.mediabox.bottom))
+            if origin not in draw_streams:
+                draw_streams[origin] = pageops.draw_xobject_stream(target, *origin)
+            if save_state_ref is None:
+                save_state_ref = pageops.add_content_stream(target, b"q\n")
+            pageops.stamp_xobject(page, name, xobject_ref, save_state_ref, draw_streams[origin])
+            if progress:
+                progress.advance()
+
+
 @router.post("/add-watermark")
 async def add_watermark(
-    file: UploadFile,
+    file: UploadFile = None,
     watermark_type: Literal["text", "image"] = Form(...),
     watermark_text: str = Form(None),
     watermark_image: UploadFile = None,
@@ -101,33 +237,22 @@ async def add_watermark(
     font_name: Literal["NotoSansKR"] = Form("NotoSansKR"),
     font_color: str = Form("#000000"),
     font_bold: str = Form("false"),
-    pages: str = Form("all")
+    pages: str = Form("all"),
+    save_mode: Literal["full", "incremental"] = Form("full"),
+    document_id: str = Form(None)
 ):
-    if not file.filename.lower().endswith('.pdf'):
+    if file is not None and not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="PDF 파일만 지원됩니다")
+    if watermark_type == "image" and not watermark_image:
+        raise HTTPException(status_code=400, detail="이미지 워터마크에는 watermark_image 파일이 필요합니다")
     
     session_dir = get_session_dir()
-    temp_path = session_dir / f"temp_{file.filename}"
-    output_path = session_dir / f"watermarked_{file.filename}"
     
     try:
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # 등록된 문서(document_id)이면 보관 중인 파일을 그대로 사용
+        temp_path, filename = await documents.resolve_input(file, document_id, session_dir)
+        output_path = session_dir / f"watermarked_{Path(filename).name}"
 
-        reader = PdfReader(temp_path)
-        total_pages = len(reader.pages)
-        
-        pages_to_watermark = set()
-        if pages.lower() == 'all':
-            pages_to_watermark = set(range(total_pages))
-        else:
-            try:
-                page_indices = parse_page_ranges(pages, total_pages)
-                pages_to_watermark = set(p - 1 for p in page_indices)
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=str(e))
-        
         is_bold_bool = font_bold.lower() == "true"
         watermark_options = {
             "watermark_type": watermark_type, "watermark_text": watermark_text,
@@ -136,61 +261,32 @@ async def add_watermark(
             "is_bold": is_bold_bool
         }
 
-        if getattr(sys, '_MEIPASS', None):
-            font_path = os.path.join(sys._MEIPASS, 'pdf_processor', 'fonts')
-        else:
-            font_path = os.path.join(os.path.dirname(__file__), '..', '..', 'fonts')
+        image_path = None
+        if watermark_type == "image":
+            image_path = session_dir / f"image_{Path(watermark_image.filename or 'watermark').name}"
+            await save_upload(watermark_image, image_path)
         
-        pdfmetrics.registerFont(TTFont('NotoSansKR-Regular', os.path.join(font_path, 'NotoSansKR-Regular.ttf')))
-        pdfmetrics.registerFont(TTFont('NotoSansKR-Bold', os.path.join(font_path, 'NotoSansKR-Bold.ttf')))
-        
-        if watermark_type == "image" and watermark_image:
-            img_content = await watermark_image.read()
-            img = Image.open(BytesIO(img_content))
-            
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            alpha = img.split()[3]
-            alpha = alpha.point(lambda i: i * opacity)
-            img.putalpha(alpha)
-
-            max_dim = 150
-            if img.width > max_dim or img.height > max_dim:
-                ratio = min(max_dim / img.width, max_dim / img.height)
-                new_size = (int(img.width * ratio), int(img.height * ratio))
-                img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-            watermark_options['image_obj'] = ImageReader(img)
-            watermark_options['image_size'] = img.size
-        
-        writer = PdfWriter()
-        for i, page in enumerate(reader.pages):
-            if i in pages_to_watermark:
-                packet = BytesIO()
-                page_width = float(page.mediabox.width)
-                page_height = float(page.mediabox.height)
-                c = canvas.Canvas(packet, pagesize=(page_width, page_height))
-                
-                draw_watermark_on_canvas(c, page_width, page_height, watermark_options)
-                
-                c.save()
-                packet.seek(0)
-                watermark_pdf = PdfReader(packet)
-                page.merge_page(watermark_pdf.pages[0])
-            
-            writer.add_page(page)
-        
-        with open(output_path, "wb") as output_file:
-            writer.write(output_file)
+        # 같은 파일/옵션의 결과가 캐시에 있으면 재사용, 없으면 렌더링 및 병합 후 저장 (워커 풀에서 실행)
+        cache_key = await result_cache.make_key(
+            "add-watermark", [temp_path] + ([image_path] if image_path else []),
+            {**watermark_options, "pages": pages.replace(" ", ""), "save_mode": save_mode}
+        )
+        if not await result_cache.fetch(cache_key, output_path):
+            await run_cpu(
+                _watermark_file, temp_path, output_path, pages, watermark_options, image_path, save_mode,
+                progress=current_progress(), size_hint=temp_path.stat().st_size
+            )
+            await result_cache.store(cache_key, output_path)
         
         return FileResponse(
             path=str(output_path),
-            filename=f"watermarked_{file.filename}",
+            filename=f"watermarked_{filename}",
             background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
         )
         
     except Exception as e:
         shutil.rmtree(session_dir, ignore_errors=True)
         if isinstance(e, HTTPException): raise e
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
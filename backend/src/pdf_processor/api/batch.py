@@ -0,0 +1,300 @@
+from fastapi import APIRouter, UploadFile, HTTPException, Form, File
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional, Tuple
+from pathlib import Path
+import asyncio
+import json
+import shutil
+import zipfile
+
+from pdf_processor import config, tempstore
+from pdf_processor.utils import get_session_dir, save_upload, InvalidInputError, stream_zip, content_disposition
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
+from .rotate import _rotate_file
+from .addWatermark import _watermark_file
+from .encrypt import _encrypt_file
+from .decrypt import _decrypt_file
+
+router = APIRouter()
+
+# 작업 이름 -> (파일 하나를 처리하는 워커 함수, 결과 파일 이름 접두사)
+BATCH_OPERATIONS = {
+    "rotate": (_rotate_file, "rotated"),
+    "add-watermark": (_watermark_file, "watermarked"),
+    "encrypt": (_encrypt_file, "encrypted"),
+    "decrypt": (_decrypt_file, "decrypted"),
+}
+
+# 워커 하나가 한 번에 맡는 최대 파일 수 (작을수록 결과가 빨리 전송되기 시작함)
+BATCH_CHUNK_FILES = 16
+MANIFEST_NAME = "manifest.json"
+
+def _process_files(operation: str, items: List[Tuple[Path, Path]], args: tuple) -> List[Optional[str]]:
+    """파일 묶음을 차례로 처리하고 파일마다 오류 메시지(성공이면 None)를 반환 (워커 프로세스에서 실행)
+
+    파일 하나가 실패해도 나머지 파일은 계속 처리합니다.
+    """
+    worker, _ = BATCH_OPERATIONS[operation]
+    errors = []
+    for src, dest in items:
+        try:
+            worker(src, dest, *args)
+            errors.append(None)
+        except InvalidInputError as e:
+            errors.append(str(e))
+        except Exception as e:
+            errors.append(f"처리할 수 없는 파일입니다: {e}")
+        finally:
+            src.unlink(missing_ok=True)
+    return errors
+
+def _unique_name(name: str, used: set) -> str:
+    """압축 파일 안에서 겹치지 않는 파일 이름"""
+    path = Path(name)
+    candidate, index = path.name, 1
+    while candidate.lower() in used:
+        index += 1
+        candidate = f"{path.stem} ({index}){path.suffix}"
+    used.add(candidate.lower())
+    return candidate
+
+def _list_archive(archive_path: Path) -> List[zipfile.ZipInfo]:
+    """ZIP 안의 PDF 파일 항목 목록 (압축을 풀지 않고 헤더만 읽음)"""
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            return [info for info in archive.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(".pdf")]
+    except zipfile.BadZipFile:
+        raise InvalidInputError("올바른 ZIP 파일이 아닙니다")
+
+def _copy_entry(src, dest, size: int, filename: str):
+    """압축 항목을 헤더에 기록된 크기까지만 복사 (실제 내용이 더 크면 잘못된 파일로 처리)"""
+    remaining = size
+    while True:
+        chunk = src.read(min(config.UPLOAD_CHUNK_BYTES, remaining + 1))
+        if not chunk:
+            return
+        if len(chunk) > remaining:
+            raise InvalidInputError(f"압축 파일 안의 파일 크기가 헤더와 다릅니다: {filename}")
+        dest.write(chunk)
+        remaining -= len(chunk)
+
+def _extract_archive(archive_path: Path, entries: List[zipfile.ZipInfo], input_dir: Path,
+                     used: set) -> List[Tuple[str, Path]]:
+    """ZIP 안의 PDF 파일들을 입력 디렉토리에 풀기 (디렉토리 구조는 무시)"""
+    inputs = []
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in entries:
+                name = _unique_name(Path(info.filename.replace("\\", "/")).name, used)
+                path = input_dir / name
+                with archive.open(info) as src, open(path, "wb") as dest:
+                    _copy_entry(src, dest, info.file_size, info.filename)
+                inputs.append((name, path))
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError) as e:
+        raise InvalidInputError(f"압축 파일을 풀 수 없습니다: {e}")
+    return inputs
+
+async def _check_archive(entries: List[zipfile.ZipInfo], collected: int, input_dir: Path):
+    """압축을 풀기 전에 파일 수, 파일 크기, 임시 저장 공간을 확인"""
+    if collected + len(entries) > config.MAX_BATCH_FILES:
+        raise InvalidInputError(f"한 번에 최대 {config.MAX_BATCH_FILES}개의 파일만 처리할 수 있습니다")
+    for info in entries:
+        if config.MAX_UPLOAD_BYTES and info.file_size > config.MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"압축 파일 안의 파일이 너무 큽니다: {info.filename}")
+    await tempstore.ensure_space(input_dir, sum(info.file_size for info in entries))
+
+async def _collect_inputs(files: Optional[List[UploadFile]], archive: Optional[UploadFile],
+                          session_dir: Path) -> List[Tuple[str, Path]]:
+    """업로드된 PDF 파일들과 ZIP 안의 PDF 파일들을 (원본 이름, 저장 경로) 목록으로 저장"""
+    input_dir = session_dir / "input"
+    input_dir.mkdir()
+    used = set()
+    inputs = []
+    if files and len(files) > config.MAX_BATCH_FILES:
+        raise InvalidInputError(f"한 번에 최대 {config.MAX_BATCH_FILES}개의 파일만 처리할 수 있습니다")
+    for file in files or []:
+        if not file.filename or not file.filename.lower().endswith('.pdf'):
+            raise InvalidInputError(f"PDF 파일만 지원됩니다: {file.filename}")
+        name = _unique_name(file.filename, used)
+        path = input_dir / name
+        await save_upload(file, path)
+        inputs.append((name, path))
+    if archive is not None:
+        archive_path = session_dir / "archive.zip"
+        await save_upload(archive, archive_path)
+        entries = await run_in_threadpool(_list_archive, archive_path)
+        await _check_archive(entries, len(inputs), input_dir)
+        inputs += await run_in_threadpool(_extract_archive, archive_path, entries, input_dir, used)
+        tempstore.add_usage(input_dir, sum(info.file_size for info in entries))
+        archive_path.unlink()
+
+    if not inputs:
+        raise InvalidInputError("처리할 PDF 파일이 없습니다")
+    if len(inputs) > config.MAX_BATCH_FILES:
+        raise InvalidInputError(f"한 번에 최대 {config.MAX_BATCH_FILES}개의 파일만 처리할 수 있습니다")
+    return inputs
+
+async def _batch_entries(operation: str, inputs: List[Tuple[str, Path]], session_dir: Path, args: tuple,
+                         progress=None):
+    """파일 묶음을 워커 풀에서 처리하며 결과를 입력 순서대로 (압축 파일 내 이름, 경로)로 생성
+
+    동시에 실행하는 묶음은 워커 수로 제한하고, 마지막에 파일별 처리 결과(manifest.json)를 추가합니다.
+    """
+    _, prefix = BATCH_OPERATIONS[operation]
+    output_dir = session_dir / "output"
+    output_dir.mkdir()
+    chunk_size = max(1, min(BATCH_CHUNK_FILES, -(-len(inputs) // config.MAX_WORKERS)))
+    chunks = [inputs[i:i + chunk_size] for i in range(0, len(inputs), chunk_size)]
+
+    def submit(chunk):
+        items = [(path, output_dir / f"{prefix}_{name}") for name, path in chunk]
+        return asyncio.ensure_future(run_cpu(
+            _process_files, operation, items, args,
+            size_hint=sum(path.stat().st_size for _, path in chunk)
+        ))
+
+    manifest = []
+    pending = [submit(chunk) for chunk in chunks[:config.MAX_WORKERS]]
+    if progress:
+        progress.start(len(inputs))
+    try:
+        for index, chunk in enumerate(chunks):
+            try:
+                errors = await pending[index]
+            except Exception as e:
+                # 워커 풀 과부하 등으로 묶음 전체를 처리하지 못한 경우
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                errors = [f"처리하지 못했습니다: {detail}"] * len(chunk)
+            if index + config.MAX_WORKERS < len(chunks):
+                pending.append(submit(chunks[index + config.MAX_WORKERS]))
+
+            for (name, path), error in zip(chunk, errors):
+                output_name = f"{prefix}_{name}"
+                output_path = output_dir / output_name
+                if error is None:
+                    manifest.append({"file": name, "status": "ok", "output": output_name,
+                                     "size": output_path.stat().st_size})
+                    yield output_name, output_path
+                else:
+                    output_path.unlink(missing_ok=True)
+                    manifest.append({"file": name, "status": "error", "error": error})
+            if progress:
+                progress.advance(len(chunk))
+
+        manifest_path = session_dir / MANIFEST_NAME
+        succeeded = sum(1 for entry in manifest if entry["status"] == "ok")
+        manifest_path.write_text(json.dumps({
+            "operation": operation,
+            "total": len(manifest),
+            "succeeded": succeeded,
+            "failed": len(manifest) - succeeded,
+            "files": manifest,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+        yield MANIFEST_NAME, manifest_path
+    finally:
+        for task in pending:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+async def _run_batch(operation: str, files, archive, args_factory) -> StreamingResponse:
+    """입력 파일을 모아 일괄 처리하고 결과 ZIP을 스트리밍으로 반환
+
+    args_factory(session_dir)는 워커 함수에 넘길 공통 인자를 반환하는 코루틴입니다.
+    """
+    session_dir = get_session_dir()
+    try:
+        inputs = await _collect_inputs(files, archive, session_dir)
+        args = await args_factory(session_dir)
+    except Exception as e:
+        shutil.rmtree(session_dir, ignore_errors=True)
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise e
+
+    return StreamingResponse(
+        stream_zip(_batch_entries(operation, inputs, session_dir, args, progress=current_progress())),
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(f"{operation}_batch.zip")},
+        background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
+    )
+
+@router.post("/batch/rotate")
+async def batch_rotate(
+    files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    pages: str = Form(...),
+    angle: int = Form(...),
+    include_unspecified: bool = Form(...)
+):
+    """여러 PDF 파일(files 또는 PDF들을 묶은 ZIP)을 같은 옵션으로 회전
+
+    결과 PDF들과 파일별 처리 결과(manifest.json)를 묶은 ZIP을 반환합니다.
+    """
+    if angle not in [90, 180, 270]:
+        raise HTTPException(status_code=400, detail="회전 각도는 90, 180, 270만 지원됩니다")
+
+    async def args(session_dir):
+        return (pages, angle, include_unspecified)
+    return await _run_batch("rotate", files, archive, args)
+
+@router.post("/batch/add-watermark")
+async def batch_add_watermark(
+    files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    watermark_type: Literal["text", "image"] = Form(...),
+    watermark_text: str = Form(None),
+    watermark_image: UploadFile = None,
+    opacity: float = Form(0.5),
+    rotation: int = Form(0),
+    position: Literal["center", "tile", "top-left", "top-right", "bottom-left", "bottom-right"] = Form("center"),
+    font_size: int = Form(40),
+    font_name: Literal["NotoSansKR"] = Form("NotoSansKR"),
+    font_color: str = Form("#000000"),
+    font_bold: str = Form("false"),
+    pages: str = Form("all"),
+    save_mode: Literal["full", "incremental"] = Form("full")
+):
+    """여러 PDF 파일에 같은 워터마크를 추가 (옵션은 /add-watermark와 같음)"""
+    if watermark_type == "image" and not watermark_image:
+        raise HTTPException(status_code=400, detail="이미지 워터마크에는 watermark_image 파일이 필요합니다")
+    watermark_options = {
+        "watermark_type": watermark_type, "watermark_text": watermark_text,
+        "opacity": opacity, "rotation": rotation, "position": position,
+        "font_size": font_size, "font_name": font_name, "font_color": font_color,
+        "is_bold": font_bold.lower() == "true"
+    }
+
+    async def args(session_dir):
+        image_path = None
+        if watermark_type == "image" and watermark_image:
+            image_path = session_dir / f"image_{Path(watermark_image.filename or 'watermark').name}"
+            await save_upload(watermark_image, image_path)
+        return (pages, watermark_options, image_path, save_mode)
+    return await _run_batch("add-watermark", files, archive, args)
+
+@router.post("/batch/encrypt")
+async def batch_encrypt(
+    files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    password: str = Form(...)
+):
+    """여러 PDF 파일을 같은 비밀번호로 암호화"""
+    async def args(session_dir):
+        return (password,)
+    return await _run_batch("encrypt", files, archive, args)
+
+@router.post("/batch/decrypt")
+async def batch_decrypt(
+    files: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    password: str = Form(...)
+):
+    """여러 PDF 파일을 같은 비밀번호로 복호화 (비밀번호가 다르거나 암호화되지 않은 파일은 manifest에 오류로 기록)"""
+    async def args(session_dir):
+        return (password,)
+    return await _run_batch("decrypt", files, archive, args)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
+
+from pdf_processor import cache as result_cache
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """결과 캐시 사용량과 적중률"""
+    return await run_in_threadpool(result_cache.get_cache().stats)
+
+@router.delete("/cache")
+async def clear_cache():
+    """결과 캐시 비우기"""
+    await run_in_threadpool(result_cache.get_cache().clear)
+    return {"cleared": True}
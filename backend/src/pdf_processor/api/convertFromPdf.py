@@ -1,57 +1,32 @@
 from fastapi import APIRouter, UploadFile, HTTPException, BackgroundTasks, Form
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from starlette.background import BackgroundTask
 from typing import List, Literal
+import asyncio
 import os
 import sys
+import threading
 import tempfile
 import logging
 import shutil
-import zipfile
+import time
 from pathlib import Path
 import uuid
 import platform
-from pdf2image import convert_from_path
-import img2pdf
-from PIL import Image
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.utils import ImageReader
-from xhtml2pdf import pisa
-from io import BytesIO
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 import re
 import subprocess
-import pdfplumber
-import docx
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
 
-from pdf_processor.utils import get_session_dir
+from pdf_processor import config, metrics
+from pdf_processor.utils import get_session_dir, save_upload, parse_page_ranges, stream_zip, content_disposition
+from pdf_processor.executor import run_in_thread
+from pdf_processor.jobs import current_progress
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/convert-from-pdf")
-async def convert_from_pdf(
-    file: UploadFile,
-    target_format: Literal["docx", "image"] = Form(...),
-    image_format: Literal["jpg", "png"] = Form(None),
-    output_path_str: str = Form(None)
-):
-    """PDF를 다른 형식으로 변환"""
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="PDF 파일만 지원됩니다")
-    
-    session_dir = get_session_dir()
-    temp_pdf = session_dir / f"temp_{file.filename}"
-    output_path = session_dir / f"{os.path.splitext(file.filename)[0]}"
-    
+def _setup_poppler():
+    """번들된 poppler 경로를 찾고 필요한 환경 변수를 설정 (pdftoppm을 실행하는 프로세스에서 호출)"""
     poppler_path = None
     if platform.system() == "Windows":
         if getattr(sys, '_MEIPASS', None):
@@ -69,12 +44,190 @@ async def convert_from_pdf(
             poppler_path = str(base_path / "poppler" / "mac" / "25.03.0" / "bin")
             lib_path = str(base_path / "poppler" / "mac" / "25.03.0" / "lib")
         os.environ['DYLD_LIBRARY_PATH'] = lib_path
-        os.environ['PATH'] = f"{poppler_path}:{os.environ.get('PATH', '')}"
+        if poppler_path not in os.environ.get('PATH', ''):
+            os.environ['PATH'] = f"{poppler_path}:{os.environ.get('PATH', '')}"
+    return poppler_path
+
+# 이미지 변환에 허용하는 해상도 범위
+MIN_IMAGE_DPI = 36
+MAX_IMAGE_DPI = 600
+
+def _count_pages(temp_pdf) -> int:
+    from pdf_processor import pdfinput
+
+    with pdfinput.open_pdf(temp_pdf) as reader:
+        return len(reader.pages)
+
+# 요청 하나가 동시에 실행하는 pdftoppm 프로세스 수 (다른 요청이 사용할 실행 슬롯을 남겨 둠)
+RENDER_PROCESSES = max(1, config.MAX_WORKERS // 2)
+# pdftoppm이 새 페이지 파일을 만들었는지 확인하는 간격(초)
+RENDER_POLL_SECONDS = 0.05
+
+def _pdftoppm_command(poppler_path) -> str:
+    name = "pdftoppm.exe" if platform.system() == "Windows" else "pdftoppm"
+    return str(Path(poppler_path) / name) if poppler_path else name
+
+def _page_runs(page_numbers):
+    """페이지 목록을 연속된 페이지 구간 (첫 페이지, 마지막 페이지) 목록으로 나눔"""
+    runs = []
+    for page_number in page_numbers:
+        if runs and runs[-1][1] == page_number - 1:
+            runs[-1][1] = page_number
+        else:
+            runs.append([page_number, page_number])
+    return [(first, last) for first, last in runs]
+
+def _rendered_pages(run_dir: Path, image_format: str):
+    """pdftoppm이 만든 페이지 파일 {페이지 번호: 경로} (파일 이름: page-<번호>.<확장자>, 번호는 0으로 채워질 수 있음)"""
+    rendered = {}
+    for path in run_dir.glob(f"page-*.{image_format}"):
+        match = re.fullmatch(r"page-(\d+)", path.stem)
+        if match:
+            rendered[int(match.group(1))] = path
+    return rendered
+
+def _render_run(command, temp_pdf, run_dir: Path, first: int, last: int, image_format, dpi, on_page, stop, progress=None):
+    """pdftoppm 프로세스 하나로 first~last 페이지를 렌더링하고, 페이지 파일이 완성되는 대로 on_page를 호출
+
+    pdftoppm은 페이지를 차례로 쓰므로 다음 페이지 파일이 생기거나 프로세스가 끝나면 앞 페이지 파일이 완성된 것입니다.
+    """
+    run_dir.mkdir()
+    args = [command, "-r", str(dpi), "-f", str(first), "-l", str(last)]
+    args += ["-jpeg", "-jpegopt", "quality=95"] if image_format == "jpg" else ["-png"]
+    args += [str(temp_pdf), str(run_dir / "page")]
+    startupinfo = None
+    if platform.system() == "Windows":
+        # 콘솔 창을 띄우지 않음
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    # 경고가 많아도 파이프가 차서 멈추지 않도록 오류 출력은 임시 파일로 받습니다
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=stderr, startupinfo=startupinfo)
+        except FileNotFoundError:
+            raise RuntimeError("pdftoppm(poppler)을 찾을 수 없습니다")
+        next_page = first
+        try:
+            while next_page <= last:
+                if stop.is_set():
+                    return
+                finished = process.poll() is not None
+                rendered = _rendered_pages(run_dir, image_format)
+                while next_page <= last and (finished or next_page + 1 in rendered) and next_page in rendered:
+                    image_path = rendered[next_page].replace(run_dir.parent / f"page_{next_page}.{image_format}")
+                    metrics.count("pages", 1)
+                    on_page(next_page, Path(image_path))
+                    if progress:
+                        progress.advance()
+                    next_page += 1
+                if finished:
+                    break
+                time.sleep(RENDER_POLL_SECONDS)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+        if process.returncode != 0 or next_page <= last:
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", "replace").strip()
+            raise RuntimeError(f"pdftoppm이 {next_page} 페이지를 렌더링하지 못했습니다 (종료 코드 {process.returncode}): {message}")
+    run_dir.rmdir()
+
+def _render_page_range(temp_pdf, output_dir, page_numbers, image_format, dpi, on_page, stop, progress=None):
+    """페이지 묶음을 렌더링하여 이미지 파일로 저장 (스레드 풀에서 실행)
+
+    연속된 페이지 구간마다 pdftoppm 프로세스를 하나만 실행하므로 PDF를 구간마다 한 번만 파싱합니다.
+    래스터화와 이미지 인코딩은 pdftoppm이 수행하고 결과를 바로 파일로 쓰므로 비트맵을 파이썬 메모리에
+    올리지 않습니다. 페이지가 끝날 때마다 on_page(페이지 번호, 경로)를 호출합니다.
+    """
+    command = _pdftoppm_command(_setup_poppler())
+    for first, last in _page_runs(page_numbers):
+        if stop.is_set():
+            return
+        with metrics.phase("render"):
+            _render_run(command, temp_pdf, Path(output_dir) / f"render_{first}", first, last,
+                        image_format, dpi, on_page, stop, progress)
 
+def _split_page_chunks(page_numbers, count):
+    """페이지 목록을 최대 count개의 연속된 묶음으로 나눔"""
+    count = max(1, min(count, len(page_numbers)))
+    size, extra = divmod(len(page_numbers), count)
+    chunks, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(page_numbers[start:end])
+        start = end
+    return chunks
+
+async def _rasterize_pages(temp_pdf, output_dir, page_numbers, image_format, dpi, progress=None):
+    """선택한 페이지를 최대 RENDER_PROCESSES개의 pdftoppm 프로세스에 나누어 동시에 렌더링
+
+    페이지 번호 순서대로 (페이지 번호, 이미지 경로)를 생성하며, 앞 페이지가 준비되는 즉시
+    내보내므로 호출하는 쪽은 나머지 페이지가 렌더링되는 동안 결과를 처리할 수 있습니다.
+    """
+    loop = asyncio.get_running_loop()
+    ready = {page_number: loop.create_future() for page_number in page_numbers}
+    stop = threading.Event()
+
+    def on_page(page_number, image_path):
+        loop.call_soon_threadsafe(ready[page_number].set_result, image_path)
+
+    if progress:
+        progress.start(len(page_numbers))
+    tasks = [
+        asyncio.ensure_future(run_in_thread(
+            _render_page_range, temp_pdf, output_dir, chunk, image_format, dpi, on_page, stop, progress
+        ))
+        for chunk in _split_page_chunks(page_numbers, RENDER_PROCESSES)
+    ]
+    try:
+        for page_number in page_numbers:
+            future = ready[page_number]
+            while not future.done():
+                await asyncio.wait([future, *tasks], return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task.done() and task.exception() is not None:
+                        raise task.exception()
+                if not future.done() and all(task.done() for task in tasks):
+                    raise RuntimeError(f"{page_number} 페이지를 렌더링하지 못했습니다")
+            yield page_number, future.result()
+    finally:
+        # 중간에 실패하거나 클라이언트가 끊긴 경우 남은 페이지는 렌더링하지 않습니다
+        stop.set()
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _zip_entries(first_page, pages_iter, image_format):
+    """렌더링된 페이지를 압축 파일 항목 (이름, 경로)로 변환"""
+    page_number, image_path = first_page
+    yield f"page_{page_number}.{image_format}", image_path
+    async for page_number, image_path in pages_iter:
+        yield f"page_{page_number}.{image_format}", image_path
+
+@router.post("/convert-from-pdf")
+async def convert_from_pdf(
+    file: UploadFile,
+    target_format: Literal["docx", "image"] = Form(...),
+    image_format: Literal["jpg", "png"] = Form(None),
+    output_path_str: str = Form(None),
+    dpi: int = Form(300),
+    pages: str = Form("all")
+):
+    """PDF를 다른 형식으로 변환
+
+    이미지 변환 시 dpi와 pages(예: "1-3,5" 또는 "all")로 해상도와 변환할 페이지를 지정할 수 있습니다.
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="PDF 파일만 지원됩니다")
+    
+    session_dir = get_session_dir()
+    temp_pdf = session_dir / f"temp_{file.filename}"
+    output_path = session_dir / f"{os.path.splitext(file.filename)[0]}"
+    
     try:
-        with open(temp_pdf, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload(file, temp_pdf)
         
         if target_format == "docx":
             if output_path_str:
@@ -88,7 +241,8 @@ async def convert_from_pdf(
                 output_docx = output_path.with_suffix('.docx')
                 cleanup_task = BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
 
-            await convert_pdf_to_docx_advanced(temp_pdf, output_docx)
+            # Word 자동화는 오래 걸리는 블로킹 작업이므로 스레드 풀에서 실행
+            await run_in_thread(convert_pdf_to_docx_advanced, temp_pdf, output_docx)
             temp_pdf.unlink()
             return FileResponse(
                 path=str(output_docx),
@@ -98,49 +252,46 @@ async def convert_from_pdf(
         elif target_format == "image":
             if not image_format:
                 raise HTTPException(status_code=400, detail="이미지 형식(jpg 또는 png)을 지정해야 합니다")
-            from pypdf import PdfReader
-            reader = PdfReader(temp_pdf)
-            num_pages = len(reader.pages)
+            if not MIN_IMAGE_DPI <= dpi <= MAX_IMAGE_DPI:
+                raise HTTPException(status_code=400, detail=f"DPI는 {MIN_IMAGE_DPI}에서 {MAX_IMAGE_DPI} 사이여야 합니다")
+            num_pages = await run_in_thread(_count_pages, temp_pdf)
+            if pages.lower() == "all":
+                page_numbers = list(range(1, num_pages + 1))
+            else:
+                try:
+                    page_numbers = parse_page_ranges(pages, num_pages)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            if not page_numbers:
+                raise HTTPException(status_code=400, detail="변환할 페이지가 없습니다")
             try:
-                images = convert_from_path(
-                    temp_pdf,
-                    dpi=300,
-                    fmt=image_format,
-                    poppler_path=poppler_path
+                # 여러 pdftoppm 프로세스로 페이지를 나누어 렌더링하고, 준비된 페이지부터 압축 파일에 추가
+                pages_iter = _rasterize_pages(
+                    temp_pdf, session_dir, page_numbers, image_format, dpi, progress=current_progress()
                 )
-                if len(images) > 1:
+                if len(page_numbers) > 1:
+                    # 첫 페이지를 기다려 렌더링 오류는 응답 전에 500으로 반환하고,
+                    # 이후 페이지는 렌더링되는 대로 압축 파일 스트림으로 바로 전송합니다
+                    first_page = await pages_iter.__anext__()
                     zip_filename = f"{os.path.splitext(file.filename)[0]}_images.zip"
-                    output_zip = session_dir / zip_filename
-                    with zipfile.ZipFile(str(output_zip), "w") as zip_file:
-                        for i, image in enumerate(images):
-                            temp_img_path = session_dir / f"page_{i+1}.{image_format}"
-                            image.save(
-                                str(temp_img_path),
-                                format="JPEG" if image_format.lower() == "jpg" else "PNG",
-                                quality=95 if image_format.lower() == "jpg" else None
-                            )
-                            zip_file.write(temp_img_path, f"page_{i+1}.{image_format}")
-                            temp_img_path.unlink()
-                    temp_pdf.unlink()
-                    return FileResponse(
-                        path=str(output_zip),
-                        filename=zip_filename,
+                    return StreamingResponse(
+                        stream_zip(_zip_entries(first_page, pages_iter, image_format)),
                         media_type="application/zip",
+                        headers={"Content-Disposition": content_disposition(zip_filename)},
                         background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
                     )
                 else:
                     output_img = output_path.with_suffix(f'.{image_format}')
-                    images[0].save(
-                        str(output_img),
-                        format="JPEG" if image_format.lower() == "jpg" else "PNG",
-                        quality=95 if image_format.lower() == "jpg" else None
-                    )
+                    async for _, image_path in pages_iter:
+                        image_path.replace(output_img)
                     temp_pdf.unlink()
                     return FileResponse(
                         path=str(output_img),
                         filename=f"{os.path.splitext(file.filename)[0]}.{image_format}",
                         background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
                     )
+            except HTTPException:
+                raise
             except Exception as e:
                 logger.error(f"PDF 이미지 변환 오류: {str(e)}")
                 raise HTTPException(status_code=500, detail=f"PDF를 이미지로 변환하는데 실패했습니다: {str(e)}")
@@ -150,7 +301,7 @@ async def convert_from_pdf(
             raise e
         raise HTTPException(status_code=500, detail=str(e))
 
-async def convert_pdf_to_docx_advanced(pdf_path, docx_path):
+def convert_pdf_to_docx_advanced(pdf_path, docx_path):
     """
     PDF를 DOCX로 변환하는 함수 - Microsoft Office Word 필요
     - Windows: Word COM 자동화 사용
@@ -166,8 +317,12 @@ async def convert_pdf_to_docx_advanced(pdf_path, docx_path):
     
     if platform.system() == "Windows":
         try:
+            import pythoncom
             import win32com.client
             
+            # 워커 스레드에서 COM을 사용하려면 스레드별 초기화가 필요합니다
+            pythoncom.CoInitialize()
+            
             # Word COM 객체 생성
             word = win32com.client.Dispatch("Word.Application")
             word.Visible = False
@@ -182,6 +337,7 @@ async def convert_pdf_to_docx_advanced(pdf_path, docx_path):
                 return True
             finally:
                 word.Quit()
+                pythoncom.CoUninitialize()
                 
         except Exception as e:
             logger.error(f"Windows conversion failed: {str(e)}")
@@ -189,9 +345,6 @@ async def convert_pdf_to_docx_advanced(pdf_path, docx_path):
             
     elif platform.system() == "Darwin":
         try:
-            import subprocess
-            import time
-            
             # AppleScript 명령어 생성
             applescript = f'''
                 tell application "Microsoft Word"
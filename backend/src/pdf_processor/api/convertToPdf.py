@@ -2,28 +2,256 @@ from fastapi import APIRouter, UploadFile, HTTPException, Form
 from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 from typing import List, Literal
+import codecs
 import os
-import sys
 import shutil
 from pathlib import Path
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase import pdfdoc
+from reportlab.lib.pagesizes import letter, legal, A3, A4, A5
 from io import BytesIO
-from xhtml2pdf import pisa
-import img2pdf
 
-from pdf_processor.utils import get_session_dir, parse_page_ranges
+from pdf_processor import fonts, metrics
+from pdf_processor.textmetrics import wrap_text
+from pdf_processor.utils import get_session_dir, save_upload, parse_page_ranges, InvalidInputError
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
+# TXT 변환에 사용할 수 있는 용지 크기
+TXT_PAGE_SIZES = {"letter": letter, "legal": legal, "a3": A3, "a4": A4, "a5": A5}
+# 한 번에 읽어 들이는 최대 글자 수 (줄바꿈 없이 매우 긴 줄도 메모리를 일정하게 사용)
+TXT_READ_CHARS = 64 * 1024
+# 인코딩 감지에 사용하는 앞부분 크기(바이트)
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+class _CompressingCanvas(canvas.Canvas):
+    """페이지가 끝날 때마다 내용 스트림을 압축하는 Canvas
+
+    reportlab은 저장할 때까지 모든 페이지 내용을 압축하지 않은 문자열로 들고 있기 때문에
+    수만 페이지짜리 문서에서는 메모리 사용량이 입력 텍스트의 몇 배가 됩니다.
+    압축한 페이지도 save()까지는 메모리에 남으므로 메모리 사용량은 여전히 페이지 수(압축된 출력 크기)에
+    비례합니다. 페이지 묶음을 파트 파일로 저장해 pypdf로 합치는 방식은 pypdf가 합칠 때 모든 객체를
+    메모리에 올려 오히려 더 많은 메모리를 사용합니다.
+
+    reportlab 내부 구조(_doc.Pages.pages, page.stream, page.Contents)를 사용하므로 requirements.txt에서
+    확인한 버전 범위로 고정해 두었고, 구조가 달라지면 압축하지 않고 reportlab 기본 동작을 따릅니다.
+    """
+
+    def showPage(self):
+        super().showPage()
+        pages = getattr(getattr(self._doc, "Pages", None), "pages", None)
+        page = pages[-1] if pages else None
+        if getattr(page, "stream", None) and not getattr(page, "Contents", None):
+            contents = pdfdoc.PDFStream(content=pdfdoc.PDFZCompress.encode(page.stream))
+            # Filter가 지정되어 있으면 저장 시 다시 압축하지 않습니다
+            contents.dictionary["Filter"] = pdfdoc.PDFArray([pdfdoc.PDFName(pdfdoc.PDFZCompress.pdfname)])
+            page.Contents = contents
+            page.stream = None
+
+def _detect_encoding(path) -> str:
+    """파일 앞부분으로 텍스트 인코딩 추정 (BOM -> UTF-8 -> CP949 -> Latin-1 순)"""
+    with open(path, "rb") as f:
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in ("utf-8", "cp949"):
+        try:
+            # 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않습니다
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+def _iter_paragraph_lines(f, font_name, font_size, max_width):
+    """텍스트 파일을 조금씩 읽으면서 줄바꿈된 줄을 생성
+
+    Yields:
+        (줄 문자열, 문단의 마지막 줄 여부, 빈 문단 여부)
+    """
+    carry = ""
+    # 줄바꿈 없이 읽은 조각이 있는지 (파일이 줄바꿈 없이 끝나는 경우 처리)
+    pending = False
+    while True:
+        chunk = f.readline(TXT_READ_CHARS)
+        if not chunk:
+            break
+        if chunk.endswith("\n"):
+            paragraph = carry + chunk.rstrip("\r\n")
+            carry = ""
+            pending = False
+            if not paragraph.strip():
+                yield "", True, True
+                continue
+            lines = wrap_text(paragraph, font_name, font_size, max_width)
+            for i, line in enumerate(lines):
+                yield line, i == len(lines) - 1, False
+            continue
+
+        # 문단이 아직 끝나지 않았으면 마지막 줄(과 잘린 단어)은 다음 조각과 이어서 줄바꿈합니다
+        pending = True
+        text = carry + chunk
+        cut = len(text)
+        while cut > 0 and not text[cut - 1].isspace():
+            cut -= 1
+        head, tail = (text[:cut], text[cut:]) if cut > 0 else (text, "")
+        lines = wrap_text(head, font_name, font_size, max_width)
+        if not lines:
+            carry = tail
+            continue
+        for line in lines[:-1]:
+            yield line, False, False
+        carry = lines[-1] + (" " + tail if cut > 0 else "")
+    if pending:
+        # 마지막 문단이 줄바꿈 없이 끝난 경우
+        lines = wrap_text(carry, font_name, font_size, max_width)
+        for i, line in enumerate(lines):
+            yield line, i == len(lines) - 1, False
+        if not lines:
+            yield "", True, True
+
+def _convert_txt(temp_path, output_path, page_size="letter", font_size=12.0, margin=50.0,
+                 encoding="auto", progress=None):
+    """TXT 파일을 PDF로 변환 (워커 프로세스에서 실행)
+
+    파일 전체를 메모리에 올리지 않고 한 줄씩 읽어 페이지를 만들고, 완성된 페이지는 바로 압축해
+    두므로 메모리 사용량은 입력 크기가 아니라 압축된 출력 크기에 비례합니다 (일정하지는 않음).
+    """
+    if page_size not in TXT_PAGE_SIZES:
+        raise InvalidInputError(f"지원하지 않는 용지 크기입니다: {page_size}")
+    width, height = TXT_PAGE_SIZES[page_size]
+    if font_size <= 0:
+        raise InvalidInputError("글자 크기는 0보다 커야 합니다")
+    if margin < 0 or width - 2 * margin < font_size or height - 2 * margin < font_size:
+        raise InvalidInputError("여백이 용지 크기에 비해 너무 큽니다")
+    if encoding == "auto":
+        encoding = _detect_encoding(temp_path)
+    else:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise InvalidInputError(f"지원하지 않는 인코딩입니다: {encoding}")
+
+    font_name = fonts.ensure_font('NotoSansKR')
+    # 기존 기본값(12pt 글자에 20pt 줄 간격)과 같은 비율
+    line_height = font_size * 20 / 12
+    max_width = width - 2 * margin
+    top = height - margin
+
+    c = _CompressingCanvas(str(output_path), pagesize=(width, height), pageCompression=1)
+    c.setFont(font_name, font_size)
+    y = top
+
+    total = os.path.getsize(temp_path)
+    reported = 0
+    if progress:
+        progress.start(total)
+    with metrics.phase("render"), open(temp_path, "r", encoding=encoding, errors="replace") as f:
+        for line, paragraph_end, blank in _iter_paragraph_lines(f, font_name, font_size, max_width):
+            if blank:
+                y -= line_height
+                if y <= margin:
+                    c.showPage()
+                    c.setFont(font_name, font_size)
+                    y = top
+            else:
+                if y <= margin:
+                    c.showPage()
+                    c.setFont(font_name, font_size)
+                    y = top
+                c.drawString(margin, y, line)
+                y -= line_height
+                if paragraph_end:
+                    y -= line_height * 0.5
+            if progress and paragraph_end:
+                # 읽은 바이트 수(버퍼 포함)로 진행률을 근사합니다
+                position = min(f.buffer.tell(), total)
+                if position > reported:
+                    progress.advance(position - reported)
+                    reported = position
+    metrics.count("pages", c.getPageNumber())
+    with metrics.phase("write"):
+        c.save()
+    if progress and reported < total:
+        progress.advance(total - reported)
+
+def _convert_html(temp_path, output_path):
+    """HTML 파일을 PDF로 변환 (워커 프로세스에서 실행)"""
+    # xhtml2pdf는 불러오는 데 오래 걸리므로 HTML 변환을 처음 요청할 때 불러옵니다
+    from xhtml2pdf import pisa
+
+    font_path = os.path.join(os.path.dirname(__file__), '..', '..', 'fonts', 'NotoSansKR-VariableFont_wght.ttf')
+    with open(temp_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    styled_html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            * {
+                font-family: HYSMyeongJo-Medium !important;
+            }
+        </style>
+    </head>
+    <body>
+    '''
+    styled_html += html_content
+    styled_html += '''
+    </body>
+    </html>
+    '''
+    result_pdf = BytesIO()
+    with metrics.phase("render"):
+        pisa_status = pisa.CreatePDF(
+            styled_html,
+            dest=result_pdf
+        )
+    if not pisa_status.err:
+        with metrics.phase("write"), open(output_path, 'wb') as f:
+            f.write(result_pdf.getvalue())
+    else:
+        raise RuntimeError("HTML을 PDF로 변환하는데 실패했습니다.")
+
+def _convert_images(image_paths, output_path, progress=None):
+    """이미지 파일들을 하나의 PDF로 변환 (워커 프로세스에서 실행)"""
+    import img2pdf
+
+    if progress:
+        progress.start(len(image_paths))
+    with metrics.phase("render"):
+        pdf_bytes = img2pdf.convert([str(p) for p in image_paths])
+    metrics.count("pages", len(image_paths))
+    with metrics.phase("write"), open(output_path, "wb") as output_file:
+        output_file.write(pdf_bytes)
+    if progress:
+        progress.advance(len(image_paths))
+
 @router.post("/convert-to-pdf")
 async def convert_to_pdf(
     files: List[UploadFile],
-    source_format: Literal["txt", "html", "image"] = Form(...)
+    source_format: Literal["txt", "html", "image"] = Form(...),
+    page_size: Literal["letter", "legal", "a3", "a4", "a5"] = Form("letter"),
+    font_size: float = Form(12),
+    margin: float = Form(50),
+    encoding: str = Form("auto")
 ):
-    """다른 형식의 파일들을 PDF로 변환"""
+    """다른 형식의 파일들을 PDF로 변환
+
+    page_size, font_size, margin(pt), encoding은 TXT 변환에만 사용합니다.
+    encoding이 auto이면 파일 내용으로 인코딩을 추정합니다.
+    """
     session_dir = get_session_dir()
     output_path = session_dir / "output.pdf"
     
@@ -33,113 +261,22 @@ async def convert_to_pdf(
                 raise HTTPException(status_code=400, detail="TXT 파일만 지원됩니다")
             
             temp_path = session_dir / f"temp_{files[0].filename}"
-            content = await files[0].read()
-            with open(temp_path, "wb") as buffer:
-                buffer.write(content)
+            await save_upload(files[0], temp_path)
             
-            if getattr(sys, '_MEIPASS', None):
-                font_path = os.path.join(sys._MEIPASS, 'pdf_processor', 'fonts', 'NotoSansKR-VariableFont_wght.ttf')
-            else:
-                font_path = os.path.join(os.path.dirname(__file__), '..', 'fonts', 'NotoSansKR-VariableFont_wght.ttf')
-            
-            with open(temp_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            
-            c = canvas.Canvas(str(output_path), pagesize=letter)
-            pdfmetrics.registerFont(TTFont('NotoSansKR', font_path))
-            c.setFont('NotoSansKR', 12)
-            margin = 50
-            line_height = 20
-            max_width = letter[0] - 2 * margin
-            y = letter[1] - margin
-            
-            def get_wrapped_lines(text, c, max_width):
-                lines = []
-                current_line = ''
-                for word in text.split():
-                    if c.stringWidth(word, 'NotoSansKR', 12) > max_width:
-                        if current_line:
-                            lines.append(current_line)
-                            current_line = ''
-                        temp_word = ''
-                        for char in word:
-                            char_width = c.stringWidth(temp_word + char, 'NotoSansKR', 12)
-                            if char_width <= max_width:
-                                temp_word += char
-                            else:
-                                lines.append(temp_word)
-                                temp_word = char
-                        if temp_word:
-                            current_line = temp_word
-                    else:
-                        test_line = current_line + ' ' + word if current_line else word
-                        if c.stringWidth(test_line, 'NotoSansKR', 12) <= max_width:
-                            current_line = test_line
-                        else:
-                            lines.append(current_line)
-                            current_line = word
-                if current_line:
-                    lines.append(current_line)
-                return lines
-            
-            for paragraph in text.split('\n'):
-                if not paragraph.strip():
-                    y -= line_height
-                    if y <= margin:
-                        c.showPage()
-                        c.setFont('NotoSansKR', 12)
-                        y = letter[1] - margin
-                    continue
-                wrapped_lines = get_wrapped_lines(paragraph, c, max_width)
-                for line in wrapped_lines:
-                    if y <= margin:
-                        c.showPage()
-                        c.setFont('NotoSansKR', 12)
-                        y = letter[1] - margin
-                    c.drawString(margin, y, line)
-                    y -= line_height
-                y -= line_height * 0.5
-            c.save()
+            # 텍스트 레이아웃 및 PDF 생성 (워커 풀에서 실행)
+            await run_cpu(
+                _convert_txt, temp_path, output_path, page_size, font_size, margin, encoding,
+                progress=current_progress(), size_hint=temp_path.stat().st_size
+            )
             temp_path.unlink()
         
         elif source_format == "html":
             if not files[0].filename.lower().endswith('.html'):
                 raise HTTPException(status_code=400, detail="HTML 파일만 지원됩니다")
             temp_path = session_dir / f"temp_{files[0].filename}"
-            with open(temp_path, "wb") as buffer:
-                content = await files[0].read()
-                buffer.write(content)
-            font_path = os.path.join(os.path.dirname(__file__), '..', '..', 'fonts', 'NotoSansKR-VariableFont_wght.ttf')
-            with open(temp_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            styled_html = '''
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    * {
-                        font-family: HYSMyeongJo-Medium !important;
-                    }
-                </style>
-            </head>
-            <body>
-            '''
-            styled_html += html_content
-            styled_html += '''
-            </body>
-            </html>
-            '''
-            result_pdf = BytesIO()
-            pisa_status = pisa.CreatePDF(
-                styled_html,
-                dest=result_pdf
-            )
-            if not pisa_status.err:
-                with open(output_path, 'wb') as f:
-                    f.write(result_pdf.getvalue())
-            else:
-                raise HTTPException(status_code=500, detail="HTML을 PDF로 변환하는데 실패했습니다.")
+            await save_upload(files[0], temp_path)
+            # HTML 렌더링 (워커 풀에서 실행)
+            await run_cpu(_convert_html, temp_path, output_path, size_hint=temp_path.stat().st_size)
             temp_path.unlink()
         
         elif source_format == "image":
@@ -148,13 +285,14 @@ async def convert_to_pdf(
             image_paths = []
             for i, file in enumerate(files):
                 temp_image = session_dir / f"temp_image_{i}_{file.filename}"
-                content = await file.read()
-                with open(temp_image, "wb") as buffer:
-                    buffer.write(content)
+                await save_upload(file, temp_image)
                 image_paths.append(temp_image)
             try:
-                with open(output_path, "wb") as output_file:
-                    output_file.write(img2pdf.convert([str(p) for p in image_paths]))
+                # 이미지 병합 (워커 풀에서 실행)
+                await run_cpu(
+                    _convert_images, image_paths, output_path,
+                    progress=current_progress(), size_hint=sum(p.stat().st_size for p in image_paths)
+                )
             finally:
                 for path in image_paths:
                     if path.exists():
@@ -170,4 +308,6 @@ async def convert_to_pdf(
         shutil.rmtree(session_dir, ignore_errors=True)
         if isinstance(e, HTTPException):
             raise e
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
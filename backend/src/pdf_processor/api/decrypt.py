@@ -2,11 +2,45 @@ from fastapi import UploadFile, HTTPException, Form, APIRouter
 from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 import shutil
-from pypdf import PdfReader, PdfWriter
-from pdf_processor.utils import get_session_dir
+from pypdf import PdfWriter
+from pdf_processor import metrics, pdfinput
+from pdf_processor.utils import get_session_dir, save_upload, InvalidInputError
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
+def _decrypt_file(temp_path, output_path, password: str, progress=None):
+    """PDF 복호화 작업 (워커 프로세스에서 실행)"""
+    # 큰 파일은 mmap으로 열리므로 결과를 다 쓸 때까지 with 블록 안에서 처리합니다
+    with pdfinput.open_pdf(temp_path) as reader:
+        # 암호화 여부 확인
+        if not reader.is_encrypted:
+            raise InvalidInputError("암호화되지 않은 PDF 파일입니다")
+
+        try:
+            # 비밀번호로 복호화 시도
+            reader.decrypt(password)
+        except:
+            raise InvalidInputError("잘못된 비밀번호입니다")
+
+        # 복호화된 PDF 생성
+        writer = PdfWriter()
+
+        # 모든 페이지 복사
+        if progress:
+            progress.start(len(reader.pages))
+        with metrics.phase("copy"):
+            for page in reader.pages:
+                writer.add_page(page)
+                if progress:
+                    progress.advance()
+        metrics.count("pages", len(writer.pages))
+
+        # 결과 저장
+        with metrics.phase("write"), open(output_path, "wb") as output_file:
+            writer.write(output_file)
+
 @router.post("/decrypt")
 async def decrypt_pdf(
     file: UploadFile,
@@ -26,33 +60,13 @@ async def decrypt_pdf(
 
     try:
         # 업로드된 파일 저장
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload(file, temp_path)
 
-        # PDF 처리
-        reader = PdfReader(temp_path)
-        
-        # 암호화 여부 확인
-        if not reader.is_encrypted:
-            raise HTTPException(status_code=400, detail="암호화되지 않은 PDF 파일입니다")
-
-        try:
-            # 비밀번호로 복호화 시도
-            reader.decrypt(password)
-        except:
-            raise HTTPException(status_code=400, detail="잘못된 비밀번호입니다")
-
-        # 복호화된 PDF 생성
-        writer = PdfWriter()
-        
-        # 모든 페이지 복사
-        for page in reader.pages:
-            writer.add_page(page)
-
-        # 결과 저장
-        with open(output_path, "wb") as output_file:
-            writer.write(output_file)
+        # PDF 처리 (워커 풀에서 실행)
+        await run_cpu(
+            _decrypt_file, temp_path, output_path, password,
+            progress=current_progress(), size_hint=temp_path.stat().st_size
+        )
 
         # 임시 파일 삭제
         temp_path.unlink()
@@ -68,4 +82,6 @@ async def decrypt_pdf(
         shutil.rmtree(session_dir, ignore_errors=True)
         if isinstance(e, HTTPException):
             raise e
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
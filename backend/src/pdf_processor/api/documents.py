@@ -0,0 +1,55 @@
+import shutil
+
+from fastapi import APIRouter, UploadFile, HTTPException
+
+from pdf_processor import documents
+from pdf_processor.utils import save_upload
+from pdf_processor.executor import run_cpu
+
+router = APIRouter()
+
+def _count_pages(path) -> int:
+    """페이지 수 확인 (워커에서 실행하면 그 워커의 PdfReader 캐시도 채워집니다)"""
+    from pdf_processor import pageops
+
+    with documents.open_reader(path) as reader:
+        return pageops.page_count(reader)
+
+@router.post("/documents")
+async def create_document(file: UploadFile):
+    """PDF를 한 번 업로드하여 등록하고 문서 ID를 반환
+
+    반환된 document_id는 분할/회전/워터마크/편집 요청에서 file 대신 사용할 수 있습니다.
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="PDF 파일만 지원됩니다")
+
+    document_dir = documents.create_document_dir()
+    path = document_dir / "document.pdf"
+    try:
+        size = await save_upload(file, path)
+        pages = await run_cpu(_count_pages, path, size_hint=size)
+    except HTTPException:
+        shutil.rmtree(document_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(document_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=f"PDF 파일을 읽을 수 없습니다: {e}")
+    return documents.add_document(file.filename, path, size, pages).to_dict()
+
+@router.get("/documents")
+async def list_documents():
+    """등록된 문서 목록과 API 서버 프로세스의 PdfReader 캐시 통계"""
+    return {
+        "documents": [document.to_dict() for document in documents.list_documents()],
+        "reader_cache": documents.reader_cache_stats(),
+    }
+
+@router.get("/documents/{document_id}")
+async def get_document(document_id: str):
+    return documents.get_document(document_id).to_dict()
+
+@router.delete("/documents/{document_id}")
+async def delete_document(document_id: str):
+    documents.delete_document(document_id)
+    return {"deleted": True}
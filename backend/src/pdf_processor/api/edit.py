@@ -1,40 +1,68 @@
 # --- api/edit.py (수정됨) ---
 
-import io
 import json
 from urllib.parse import quote # <<< urllib.parse.quote 임포트
+from typing import Literal
 from fastapi import APIRouter, HTTPException, File, UploadFile, Form
-from fastapi.responses import StreamingResponse
-from pdf_processor import editor
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+import shutil
+from pdf_processor import documents, editor
+from pdf_processor.utils import get_session_dir, save_upload
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
 @router.post("/edit")
 async def edit_pdf_api(
-    file: UploadFile = File(...), 
-    elements: str = Form(...)
+    file: UploadFile = File(None), 
+    elements: str = Form(...),
+    save_mode: Literal["full", "incremental"] = Form("full"),
+    document_id: str = Form(None)
 ):
     """
     PDF 파일과 편집 요소 목록(JSON 문자열)을 받아 PDF를 수정한 후
     결과 파일을 반환합니다.
     - file: 업로드된 PDF 파일
     - elements: PDFEditElement[] 형식의 JSON 문자열
+    - save_mode: "incremental"이면 편집한 페이지만 원본 뒤에 증분 업데이트로 덧붙임
+    - document_id: file 대신 POST /documents로 등록한 문서를 편집
     """
-    if not file.content_type == "application/pdf":
+    if document_id is None and file is None:
+        raise HTTPException(status_code=400, detail="file 또는 document_id를 지정해야 합니다")
+    if file is not None and not file.content_type == "application/pdf":
         raise HTTPException(status_code=400, detail="PDF 파일만 업로드할 수 있습니다.")
 
+    session_dir = get_session_dir()
+    temp_path = session_dir / "temp_input.pdf"
+    output_path = session_dir / "edited.pdf"
+
     try:
-        pdf_bytes = await file.read()
-        pdf_stream = io.BytesIO(pdf_bytes)
+        if document_id:
+            # 등록된 문서는 보관 중인 파일을 그대로 사용
+            document = documents.get_document(document_id)
+            temp_path, original_filename = document.path, document.filename
+        else:
+            # 업로드된 파일 저장
+            await save_upload(file, temp_path)
+            original_filename = file.filename if file.filename else "unknown.pdf"
 
-        edited_pdf_bytes = editor.apply_edits_to_pdf(
-            pdf_file_stream=pdf_stream,
-            elements_json=elements
+        # PDF 편집 (워커 풀에서 실행, 결과는 세션 디렉토리의 파일로 바로 기록)
+        await run_cpu(
+            editor.apply_edits_to_pdf,
+            pdf_file_stream=temp_path,
+            elements_json=elements,
+            output_path=output_path,
+            save_mode=save_mode,
+            progress=current_progress(),
+            size_hint=temp_path.stat().st_size
         )
+        if not document_id:
+            temp_path.unlink()
         
         # *** 여기가 수정된 부분입니다 ***
         # 파일 이름을 URL 인코딩하여 안전하게 만듭니다.
-        original_filename = file.filename if file.filename else "unknown.pdf"
         encoded_filename = quote(f"edited_{original_filename}")
         
         # 표준에 맞는 Content-Disposition 헤더 생성
@@ -43,15 +71,21 @@ async def edit_pdf_api(
             'Content-Disposition': f"attachment; filename*=UTF-8''{encoded_filename}"
         }
 
-        # 결과 파일을 스트리밍으로 응답
-        return StreamingResponse(
-            io.BytesIO(edited_pdf_bytes),
+        # 결과 파일을 청크 단위로 스트리밍 응답 (메모리에 전체 결과를 올리지 않음)
+        return FileResponse(
+            path=str(output_path),
             media_type="application/pdf",
-            headers=headers
+            headers=headers,
+            background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
         )
 
+    except HTTPException:
+        shutil.rmtree(session_dir, ignore_errors=True)
+        raise
     except json.JSONDecodeError:
+        shutil.rmtree(session_dir, ignore_errors=True)
         raise HTTPException(status_code=422, detail="잘못된 형식의 elements 데이터입니다.")
     except Exception as e:
+        shutil.rmtree(session_dir, ignore_errors=True)
         print(f"PDF 편집 중 에러 발생: {e}")
         raise HTTPException(status_code=500, detail=f"PDF 편집에 실패했습니다: {str(e)}")
\ No newline at end of file
@@ -2,11 +2,41 @@ from fastapi import UploadFile, HTTPException, Form, APIRouter
 from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 import shutil
-from pypdf import PdfReader, PdfWriter
-from pdf_processor.utils import get_session_dir
+from pypdf import PdfWriter
+from pdf_processor import metrics, pdfinput
+from pdf_processor.utils import get_session_dir, save_upload
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
+def _encrypt_file(temp_path, output_path, password: str, progress=None):
+    """PDF 암호화 작업 (워커 프로세스에서 실행)"""
+    # 큰 파일은 mmap으로 열리므로 결과를 다 쓸 때까지 with 블록 안에서 처리합니다
+    with pdfinput.open_pdf(temp_path) as reader:
+        writer = PdfWriter()
+
+        # 모든 페이지 복사
+        if progress:
+            progress.start(len(reader.pages))
+        with metrics.phase("copy"):
+            for page in reader.pages:
+                writer.add_page(page)
+                if progress:
+                    progress.advance()
+        metrics.count("pages", len(writer.pages))
+
+        # 암호화 설정 (AES-256-R5 알고리즘 사용)
+        writer.encrypt(
+            user_password=password,
+            owner_password=password,  # 소유자 비밀번호도 동일하게 설정
+            algorithm="AES-256-R5"  # 권장되는 안전한 암호화 알고리즘
+        )
+
+        # 결과 저장
+        with metrics.phase("write"), open(output_path, "wb") as output_file:
+            writer.write(output_file)
+
 @router.post("/encrypt")
 async def encrypt_pdf(
     file: UploadFile,
@@ -30,29 +60,15 @@ async def encrypt_pdf(
 
     try:
         # 업로드된 파일 저장
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-
-        # PDF 처리
-        reader = PdfReader(temp_path)
-        writer = PdfWriter()
+        await save_upload(file, temp_path)
 
-        # 모든 페이지 복사
-        for page in reader.pages:
-            writer.add_page(page)
-
-        # 암호화 설정 (AES-256-R5 알고리즘 사용)
-        writer.encrypt(
-            user_password=password,
-            owner_password=password,  # 소유자 비밀번호도 동일하게 설정
-            algorithm="AES-256-R5"  # 권장되는 안전한 암호화 알고리즘
+        # PDF 암호화 (워커 풀에서 실행)
+        # 캐시 키로 비밀번호를 추측할 수 있으므로 결과 캐시는 사용하지 않습니다
+        await run_cpu(
+            _encrypt_file, temp_path, output_path, password,
+            progress=current_progress(), size_hint=temp_path.stat().st_size
         )
 
-        # 결과 저장
-        with open(output_path, "wb") as output_file:
-            writer.write(output_file)
-
         # 임시 파일 삭제
         temp_path.unlink()
 
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from pdf_processor import config, executor, fonts, startup, tempstore, warmup
+
+router = APIRouter()
+
+@router.get("/health")
+async def health():
+    """서버 상태
+
+    - ready: 요청을 처리할 수 있음 (이 응답을 받았다면 항상 true)
+    - warm: 백그라운드 예열이 끝나 첫 요청도 평소와 같은 시간에 처리됨
+    """
+    return {
+        "status": "ok",
+        "ready": True,
+        "warm": warmup.is_warm(),
+        "warmup": warmup.warmup_stats(),
+        "startup": startup.startup_stats(),
+        "workers": config.MAX_WORKERS,
+        "pending_tasks": executor.pending_tasks(),
+        "fonts": fonts.font_stats(),
+        "temp": tempstore.stats(),
+    }
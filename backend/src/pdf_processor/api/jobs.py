@@ -0,0 +1,84 @@
+import inspect
+from typing import Callable
+
+from fastapi import APIRouter
+from fastapi.responses import FileResponse, JSONResponse
+
+from pdf_processor import jobs
+from .split import split_pdf
+from .merge import merge_pdfs
+from .rotate import rotate_pdf
+from .convertToPdf import convert_to_pdf
+from .convertFromPdf import convert_from_pdf
+from .addWatermark import add_watermark
+from .encrypt import encrypt_pdf
+from .decrypt import decrypt_pdf
+from .edit import edit_pdf_api
+from .pipeline import run_pipeline
+from .batch import batch_rotate, batch_add_watermark, batch_encrypt, batch_decrypt
+
+router = APIRouter()
+
+# 비동기 작업으로 실행할 수 있는 작업과 해당 라우터 함수
+JOB_OPERATIONS = {
+    "split": split_pdf,
+    "merge": merge_pdfs,
+    "rotate": rotate_pdf,
+    "convert-to-pdf": convert_to_pdf,
+    "convert-from-pdf": convert_from_pdf,
+    "add-watermark": add_watermark,
+    "encrypt": encrypt_pdf,
+    "decrypt": decrypt_pdf,
+    "edit": edit_pdf_api,
+    "pipeline": run_pipeline,
+    "batch/rotate": batch_rotate,
+    "batch/add-watermark": batch_add_watermark,
+    "batch/encrypt": batch_encrypt,
+    "batch/decrypt": batch_decrypt,
+}
+
+def _make_job_endpoint(operation: str, endpoint: Callable):
+    """라우터 함수와 같은 폼 파라미터를 받아 작업으로 등록하는 엔드포인트 생성"""
+    async def create_job(**kwargs):
+        job = await jobs.submit_job(operation, endpoint, kwargs)
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    # FastAPI가 원래 라우터 함수와 동일하게 폼/파일 파라미터를 파싱하도록 시그니처를 복사합니다
+    create_job.__signature__ = inspect.signature(endpoint)
+    create_job.__name__ = f"create_{endpoint.__name__}_job"
+    create_job.__doc__ = f"'{operation}' 작업을 비동기로 실행하고 작업 ID를 바로 반환"
+    return create_job
+
+for _operation, _endpoint in JOB_OPERATIONS.items():
+    router.add_api_route(
+        f"/jobs/{_operation}",
+        _make_job_endpoint(_operation, _endpoint),
+        methods=["POST"],
+        status_code=202,
+    )
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """작업 상태 및 페이지 단위 진행률 조회"""
+    job = await jobs.find_job(job_id)
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """완료된 작업의 결과 파일 다운로드"""
+    job = await jobs.find_job(job_id)
+    if job.status == "failed":
+        return JSONResponse(status_code=job.status_code or 500, content={"detail": job.error})
+    if job.status != "completed" or job.result_path is None:
+        return JSONResponse(status_code=409, content={"detail": "작업이 아직 완료되지 않았습니다", "status": job.status})
+    return FileResponse(
+        path=str(job.result_path),
+        filename=job.result_filename,
+        media_type=job.media_type
+    )
+
+@router.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """작업 취소 및 결과 파일 삭제"""
+    await jobs.delete_job(job_id)
+    return {"id": job_id, "deleted": True}
@@ -1,58 +1,145 @@
-from fastapi import APIRouter, UploadFile, HTTPException
+from fastapi import APIRouter, UploadFile, HTTPException, Form
 from fastapi.responses import FileResponse
-from typing import List
+from contextlib import ExitStack
+from typing import Dict, List, Optional
 from pathlib import Path
 from starlette.background import BackgroundTask
-from pypdf import PdfReader, PdfWriter
+from pypdf import PdfWriter
+import asyncio
 import shutil
 import os
+import time
 
-from pdf_processor.utils import get_session_dir
+from pdf_processor import metrics, pageops, pdfinput
+from pdf_processor.utils import get_session_dir, save_upload, InvalidInputError
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
+# 병합 통계 응답 헤더 (app.py의 CORS expose_headers에도 등록되어 있어야 합니다)
+MERGE_STATS_HEADERS = (
+    "X-Merge-Pages",
+    "X-Merge-Deduplicated-Objects",
+    "X-Merge-Bytes-Saved",
+    # 모든 입력을 열어 확인(파싱)하는 데 걸린 시간
+    "X-Merge-Inspect-Ms",
+    # 페이지 복사, 중복 제거, 저장에 걸린 시간
+    "X-Merge-Build-Ms",
+)
+
+def _open_input(inputs: ExitStack, temp_path: Path, filename: str, pages: Optional[str]):
+    """입력 파일을 열어 확인하고 (PdfReader, 병합할 페이지 번호 목록)을 반환 (워커 프로세스에서 실행)
+
+    페이지 번호 목록은 모든 페이지를 병합하면 None입니다.
+    Raises:
+        InvalidInputError: 읽을 수 없거나 암호화된 파일, 잘못된 페이지 범위
+    """
+    try:
+        reader = inputs.enter_context(pdfinput.open_pdf(temp_path))
+        if reader.is_encrypted:
+            raise InvalidInputError(f"{filename}: 암호화된 PDF는 병합할 수 없습니다")
+        total_pages = pageops.page_count(reader)
+    except InvalidInputError:
+        raise
+    except Exception as e:
+        raise InvalidInputError(f"{filename}: PDF 파일을 읽을 수 없습니다 ({e})")
+
+    if not pages or pages.strip().lower() == "all":
+        return reader, None
+    try:
+        return reader, sorted(pageops.select_pages(pages, total_pages))
+    except InvalidInputError as e:
+        raise InvalidInputError(f"{filename}: {e}")
+
+def _merge_files(temp_files: List[Path], filenames: List[str], page_ranges: List[Optional[str]],
+                 output_path: Path, progress=None) -> Dict[str, float]:
+    """저장된 PDF 파일들을 확인한 뒤 순서대로 병합하고 통계를 반환 (워커 프로세스에서 실행)
+
+    모든 입력을 먼저 열어 확인하므로 잘못된 파일이 있으면 병합을 시작하기 전에 오류를 발생시키며,
+    확인할 때 파싱한 PdfReader를 그대로 병합에 사용합니다 (파일마다 한 번만 파싱).
+    모든 페이지를 병합하는 파일은 책갈피와 함께 통째로 추가하고, 페이지를 지정한 파일은
+    선택한 페이지만 추가합니다. 저장하기 전에 입력 파일들 사이에 중복된 스트림을 합칩니다.
+    """
+    merger = PdfWriter()
+    if progress:
+        progress.start(len(temp_files))
+    # 큰 입력 파일은 mmap으로 열리므로 결과를 다 쓸 때까지 모두 열어 둡니다
+    with ExitStack() as inputs:
+        started = time.perf_counter()
+        opened = [_open_input(inputs, *item) for item in zip(temp_files, filenames, page_ranges)]
+        inspected = time.perf_counter()
+        for reader, page_numbers in opened:
+            with metrics.phase("copy"):
+                if page_numbers is None:
+                    merger.append(reader)
+                else:
+                    for page in pageops.selected_pages(reader, page_numbers):
+                        merger.add_page(page)
+            if progress:
+                progress.advance()
+        metrics.count("pages", len(merger.pages))
+
+        with metrics.phase("dedupe"):
+            deduplicated, bytes_saved = pageops.deduplicate_streams(merger)
+
+        # 결과 저장
+        with metrics.phase("write"), open(output_path, "wb") as output_file:
+            merger.write(output_file)
+    return {
+        "pages": len(merger.pages), "deduplicated": deduplicated, "bytes_saved": bytes_saved,
+        "inspect_ms": (inspected - started) * 1000, "build_ms": (time.perf_counter() - inspected) * 1000,
+    }
+
 @router.post("/merge")
-async def merge_pdfs(files: List[UploadFile]):
-    """여러 PDF 파일을 하나로 병합"""
+async def merge_pdfs(files: List[UploadFile], pages: List[str] = Form(None)):
+    """여러 PDF 파일을 하나로 병합
+
+    - pages: 파일마다 병합할 페이지 범위 (파일 순서대로, 예: "1-3,5" 또는 "all")
+    응답 헤더로 병합한 페이지 수, 중복 제거로 줄어든 크기, 단계별 소요 시간을 반환합니다.
+    """
     if not all(file.filename.lower().endswith('.pdf') for file in files):
         raise HTTPException(status_code=400, detail="모든 파일은 PDF 형식이어야 합니다")
-    
+    if pages and len(pages) != len(files):
+        raise HTTPException(status_code=400, detail="페이지 범위는 파일 수만큼 지정해야 합니다")
+
     session_dir = get_session_dir()
-    temp_files = []
+    # 같은 이름의 파일을 여러 번 병합해도 덮어쓰지 않도록 순번을 붙입니다
+    temp_files = [session_dir / f"temp_{i}_{Path(file.filename).name}" for i, file in enumerate(files)]
     output_path = session_dir / "merged.pdf"
-    
+
     try:
-        merger = PdfWriter()
-        
-        for file in files:
-            temp_path = session_dir / f"temp_{file.filename}"
-            temp_files.append(temp_path)
-            
-            # 파일 저장
-            content = await file.read()
-            with open(temp_path, "wb") as buffer:
-                buffer.write(content)
-            
-            # PDF 병합
-            reader = PdfReader(temp_path)
-            merger.append(reader)
-        
-        # 결과 저장
-        with open(output_path, "wb") as output_file:
-            merger.write(output_file)
-        
+        # 파일 저장
+        await asyncio.gather(*(save_upload(file, path) for file, path in zip(files, temp_files)))
+
+        # 입력 파일 확인과 병합 (워커 풀에서 실행, 잘못된 파일은 병합 전에 400으로 반환)
+        stats = await run_cpu(
+            _merge_files, temp_files, [file.filename for file in files], pages or [None] * len(files),
+            output_path, progress=current_progress(), size_hint=sum(p.stat().st_size for p in temp_files)
+        )
+
         # 임시 파일 삭제
         for temp_file in temp_files:
             if temp_file.exists():
                 temp_file.unlink()
-        
+
+        headers = dict(zip(MERGE_STATS_HEADERS, (
+            str(stats["pages"]),
+            str(stats["deduplicated"]),
+            str(stats["bytes_saved"]),
+            f"{stats['inspect_ms']:.0f}",
+            f"{stats['build_ms']:.0f}",
+        )))
         return FileResponse(
             path=str(output_path),
             filename="merged.pdf",
+            headers=headers,
             background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
         )
-    
+
     except Exception as e:
         # 오류 발생 시 세션 디렉토리 정리
         shutil.rmtree(session_dir, ignore_errors=True)
-        raise e
\ No newline at end of file
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise e
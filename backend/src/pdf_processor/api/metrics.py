@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from pdf_processor import metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """요청 처리 시간, 단계별 시간, 입출력 크기, 페이지 수, 워커 최대 RSS 히스토그램 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,226 @@
+from fastapi import APIRouter, UploadFile, HTTPException, Form
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from typing import Any, Dict, List
+from pathlib import Path
+from pypdf import PdfWriter
+import json
+import shutil
+
+from pdf_processor import documents, editor, metrics, pageops, cache as result_cache
+from pdf_processor.utils import get_session_dir, save_upload, InvalidInputError
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
+from .addWatermark import stamp_watermark
+
+router = APIRouter()
+
+MAX_PIPELINE_STEPS = 20
+WATERMARK_POSITIONS = ("center", "tile", "top-left", "top-right", "bottom-left", "bottom-right")
+
+def _as_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return bool(value)
+
+def _parse_step(step: Dict[str, Any], has_image: bool) -> Dict[str, Any]:
+    """단계 하나를 검증하고 각 엔드포인트의 기본값을 채움"""
+    op = step.get("op")
+    if op == "rotate":
+        angle = int(step["angle"])
+        if angle not in [90, 180, 270]:
+            raise InvalidInputError("회전 각도는 90, 180, 270만 지원됩니다")
+        return {
+            "op": op, "pages": str(step.get("pages", "all")), "angle": angle,
+            "include_unspecified": _as_bool(step.get("include_unspecified", True)),
+        }
+    if op == "split":
+        return {"op": op, "pages": str(step["pages"])}
+    if op == "add-watermark":
+        watermark_type = step.get("watermark_type", "text")
+        if watermark_type not in ("text", "image"):
+            raise InvalidInputError("watermark_type은 text 또는 image여야 합니다")
+        if watermark_type == "image" and not has_image:
+            raise InvalidInputError("이미지 워터마크에는 watermark_image 파일이 필요합니다")
+        position = step.get("position", "center")
+        if position not in WATERMARK_POSITIONS:
+            raise InvalidInputError(f"지원하지 않는 워터마크 위치입니다: {position}")
+        return {
+            "op": op, "pages": str(step.get("pages", "all")),
+            # /add-watermark 엔드포인트와 같은 옵션 사전
+            "options": {
+                "watermark_type": watermark_type, "watermark_text": step.get("watermark_text"),
+                "opacity": float(step.get("opacity", 0.5)), "rotation": int(step.get("rotation", 0)),
+                "position": position, "font_size": int(step.get("font_size", 40)),
+                "font_name": "NotoSansKR", "font_color": str(step.get("font_color", "#000000")),
+                "is_bold": _as_bool(step.get("font_bold", False)),
+            },
+        }
+    if op == "edit":
+        elements = step["elements"]
+        if not isinstance(elements, str):
+            elements = json.dumps(elements, ensure_ascii=False)
+        return {"op": op, "elements": elements}
+    if op == "encrypt":
+        password = step["password"]
+        if not isinstance(password, str) or not password:
+            raise InvalidInputError("암호화 비밀번호를 입력해야 합니다")
+        return {"op": op, "password": password}
+    raise InvalidInputError(f"지원하지 않는 작업입니다: {op}")
+
+def parse_steps(steps_json: str, has_image: bool = False) -> List[Dict[str, Any]]:
+    """steps 폼 필드(JSON 배열)를 검증된 단계 목록으로 변환"""
+    try:
+        raw_steps = json.loads(steps_json)
+    except json.JSONDecodeError:
+        raise InvalidInputError("steps는 JSON 배열이어야 합니다")
+    if not isinstance(raw_steps, list) or not raw_steps:
+        raise InvalidInputError("steps에 하나 이상의 단계를 지정해야 합니다")
+    if len(raw_steps) > MAX_PIPELINE_STEPS:
+        raise InvalidInputError(f"단계는 최대 {MAX_PIPELINE_STEPS}개까지 지정할 수 있습니다")
+
+    steps = []
+    for index, step in enumerate(raw_steps, start=1):
+        if not isinstance(step, dict):
+            raise InvalidInputError(f"{index}번째 단계는 객체여야 합니다")
+        try:
+            steps.append(_parse_step(step, has_image))
+        except InvalidInputError as e:
+            raise InvalidInputError(f"{index}번째 단계: {e}")
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidInputError(f"{index}번째 단계의 옵션이 올바르지 않습니다: {e}")
+    if any(step["op"] == "encrypt" for step in steps[:-1]):
+        # 암호화는 저장할 때 적용되므로 뒤에 다른 단계가 올 수 없습니다
+        raise InvalidInputError("encrypt는 마지막 단계여야 합니다")
+    return steps
+
+def _apply_step(step: Dict[str, Any], pages: list, target, image_path=None) -> list:
+    """현재 페이지 목록에 단계 하나를 적용하고 새 페이지 목록을 반환
+
+    페이지 번호는 이전 단계까지 적용한 문서 기준입니다.
+    """
+    op = step["op"]
+    if op == "rotate":
+        selected = pageops.select_pages(step["pages"], len(pages))
+        for page_number in selected:
+            pages[page_number - 1].rotate(step["angle"])
+        if not step["include_unspecified"]:
+            pages = [pages[n - 1] for n in sorted(selected)]
+    elif op == "split":
+        selected = sorted(pageops.select_pages(step["pages"], len(pages), allow_all=False))
+        pages = [pages[n - 1] for n in selected]
+    elif op == "add-watermark":
+        selected = sorted(pageops.select_pages(step["pages"], len(pages)))
+        stamp_watermark(target, [pages[n - 1] for n in selected], step["options"], image_path)
+    elif op == "edit":
+        elements_by_page = editor.group_elements_by_page(step["elements"])
+        page_numbers = editor.edited_page_numbers(elements_by_page, len(pages))
+        editor.stamp_elements(target, [(n, pages[n - 1]) for n in page_numbers], elements_by_page)
+    return pages
+
+def _run_pipeline(temp_path, output_path, steps: List[Dict[str, Any]], image_path=None, progress=None):
+    """원본을 한 번 파싱하여 모든 단계를 적용하고 마지막에 한 번만 저장 (워커 프로세스에서 실행)
+
+    단계들은 원본 페이지의 복사본을 수정하고, 오버레이 등 새 객체는 하나의 PdfWriter에 추가됩니다.
+    """
+    writer = PdfWriter()
+    target = pageops.WriterTarget(writer)
+    if progress:
+        progress.start(len(steps) + 1)
+
+    with documents.open_reader(temp_path) as reader:
+        total_pages = pageops.page_count(reader)
+        pages = pageops.selected_pages(reader, range(1, total_pages + 1))
+
+        stamped = dropped_after_stamp = False
+        for step in steps:
+            page_count = len(pages)
+            pages = _apply_step(step, pages, target, image_path)
+            stamped = stamped or step["op"] in ("add-watermark", "edit")
+            dropped_after_stamp = dropped_after_stamp or (stamped and len(pages) < page_count)
+            if progress:
+                progress.advance()
+
+        with metrics.phase("copy"):
+            for page in pages:
+                writer.add_page(page)
+        metrics.count("pages", len(pages))
+        if dropped_after_stamp:
+            # 오버레이를 그린 뒤 제외된 페이지의 오버레이 객체는 저장하지 않습니다
+            writer.compress_identical_objects(remove_identicals=False, remove_orphans=True)
+        if steps[-1]["op"] == "encrypt":
+            writer.encrypt(
+                user_password=steps[-1]["password"],
+                owner_password=steps[-1]["password"],
+                algorithm="AES-256-R5"
+            )
+        with metrics.phase("write"), open(output_path, "wb") as output_file:
+            writer.write(output_file)
+    if progress:
+        progress.advance()
+
+@router.post("/pipeline")
+async def run_pipeline(
+    file: UploadFile = None,
+    steps: str = Form(...),
+    watermark_image: UploadFile = None,
+    document_id: str = Form(None)
+):
+    """여러 작업을 한 번의 요청으로 차례로 적용
+
+    steps는 단계 객체의 JSON 배열이며, 각 단계의 옵션은 해당 엔드포인트의 폼 필드와 같습니다.
+    - {"op": "rotate", "pages": "1-3", "angle": 90, "include_unspecified": true}
+    - {"op": "split", "pages": "1-3,5"}
+    - {"op": "add-watermark", "watermark_type": "text", "watermark_text": "...", "pages": "all", ...}
+      (이미지 워터마크는 watermark_image 파일을 함께 업로드)
+    - {"op": "edit", "elements": [...]}
+    - {"op": "encrypt", "password": "..."} (마지막 단계만 가능)
+    페이지 번호는 이전 단계까지 적용한 문서 기준이며, 문서는 한 번만 파싱하고 마지막에 한 번만 저장합니다.
+    file 대신 POST /documents로 등록한 document_id를 지정할 수 있습니다.
+    """
+    if file is not None and not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="PDF 파일만 지원됩니다")
+    try:
+        parsed_steps = parse_steps(steps, has_image=watermark_image is not None)
+    except InvalidInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session_dir = get_session_dir()
+
+    try:
+        # 등록된 문서(document_id)이면 보관 중인 파일을 그대로 사용
+        temp_path, filename = await documents.resolve_input(file, document_id, session_dir)
+        output_path = session_dir / f"processed_{Path(filename).name}"
+
+        image_path = None
+        if watermark_image is not None:
+            image_path = session_dir / f"image_{Path(watermark_image.filename or 'watermark').name}"
+            await save_upload(watermark_image, image_path)
+
+        # 같은 파일/단계의 결과가 캐시에 있으면 재사용, 없으면 처리 후 저장 (워커 풀에서 실행)
+        # encrypt 단계가 있으면 캐시 키로 비밀번호를 추측할 수 있으므로 캐시하지 않습니다
+        cache_key = None
+        if parsed_steps[-1]["op"] != "encrypt":
+            cache_key = await result_cache.make_key(
+                "pipeline", [temp_path] + ([image_path] if image_path else []), {"steps": parsed_steps}
+            )
+        if not await result_cache.fetch(cache_key, output_path):
+            await run_cpu(
+                _run_pipeline, temp_path, output_path, parsed_steps, image_path,
+                progress=current_progress(), size_hint=temp_path.stat().st_size
+            )
+            await result_cache.store(cache_key, output_path)
+
+        return FileResponse(
+            path=str(output_path),
+            filename=f"processed_{filename}",
+            background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
+        )
+
+    except Exception as e:
+        shutil.rmtree(session_dir, ignore_errors=True)
+        if isinstance(e, HTTPException):
+            raise e
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
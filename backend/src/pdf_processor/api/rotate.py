@@ -1,89 +1,85 @@
 from fastapi import APIRouter, UploadFile, HTTPException, Form
 from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
-from pypdf import PdfReader, PdfWriter
 import shutil
+from pathlib import Path
 from typing import List
-from pdf_processor.utils import get_session_dir, parse_page_ranges
+from pdf_processor import documents, pageops, cache as result_cache
+from pdf_processor.utils import get_session_dir, InvalidInputError
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
+def _rotate_file(temp_path, output_path, pages: str, angle: int, include_unspecified: bool, progress=None):
+    """페이지 회전 작업 (워커 프로세스에서 실행)"""
+    with documents.open_reader(temp_path) as reader:
+        total_pages = pageops.page_count(reader)
+
+    # 'all'인 경우 모든 페이지를 회전
+    pages_to_rotate = pageops.select_pages(pages, total_pages)
+
+    if include_unspecified:
+        # 모든 페이지를 유지하면 회전한 페이지만 원본 뒤에 덧붙여 저장
+        if pageops.rotate_pages_incremental(temp_path, output_path, pages_to_rotate, angle, progress=progress):
+            return
+        page_numbers = range(1, total_pages + 1)
+    else:
+        # 지정하지 않은 페이지는 제외
+        page_numbers = sorted(pages_to_rotate)
+
+    pageops.extract_pages(
+        temp_path, output_path, page_numbers,
+        rotate=pages_to_rotate, angle=angle, progress=progress
+    )
+
 @router.post("/rotate")
 async def rotate_pdf(
-    file: UploadFile,
+    file: UploadFile = None,
+    document_id: str = Form(None),
     pages: str = Form(...),
     angle: int = Form(...),
     include_unspecified: bool = Form(...)
 ):
-    """PDF 페이지 회전"""
-    if not file.filename.lower().endswith('.pdf'):
+    """PDF 페이지 회전 (file 대신 POST /documents로 등록한 document_id를 지정할 수 있음)"""
+    if file is not None and not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="PDF 파일만 지원됩니다")
     
     if angle not in [90, 180, 270]:
         raise HTTPException(status_code=400, detail="회전 각도는 90, 180, 270만 지원됩니다")
     
     session_dir = get_session_dir()
-    temp_path = session_dir / f"temp_{file.filename}"
-    output_path = session_dir / f"rotated_{file.filename}"
     
     try:
-        # 파일 저장
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # PDF 처리
-        reader = PdfReader(temp_path)
-        writer = PdfWriter()
+        # 파일 저장 (등록된 문서이면 보관 중인 파일을 그대로 사용)
+        temp_path, filename = await documents.resolve_input(file, document_id, session_dir)
+        output_path = session_dir / f"rotated_{Path(filename).name}"
         
-        total_pages = len(reader.pages)
-
-        # 'all'인 경우 모든 페이지를 회전
-        if pages.lower() == 'all':
-            pages_to_rotate = list(range(1, total_pages + 1))
-        else:
-            try:
-                # 페이지 범위 문자열 파싱
-                pages_to_rotate = parse_page_ranges(pages, total_pages)
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=str(e))
-            
-            if not pages_to_rotate:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"페이지가 선택되지 않았습니다. 예시: '1-3,5,7-9' (1부터 {total_pages}까지) 또는 'all'"
-                )
-
-        # 페이지 처리
-        for i in range(total_pages):
-            page_num = i + 1  # 1부터 시작하는 페이지 번호
-            page_obj = reader.pages[i]
-
-            if page_num in pages_to_rotate:
-                # 선택된 페이지 회전
-                page_obj.rotate(angle)
-                writer.add_page(page_obj)
-            elif include_unspecified:
-                # 지정하지 않은 페이지도 포함
-                writer.add_page(page_obj)
-            else:
-                # 지정하지 않은 페이지는 제외
-                continue
-        
-        # 결과 저장
-        with open(output_path, "wb") as output_file:
-            writer.write(output_file)
+        # 같은 파일/옵션의 결과가 캐시에 있으면 재사용, 없으면 처리 후 저장 (워커 풀에서 실행)
+        cache_key = await result_cache.make_key(
+            "rotate", [temp_path],
+            {"pages": pages.replace(" ", ""), "angle": angle, "include_unspecified": include_unspecified}
+        )
+        if not await result_cache.fetch(cache_key, output_path):
+            await run_cpu(
+                _rotate_file, temp_path, output_path, pages, angle, include_unspecified,
+                progress=current_progress(), size_hint=temp_path.stat().st_size
+            )
+            await result_cache.store(cache_key, output_path)
         
         # 임시 파일 삭제
-        temp_path.unlink()
+        if not document_id:
+            temp_path.unlink()
         
         return FileResponse(
             path=str(output_path),
-            filename=f"rotated_{file.filename}",
+            filename=f"rotated_{filename}",
             background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
         )
     
     except Exception as e:
         # 오류 발생 시 세션 디렉토리 정리
         shutil.rmtree(session_dir, ignore_errors=True)
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
         raise e
\ No newline at end of file
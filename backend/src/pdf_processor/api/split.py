@@ -1,71 +1,174 @@
 from fastapi import APIRouter, UploadFile, HTTPException, BackgroundTasks, Form
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+import asyncio
+import re
 import shutil
-from typing import List
+from typing import List, Literal, Tuple
 from pathlib import Path
 from starlette.background import BackgroundTask
-from pypdf import PdfReader, PdfWriter
 import os
 import uuid
 
-from pdf_processor.utils import get_session_dir, parse_page_ranges
+from pdf_processor import config, documents, pageops, cache as result_cache
+from pdf_processor.utils import get_session_dir, InvalidInputError, stream_zip, content_disposition
+from pdf_processor.executor import run_cpu
+from pdf_processor.jobs import current_progress
 
 router = APIRouter()
 
+def _split_file(temp_path, output_path, pages: str, progress=None):
+    """선택한 페이지만 새 PDF로 저장 (워커 프로세스에서 실행)"""
+    # PDF 총 페이지 수 확인
+    with documents.open_reader(temp_path) as reader:
+        total_pages = pageops.page_count(reader)
+
+    # 페이지 범위 문자열 파싱
+    page_list = sorted(pageops.select_pages(pages, total_pages, allow_all=False))
+
+    # 선택된 페이지들과 그 페이지에서 참조하는 객체만 새 PDF에 복사
+    pageops.extract_pages(temp_path, output_path, page_list, progress=progress)
+
+def _safe_name(title: str) -> str:
+    """책갈피 제목을 파일 이름으로 사용할 수 있도록 정리"""
+    name = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', "_", title).strip(" ._")
+    return name[:80]
+
+def _plan_split(temp_path, mode: str, pages: str, every: int, stem: str) -> List[Tuple[str, List[int]]]:
+    """나눌 문서 목록 (압축 파일 내 이름, 페이지 번호 목록)을 계산 (워커 프로세스에서 실행)"""
+    with documents.open_reader(temp_path) as reader:
+        total_pages = pageops.page_count(reader)
+        if mode == "every":
+            groups = [("", group) for group in pageops.every_n_pages(total_pages, every or 0)]
+        elif mode == "ranges":
+            groups = [("", group) for group in pageops.range_groups(pages or "", total_pages)]
+        else:
+            groups = pageops.bookmark_groups(reader, total_pages)
+
+    width = max(3, len(str(len(groups))))
+    parts = []
+    for index, (title, page_numbers) in enumerate(groups, start=1):
+        start, end = page_numbers[0], page_numbers[-1]
+        label = f"p{start}" if start == end else f"p{start}-{end}"
+        if len(page_numbers) != end - start + 1:
+            label += "_etc"
+        title = _safe_name(title)
+        parts.append((f"{stem}_{index:0{width}d}_{title or label}.pdf", page_numbers))
+    return parts
+
+def _chunk_parts(parts: List[Tuple[str, List[int]]], count: int) -> List[List[Tuple[str, List[int]]]]:
+    """문서 목록을 페이지 수가 비슷하도록 연속된 count개 묶음으로 나눔"""
+    total = sum(len(page_numbers) for _, page_numbers in parts)
+    count = max(1, min(count, len(parts)))
+    target = total / count
+    chunks, current, current_pages = [], [], 0
+    for index, part in enumerate(parts):
+        current.append(part)
+        current_pages += len(part[1])
+        remaining_parts = len(parts) - index - 1
+        remaining_chunks = count - len(chunks) - 1
+        if remaining_chunks and (current_pages >= target or remaining_parts == remaining_chunks):
+            chunks.append(current)
+            current, current_pages = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+async def _build_parts(temp_path, session_dir: Path, parts, size_hint: int, progress=None):
+    """여러 워커에서 나누어 만든 문서를 순서대로 (이름, 경로)로 생성
+
+    각 워커는 원본을 한 번만 열고 맡은 문서를 모두 만들며, 앞 묶음이 끝나는 대로 내보냅니다.
+    """
+    if progress:
+        progress.start(sum(len(page_numbers) for _, page_numbers in parts))
+    chunks = _chunk_parts(parts, config.MAX_WORKERS)
+    tasks = [
+        asyncio.ensure_future(run_cpu(
+            pageops.extract_parts, temp_path,
+            [(session_dir / name, page_numbers) for name, page_numbers in chunk],
+            size_hint=size_hint
+        ))
+        for chunk in chunks
+    ]
+    try:
+        for chunk, task in zip(chunks, tasks):
+            await task
+            for name, page_numbers in chunk:
+                if progress:
+                    progress.advance(len(page_numbers))
+                yield name, session_dir / name
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _zip_entries(first_part, parts_iter):
+    yield first_part
+    async for part in parts_iter:
+        yield part
+
 @router.post("/split")
-async def split_pdf(file: UploadFile, pages: str = Form(...)):
-    """PDF 파일을 지정된 페이지들로 분할"""
-    if not file.filename.lower().endswith('.pdf'):
+async def split_pdf(
+    file: UploadFile = None,
+    document_id: str = Form(None),
+    pages: str = Form(""),
+    mode: Literal["pages", "every", "ranges", "bookmarks"] = Form("pages"),
+    every: int = Form(None)
+):
+    """PDF 파일을 지정된 페이지들로 분할
+
+    - mode="pages": pages(예: "1-3,5")의 페이지만 담은 PDF 하나를 반환
+    - mode="every": every 페이지씩 나눈 PDF들을 압축 파일로 반환
+    - mode="ranges": pages의 세미콜론으로 구분한 범위 묶음(예: "1-3;4-10;11-")마다 PDF 하나
+    - mode="bookmarks": 최상위 책갈피마다 PDF 하나
+    file 대신 POST /documents로 등록한 document_id를 지정할 수 있습니다.
+    """
+    if file is not None and not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="PDF 파일만 지원됩니다")
     
     session_dir = get_session_dir()
-    temp_path = session_dir / f"temp_{file.filename}"
-    output_path = session_dir / f"split_{file.filename}"
     
     try:
-        # 업로드된 파일 저장
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # PDF 처리
-        reader = PdfReader(temp_path)
-        writer = PdfWriter()
-        
-        # PDF 총 페이지 수 확인
-        total_pages = len(reader.pages)
-        
-        try:
-            # 페이지 범위 문자열 파싱
-            page_list = parse_page_ranges(pages, total_pages)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        if not page_list:
-            raise HTTPException(
-                status_code=400,
-                detail=f"페이지가 선택되지 않았습니다. 예시: '1-3,5,7-9' (1부터 {total_pages}까지)"
+        # 업로드된 파일 저장 (등록된 문서이면 보관 중인 파일을 그대로 사용)
+        temp_path, filename = await documents.resolve_input(file, document_id, session_dir)
+        output_path = session_dir / f"split_{Path(filename).name}"
+
+        if mode != "pages":
+            stem = Path(filename).stem
+            size_hint = temp_path.stat().st_size
+            parts = await run_cpu(_plan_split, temp_path, mode, pages, every, stem, size_hint=size_hint)
+            parts_iter = _build_parts(temp_path, session_dir, parts, size_hint, progress=current_progress())
+            # 첫 묶음을 기다려 처리 오류는 응답 전에 반환하고, 나머지는 만들어지는 대로 전송합니다
+            first_part = await parts_iter.__anext__()
+            return StreamingResponse(
+                stream_zip(_zip_entries(first_part, parts_iter)),
+                media_type="application/zip",
+                headers={"Content-Disposition": content_disposition(f"{stem}_split.zip")},
+                background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
             )
         
-        # 선택된 페이지들을 새 PDF에 추가
-        for page_num in page_list:
-            # 1부터 시작하는 페이지 번호를 0부터 시작하는 인덱스로 변환
-            writer.add_page(reader.pages[page_num - 1])
-        
-        # 결과 저장
-        with open(output_path, "wb") as output_file:
-            writer.write(output_file)
+        # 같은 파일/옵션의 결과가 캐시에 있으면 재사용, 없으면 처리 후 저장 (워커 풀에서 실행)
+        cache_key = await result_cache.make_key("split", [temp_path], {"pages": pages.replace(" ", "")})
+        if not await result_cache.fetch(cache_key, output_path):
+            await run_cpu(
+                _split_file, temp_path, output_path, pages,
+                progress=current_progress(), size_hint=temp_path.stat().st_size
+            )
+            await result_cache.store(cache_key, output_path)
         
         # 임시 파일 삭제
-        temp_path.unlink()
+        if not document_id:
+            temp_path.unlink()
         
         return FileResponse(
             path=str(output_path),
-            filename=f"split_{file.filename}",
+            filename=f"split_{filename}",
             background=BackgroundTask(lambda: shutil.rmtree(session_dir, ignore_errors=True))
         )
     
     except Exception as e:
         # 오류 발생 시 세션 디렉토리 정리
         shutil.rmtree(session_dir, ignore_errors=True)
+        if isinstance(e, InvalidInputError):
+            raise HTTPException(status_code=400, detail=str(e))
         raise e
\ No newline at end of file
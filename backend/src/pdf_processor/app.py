@@ -1,17 +1,37 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import os
 import sys
 import logging
 from pathlib import Path
-import uuid
 import atexit
-import shutil # <<< shutil 임포트
+
+from pdf_processor import config, executor, fonts, jobs, metrics, profiling, tempstore, warmup
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작/종료 시 실행되는 처리"""
+    # 이전 실행이 남긴 임시 파일 정리 (이후 TEMP_REAP_INTERVAL마다 반복)
+    tempstore.start()
+    # 보관 시간이 지난 작업 결과를 주기적으로 정리
+    jobs.start()
+    if config.WARMUP:
+        # 폰트, 변환기, 워커 프로세스를 백그라운드에서 미리 준비 (서버 시작을 막지 않음)
+        warmup.start()
+    else:
+        # 스레드 풀에서 처리되는 작업을 위해 폰트만 미리 등록
+        executor.get_thread_pool().submit(fonts.preload_fonts)
+    yield
+    # 서버 종료 시 워커 풀 정리
+    jobs.stop()
+    executor.shutdown()
+    tempstore.stop()
+
 # FastAPI 앱 인스턴스 생성
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS 미들웨어 설정
 origins = [
@@ -27,8 +47,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 렌더러에서 결과 파일 이름과 처리 통계를 읽을 수 있도록 노출
+    expose_headers=[
+        "Content-Disposition",
+        "X-Merge-Pages",
+        "X-Merge-Deduplicated-Objects",
+        "X-Merge-Bytes-Saved",
+        "X-Merge-Inspect-Ms",
+        "X-Merge-Build-Ms",
+        "Server-Timing",
+        "X-Profile-Id",
+    ],
 )
 
+# 요청 크기에 따라 세션을 RAM 디렉토리에 만들지 결정
+app.add_middleware(tempstore.TempStorageMiddleware)
+# 느린 요청 프로파일링 (X-Profile 헤더 또는 PROFILE_REQUESTS 설정)
+app.add_middleware(profiling.ProfilingMiddleware)
+# 요청별 단계 시간 측정 (CORS 처리까지 포함하도록 가장 바깥에 추가)
+app.add_middleware(metrics.MetricsMiddleware)
+
 def get_app_data_dir() -> Path:
     """애플리케이션 데이터 디렉토리 가져오기"""
     if sys.platform == 'win32':
@@ -49,25 +87,21 @@ TEMP_DIR = APP_DATA_DIR / "temp"
 APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
-# *** 여기가 수정된 부분입니다 ***
 @atexit.register
 def cleanup_temp_dir():
-    """임시 디렉토리와 그 안의 모든 내용을 삭제합니다."""
+    """이 실행의 임시 디렉토리와 그 안의 모든 내용을 삭제합니다.
+
+    함께 실행 중인 다른 서버의 파일은 건드리지 않으며, 워커 프로세스 종료 시에는 아무것도 하지 않습니다.
+    """
     try:
-        if TEMP_DIR.exists():
-            # shutil.rmtree는 디렉터리가 비어있지 않아도 강제로 삭제합니다.
-            shutil.rmtree(TEMP_DIR)
-            print(f"Cleaned up temporary directory: {TEMP_DIR}")
+        tempstore.cleanup()
     except Exception as e:
         print(f"Error cleaning up temp directory: {e}")
 
 # 세션 관리 및 유틸리티 함수들은 기존 코드를 그대로 사용
 def get_session_dir() -> Path:
     """세션별 임시 디렉토리 생성"""
-    session_id = str(uuid.uuid4())
-    session_dir = TEMP_DIR / session_id
-    session_dir.mkdir(parents=True, exist_ok=True)
-    return session_dir
+    return tempstore.create_session()
 
 def parse_page_ranges(range_str: str, max_pages: int) -> list[int]:
     """페이지 범위 문자열을 페이지 번호 리스트로 변환"""
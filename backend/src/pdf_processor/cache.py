@@ -0,0 +1,292 @@
+"""
+작업 결과 캐시 (내용 주소 방식)
+
+같은 파일에 같은 옵션으로 회전/분할/워터마크를 반복하면 결과도 같으므로,
+입력 파일 내용의 SHA-256과 정규화한 폼 파라미터로 만든 키로 결과 파일을
+APP_DATA_DIR/cache에 저장해 두고 다시 처리하지 않습니다.
+
+라우터는 다음과 같이 사용합니다.
+
+    key = await result_cache.make_key("rotate", [temp_path], {"pages": pages, "angle": angle})
+    if not await result_cache.fetch(key, output_path):
+        await run_cpu(...)
+        await result_cache.store(key, output_path)
+
+- 전체 크기가 RESULT_CACHE_BYTES를 넘으면 가장 오래 사용하지 않은 결과부터 삭제합니다.
+- 결과 파일은 가능하면 하드 링크로 주고받으므로, fetch/store에 넘긴 파일을 그 자리에서 수정하면 안 됩니다.
+- 캐시는 API 서버 프로세스에서만 사용합니다 (워커 프로세스에서는 사용하지 않음).
+- 키는 입력 파일과 함께 있으면 파라미터를 대입해 볼 수 있으므로 비밀번호 같은 비밀 값을 넣으면 안 됩니다.
+  암호화 결과(/encrypt, encrypt 단계가 있는 /pipeline)는 캐시하지 않습니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from pdf_processor import config
+from pdf_processor.utils import APP_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 결과 형식이나 키 구성이 바뀌면 올려서 이전 캐시 항목을 무효화합니다
+# (2: 비밀번호가 들어간 암호화 결과 키를 더 이상 만들지 않음)
+CACHE_VERSION = 2
+CACHE_ROOT = APP_DATA_DIR / "cache"
+CACHE_DIR = CACHE_ROOT / f"v{CACHE_VERSION}"
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+# 같은 파일(등록된 문서 등)을 반복해서 해시하지 않도록 (경로, 크기, 수정 시각) -> 해시를 기억합니다
+_DIGEST_MEMO_SIZE = 256
+_digest_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_digest_lock = threading.Lock()
+
+
+def file_digest(path: Path) -> str:
+    """파일 내용의 SHA-256"""
+    stat = os.stat(path)
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        if memo_key in _digest_memo:
+            _digest_memo.move_to_end(memo_key)
+            return _digest_memo[memo_key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+    with _digest_lock:
+        _digest_memo[memo_key] = digest.hexdigest()
+        if len(_digest_memo) > _DIGEST_MEMO_SIZE:
+            _digest_memo.popitem(last=False)
+    return digest.hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """대소문자/공백이 의미 없는 키워드('all', 'true' 등)의 표기 차이를 없앰
+
+    비밀번호나 워터마크 문구처럼 공백도 의미가 있는 값은 그대로 둡니다.
+    페이지 범위처럼 형식이 정해진 값은 라우터에서 정규화하여 넘깁니다.
+    """
+    if isinstance(value, str):
+        keyword = value.strip().lower()
+        return keyword if keyword in ("all", "true", "false") else value
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _link_or_copy(src: Path, dest: Path):
+    try:
+        os.link(src, dest)
+    except OSError:
+        # 다른 드라이브이거나 하드 링크를 지원하지 않는 파일 시스템
+        shutil.copyfile(src, dest)
+
+
+class ResultCache:
+    """크기 제한이 있는 LRU 결과 파일 캐시"""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # 키 -> 파일 크기 (오래 사용하지 않은 순서)
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        # 키 -> 잠금 밖에서 파일을 가져가는 중인 요청 수
+        self._in_use: Dict[str, int] = {}
+        # 가져가는 중에 캐시에서 빠져, 다 가져간 뒤 삭제할 파일의 키
+        self._unlink_later: set = set()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _load(self) -> "OrderedDict[str, int]":
+        """디스크의 캐시 항목을 마지막 사용 시각 순서로 읽음 (_lock을 잡은 상태에서 호출)"""
+        if self._entries is not None:
+            return self._entries
+        found = []
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._remove_old_versions()
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".tmp":
+                # 저장 도중 종료되어 남은 파일
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, path.name, stat.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+        self._size = sum(self._entries.values())
+        self._evict()
+        return self._entries
+
+    def _remove_old_versions(self):
+        """이전 CACHE_VERSION의 캐시 항목 삭제 (캐시 디렉토리의 상위 디렉토리에 있음)"""
+        for path in self.directory.parent.iterdir():
+            if path != self.directory:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _evict(self):
+        while self._entries and self._size > self.max_bytes:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self._evictions += 1
+            if key in self._in_use:
+                self._unlink_later.add(key)
+            else:
+                self._path(key).unlink(missing_ok=True)
+
+    def get(self, key: str, dest: Path) -> bool:
+        """캐시된 결과를 dest로 가져오고, 없으면 False를 반환
+
+        RAM 세션처럼 다른 파일 시스템으로는 하드 링크 대신 전체 복사가 일어나므로, 잠금 안에서는
+        항목을 찾아 사용 중으로 표시만 하고 링크/복사는 잠금 밖에서 합니다.
+        """
+        with self._lock:
+            entries = self._load()
+            if key not in entries:
+                self._misses += 1
+                return False
+            entries.move_to_end(key)
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+        found = False
+        try:
+            path = self._path(key)
+            _link_or_copy(path, dest)
+            # 재시작 후에도 사용 순서를 유지하도록 수정 시각을 갱신합니다
+            os.utime(path)
+            found = True
+        except FileNotFoundError:
+            # 캐시 디렉토리에서 파일이 지워진 경우
+            with self._lock:
+                if self._entries and key in self._entries:
+                    self._size -= self._entries.pop(key)
+        finally:
+            with self._lock:
+                self._in_use[key] -= 1
+                if not self._in_use[key]:
+                    del self._in_use[key]
+                    if key in self._unlink_later:
+                        self._unlink_later.discard(key)
+                        # 그 사이 같은 키로 다시 저장되지 않았을 때만 삭제합니다
+                        if not (self._entries and key in self._entries):
+                            self._path(key).unlink(missing_ok=True)
+                if found:
+                    self._hits += 1
+                else:
+                    self._misses += 1
+        return found
+
+    def put(self, key: str, src: Path):
+        """결과 파일을 캐시에 저장 (캐시 크기보다 큰 파일은 저장하지 않음)"""
+        size = src.stat().st_size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # 처음 읽을 때 남은 임시 파일을 정리하므로 임시 파일을 만들기 전에 읽어 둡니다
+            self._load()
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{uuid.uuid4().hex[:8]}.tmp")
+        _link_or_copy(src, tmp_path)
+        with self._lock:
+            entries = self._load()
+            os.replace(tmp_path, path)
+            # 하드 링크는 원본의 수정 시각을 그대로 가지므로 저장 시각으로 갱신합니다
+            os.utime(path)
+            if key in entries:
+                self._size -= entries.pop(key)
+            entries[key] = size
+            self._size += size
+            self._stores += 1
+            self._evict()
+
+    def clear(self):
+        """캐시 항목을 모두 삭제"""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._remove_old_versions()
+            self._entries = OrderedDict()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._load() if self.enabled else OrderedDict()
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "stores": self._stores,
+                "evictions": self._evictions,
+            }
+
+
+_cache = ResultCache(CACHE_DIR, config.RESULT_CACHE_BYTES)
+
+
+def get_cache() -> ResultCache:
+    return _cache
+
+
+async def make_key(operation: str, inputs: Iterable[Path], params: Dict[str, Any]) -> Optional[str]:
+    """작업 이름, 입력 파일 내용, 정규화한 파라미터로 캐시 키를 만듦 (캐시를 사용하지 않으면 None)"""
+    if not _cache.enabled:
+        return None
+    digests = [await run_in_threadpool(file_digest, path) for path in inputs]
+    payload = json.dumps(
+        [CACHE_VERSION, operation, digests, _normalize(params)],
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def fetch(key: Optional[str], dest: Path) -> bool:
+    """캐시된 결과가 있으면 dest에 두고 True를 반환"""
+    if key is None:
+        return False
+    try:
+        return await run_in_threadpool(_cache.get, key, dest)
+    except OSError as e:
+        logger.warning(f"결과 캐시를 읽을 수 없습니다: {e}")
+        return False
+
+
+async def store(key: Optional[str], src: Path):
+    """처리 결과를 캐시에 저장 (실패해도 요청에는 영향을 주지 않음)"""
+    if key is None:
+        return
+    try:
+        await run_in_threadpool(_cache.put, key, src)
+    except OSError as e:
+        logger.warning(f"결과를 캐시에 저장할 수 없습니다: {e}")
@@ -0,0 +1,95 @@
+"""
+백엔드 설정값
+
+모든 값은 환경 변수(PDF_PROCESSOR_*)로 덮어쓸 수 있습니다.
+"""
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """정수형 환경 변수 읽기 (잘못된 값이면 기본값 사용)"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+# --- CPU 작업 실행기 ---
+# 프로세스 풀 워커 수 (기본값: CPU 코어 수)
+MAX_WORKERS = max(1, _env_int("PDF_PROCESSOR_MAX_WORKERS", os.cpu_count() or 2))
+# 가벼운 작업용 스레드 풀 크기
+MAX_THREADS = max(1, _env_int("PDF_PROCESSOR_MAX_THREADS", min(32, (os.cpu_count() or 2) + 4)))
+# 실행 중인 작업 외에 대기열에 쌓일 수 있는 최대 작업 수 (초과 시 503 응답)
+MAX_QUEUE = max(0, _env_int("PDF_PROCESSOR_MAX_QUEUE", MAX_WORKERS * 4))
+# 이 크기(바이트) 이하의 입력은 프로세스 풀 대신 스레드 풀에서 처리
+CHEAP_TASK_BYTES = max(0, _env_int("PDF_PROCESSOR_CHEAP_TASK_BYTES", 1024 * 1024))
+
+# --- 비동기 작업(Job) ---
+# 동시에 실행되는 작업 수 (나머지는 queued 상태로 대기)
+MAX_RUNNING_JOBS = max(1, _env_int("PDF_PROCESSOR_MAX_RUNNING_JOBS", MAX_WORKERS))
+# 보관 중인 작업(대기/실행/완료)의 최대 개수 (초과 시 503 응답)
+MAX_JOBS = max(1, _env_int("PDF_PROCESSOR_MAX_JOBS", 100))
+# 완료된 작업 결과를 보관하는 시간(초)
+JOB_RESULT_TTL = max(0, _env_int("PDF_PROCESSOR_JOB_RESULT_TTL", 60 * 60))
+
+# --- 업로드 ---
+# 업로드 파일 하나의 최대 크기(바이트, 0이면 제한 없음, 초과 시 413 응답)
+MAX_UPLOAD_BYTES = max(0, _env_int("PDF_PROCESSOR_MAX_UPLOAD_BYTES", 4 * 1024 * 1024 * 1024))
+# 업로드 파일을 디스크에 옮길 때 사용하는 청크 크기(바이트)
+UPLOAD_CHUNK_BYTES = max(64 * 1024, _env_int("PDF_PROCESSOR_UPLOAD_CHUNK_BYTES", 1024 * 1024))
+# 이 크기(바이트) 이상인 입력 PDF는 메모리로 읽지 않고 mmap으로 열어 파싱 (0이면 사용하지 않음)
+MMAP_MIN_BYTES = max(0, _env_int("PDF_PROCESSOR_MMAP_MIN_BYTES", 4 * 1024 * 1024))
+
+# --- 임시 저장소 ---
+# 임시 파일(세션, 문서)의 최대 전체 크기(바이트, 0이면 제한 없음, 초과 시 507 응답)
+TEMP_QUOTA_BYTES = max(0, _env_int("PDF_PROCESSOR_TEMP_QUOTA_BYTES", 20 * 1024 * 1024 * 1024))
+# 업로드를 저장한 뒤에도 임시 디렉토리 디스크에 남아 있어야 하는 여유 공간(바이트, 부족하면 507 응답)
+TEMP_MIN_FREE_BYTES = max(0, _env_int("PDF_PROCESSOR_TEMP_MIN_FREE_BYTES", 512 * 1024 * 1024))
+# 응답 후 삭제되지 않고 남은 세션 디렉토리를 정리하기까지의 시간(초)
+TEMP_SESSION_TTL = max(60, _env_int("PDF_PROCESSOR_TEMP_SESSION_TTL", 6 * 60 * 60))
+# 남은 세션과 종료된 이전 실행의 임시 파일을 정리하는 주기(초)
+TEMP_REAP_INTERVAL = max(10, _env_int("PDF_PROCESSOR_TEMP_REAP_INTERVAL", 5 * 60))
+# 작은 요청의 세션을 만들 RAM 디렉토리 (auto: Linux의 /dev/shm, off: 사용하지 않음, 그 외: 경로)
+TEMP_RAM_DIR = os.getenv("PDF_PROCESSOR_TEMP_RAM_DIR", "auto").strip()
+# 요청 본문이 이 크기(바이트) 이하이면 세션을 RAM 디렉토리에 생성
+TEMP_RAM_MAX_REQUEST_BYTES = max(0, _env_int("PDF_PROCESSOR_TEMP_RAM_MAX_REQUEST_BYTES", 8 * 1024 * 1024))
+# RAM 디렉토리에 예약할 수 있는 최대 크기(바이트)
+TEMP_RAM_QUOTA_BYTES = max(0, _env_int("PDF_PROCESSOR_TEMP_RAM_QUOTA_BYTES", 256 * 1024 * 1024))
+
+# --- 일괄 처리 ---
+# /batch/* 요청 하나에서 처리할 수 있는 최대 파일 수
+MAX_BATCH_FILES = max(1, _env_int("PDF_PROCESSOR_MAX_BATCH_FILES", 5000))
+
+# --- 결과 캐시 ---
+# 같은 입력/옵션의 처리 결과를 보관하는 디스크 캐시의 최대 크기(바이트, 0이면 사용하지 않음)
+RESULT_CACHE_BYTES = max(0, _env_int("PDF_PROCESSOR_RESULT_CACHE_BYTES", 512 * 1024 * 1024))
+
+# --- 문서 핸들 ---
+# POST /documents로 등록한 문서를 사용하지 않은 채 보관하는 시간(초)
+DOCUMENT_TTL = max(0, _env_int("PDF_PROCESSOR_DOCUMENT_TTL", 60 * 60))
+# 등록할 수 있는 문서 수 (초과하면 가장 오래 사용하지 않은 문서부터 삭제)
+MAX_DOCUMENTS = max(1, _env_int("PDF_PROCESSOR_MAX_DOCUMENTS", 50))
+# 프로세스마다 파싱된 PdfReader를 보관하는 캐시의 추정 메모리 한도(바이트, 0이면 사용하지 않음)
+READER_CACHE_BYTES = max(0, _env_int("PDF_PROCESSOR_READER_CACHE_BYTES", 256 * 1024 * 1024))
+
+# --- 서버 시작 ---
+# 프로세스 시작부터 PORT= 출력까지의 목표 시간(ms, 넘으면 stderr에 경고, 0이면 확인하지 않음)
+STARTUP_TARGET_MS = max(0, _env_int("PDF_PROCESSOR_STARTUP_TARGET_MS", 1000))
+# 1이면 모듈별 import 시간 보고서를 stderr에 출력 (--import-report 플래그와 같음)
+IMPORT_REPORT = _env_int("PDF_PROCESSOR_IMPORT_REPORT", 0) == 1
+# 1이면 서버 시작 후 폰트, 변환기, 워커 프로세스를 백그라운드에서 미리 준비
+WARMUP = _env_int("PDF_PROCESSOR_WARMUP", 1) == 1
+
+# --- 측정 ---
+# 1이면 요청마다 단계별 처리 시간과 메모리를 측정하여 Server-Timing 헤더와 GET /metrics로 제공
+METRICS = _env_int("PDF_PROCESSOR_METRICS", 1) == 1
+# 1이면 모든 요청을 프로파일러로 실행하고 PROFILE_SLOW_MS 이상 걸린 요청의 프로파일을 저장 (처리 시간이 늘어남)
+# 0이어도 X-Profile: 1 헤더가 있는 요청은 프로파일링하여 저장합니다
+PROFILE_REQUESTS = _env_int("PDF_PROCESSOR_PROFILE_REQUESTS", 0) == 1
+# 이 시간(ms) 이상 걸린 요청의 프로파일을 저장
+PROFILE_SLOW_MS = max(0, _env_int("PDF_PROCESSOR_PROFILE_SLOW_MS", 2000))
+# APP_DATA_DIR/profiles에 보관하는 최대 프로파일 수 (초과하면 오래된 것부터 삭제)
+PROFILE_MAX_FILES = max(1, _env_int("PDF_PROCESSOR_PROFILE_MAX_FILES", 50))
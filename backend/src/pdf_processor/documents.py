@@ -0,0 +1,281 @@
+"""
+업로드한 문서 핸들과 파싱된 PdfReader 캐시
+
+렌더러가 한 편집 세션에서 같은 PDF로 분할/회전/워터마크/편집을 차례로 요청할 때
+매번 파일을 업로드하고 다시 파싱하지 않도록, POST /documents로 한 번 등록한 뒤
+각 작업에는 file 대신 document_id를 넘깁니다.
+
+- 문서 파일은 이 실행의 임시 디렉토리(tempstore.RUN_DIR/documents) 아래에 보관되며, DOCUMENT_TTL 동안 사용하지 않으면 삭제됩니다.
+- 등록된 문서의 PdfReader는 프로세스마다(API 서버, 각 워커) 메모리 한도가 있는 LRU 캐시에
+  보관되므로, 같은 워커가 같은 문서를 다시 처리하면 상호 참조 표와 페이지 트리를 다시 읽지 않습니다.
+  큰 문서는 pdfinput과 같이 mmap으로 열려 캐시에서 빠질 때까지 매핑이 유지됩니다.
+- 캐시된 PdfReader의 객체는 여러 요청이 공유하므로 작업 함수는 페이지 객체를 그 자리에서
+  수정하지 말고 복사본(PdfWriter에 추가한 페이지, pageops.selected_pages 결과 등)을 수정해야 합니다.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from pypdf import PdfReader
+
+from pdf_processor import config, metrics, pdfinput, tempstore
+from pdf_processor.utils import save_upload
+
+logger = logging.getLogger(__name__)
+
+DOCUMENTS_DIR = tempstore.RUN_DIR / "documents"
+
+# 파싱된 객체 하나가 차지하는 메모리의 대략적인 크기 (캐시 크기 추정용)
+_OBJECT_BYTES_ESTIMATE = 1024
+
+
+class Document:
+    """등록된 문서"""
+
+    def __init__(self, filename: str, path: Path, size: int, pages: int):
+        self.id = path.parent.name
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.pages = pages
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "document_id": self.id,
+            "filename": self.filename,
+            "size": self.size,
+            "pages": self.pages,
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+        }
+
+
+_documents: Dict[str, Document] = {}
+
+
+def create_document_dir() -> Path:
+    """새 문서를 저장할 디렉토리 (디렉토리 이름이 문서 ID)"""
+    document_dir = DOCUMENTS_DIR / uuid.uuid4().hex
+    document_dir.mkdir(parents=True, exist_ok=True)
+    return document_dir
+
+
+def add_document(filename: str, path: Path, size: int, pages: int) -> Document:
+    """저장한 문서 파일을 등록 (문서가 너무 많으면 가장 오래 사용하지 않은 문서를 정리)"""
+    purge_expired_documents()
+    while _documents and len(_documents) >= config.MAX_DOCUMENTS:
+        oldest = min(_documents.values(), key=lambda d: d.last_used)
+        delete_document(oldest.id)
+    document = Document(Path(filename or "document.pdf").name, path, size, pages)
+    _documents[document.id] = document
+    return document
+
+
+def list_documents() -> List[Document]:
+    purge_expired_documents()
+    return list(_documents.values())
+
+
+def get_document(document_id: str) -> Document:
+    document = _documents.get(document_id)
+    if document is None or not document.path.exists():
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다. 다시 업로드해 주세요")
+    document.last_used = time.time()
+    return document
+
+
+def delete_document(document_id: str):
+    document = _documents.pop(document_id, None)
+    if document is None:
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다")
+    _reader_cache.discard(document.path)
+    shutil.rmtree(document.path.parent, ignore_errors=True)
+
+
+def purge_expired_documents():
+    """DOCUMENT_TTL 동안 사용하지 않은 문서 정리"""
+    now = time.time()
+    for document in list(_documents.values()):
+        if now - document.last_used > config.DOCUMENT_TTL:
+            delete_document(document.id)
+
+
+async def resolve_input(file: Optional[UploadFile], document_id: Optional[str], session_dir: Path) -> Tuple[Path, str]:
+    """업로드 파일 또는 등록된 문서를 (입력 파일 경로, 원본 파일 이름)으로 반환
+
+    업로드 파일은 세션 디렉토리에 저장하고, 문서는 복사하지 않고 보관 중인 파일 경로를 그대로 반환합니다.
+    """
+    if document_id:
+        document = get_document(document_id)
+        return document.path, document.filename
+    if file is None or not file.filename:
+        raise HTTPException(status_code=400, detail="file 또는 document_id를 지정해야 합니다")
+    temp_path = session_dir / f"temp_{Path(file.filename).name}"
+    await save_upload(file, temp_path)
+    return temp_path, file.filename
+
+
+def is_document_path(path) -> bool:
+    try:
+        return Path(path).resolve().parent.parent == DOCUMENTS_DIR.resolve()
+    except (OSError, TypeError):
+        return False
+
+
+def _stream_bytes(stream) -> int:
+    """PdfReader가 읽는 입력 버퍼(BytesIO 또는 mmap)의 크기"""
+    position = stream.tell()
+    # mmap.seek()는 Python 3.13부터 위치를 반환하므로 tell()로 크기를 읽습니다
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+class _CachedReader:
+    def __init__(self, path: Path):
+        # 큰 파일은 mmap으로 열리므로 항목을 닫을 때까지 매핑을 유지합니다.
+        # Windows에서는 매핑된 파일을 삭제할 수 없으므로 (다른 프로세스의 캐시가 문서 삭제를 막음) 메모리로 읽습니다
+        src = BytesIO(path.read_bytes()) if os.name == "nt" else path
+        self._inputs = ExitStack()
+        try:
+            self.reader = self._inputs.enter_context(pdfinput.open_pdf(src))
+            self.buffer_bytes = _stream_bytes(self.reader.stream)
+        except BaseException:
+            self._inputs.close()
+            raise
+        self.lock = threading.Lock()
+        # 캐시에서 빠졌지만 사용 중이라 아직 닫지 못한 항목 (사용이 끝나면 닫음)
+        self.retired = False
+
+    @property
+    def estimated_bytes(self) -> int:
+        return self.buffer_bytes + len(self.reader.resolved_objects) * _OBJECT_BYTES_ESTIMATE
+
+    def close(self):
+        self._inputs.close()
+
+    def retire(self):
+        """캐시에서 뺀 항목을 닫음 (사용 중이면 release()에서 닫음, self._lock을 잡은 상태에서 호출)"""
+        if self.lock.acquire(blocking=False):
+            self.lock.release()
+            self.close()
+        else:
+            self.retired = True
+
+
+class ReaderCache:
+    """파싱된 PdfReader의 LRU 캐시 (추정 메모리 사용량 기준으로 제거)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int, int], _CachedReader]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: Path) -> Tuple[str, int, int]:
+        stat = path.stat()
+        return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+    def acquire(self, path: Path) -> Optional[_CachedReader]:
+        """캐시된 항목을 꺼내 사용 중으로 표시 (다른 요청이 사용 중이면 None)
+
+        캐시에 없으면 다른 요청을 막지 않도록 잠금 밖에서 파싱한 뒤 등록합니다. 그 사이 다른 요청이
+        같은 문서를 먼저 등록했으면 먼저 등록된 항목을 유지하고, 그 항목이 사용 중이면 방금 파싱한
+        PdfReader를 캐시하지 않고 이번 요청에만 사용합니다.
+        """
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                # 캐시에서 빼는 항목과 엇갈리지 않도록 사용 표시는 잠금 안에서 합니다
+                return entry if entry.lock.acquire(blocking=False) else None
+            self.misses += 1
+        parsed = _CachedReader(path)
+        parsed.lock.acquire()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = parsed
+                return parsed
+            self._entries.move_to_end(key)
+            if entry.lock.acquire(blocking=False):
+                parsed.close()
+                return entry
+            parsed.retired = True
+            return parsed
+
+    def release(self, entry: _CachedReader):
+        entry.lock.release()
+        with self._lock:
+            if entry.retired:
+                entry.close()
+            self._evict()
+
+    def _evict(self):
+        total = sum(entry.estimated_bytes for entry in self._entries.values())
+        while len(self._entries) > 1 and total > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.estimated_bytes
+            entry.retire()
+
+    def discard(self, path: Path):
+        with self._lock:
+            prefix = str(path.resolve())
+            for key in [key for key in self._entries if key[0] == prefix]:
+                self._entries.pop(key).retire()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "entries": len(self._entries),
+                "estimated_bytes": sum(entry.estimated_bytes for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_reader_cache = ReaderCache(config.READER_CACHE_BYTES)
+
+
+@contextmanager
+def open_reader(path) -> Iterator[PdfReader]:
+    """PdfReader 열기. 등록된 문서이면 이 프로세스의 캐시에서 가져옵니다
+
+    다른 요청이 같은 문서의 캐시된 PdfReader를 사용 중이면 새로 파싱한 PdfReader를 반환합니다.
+    """
+    entry = None
+    if config.READER_CACHE_BYTES > 0 and is_document_path(path):
+        with metrics.phase("parse"):
+            entry = _reader_cache.acquire(Path(path))
+    if entry is None:
+        # 큰 파일은 mmap으로 열리므로 PdfReader는 with 블록 안에서만 사용해야 합니다
+        with pdfinput.open_pdf(path) as reader:
+            yield reader
+        return
+    try:
+        yield entry.reader
+    finally:
+        _reader_cache.release(entry)
+
+
+def reader_cache_stats() -> Dict[str, object]:
+    """현재 프로세스의 PdfReader 캐시 통계"""
+    return _reader_cache.stats()
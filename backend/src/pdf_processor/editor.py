@@ -5,50 +5,21 @@ import json
 import base64
 import os
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.colors import HexColor
 from pypdf import PdfReader, PdfWriter
 from PIL import Image
 import tempfile
+import uuid
 from pathlib import Path
 
-# --- Enhanced font setup based on addWatermark.py ---
-DEFAULT_FONT_NAME = "Helvetica"
+from pdf_processor import documents, fonts, metrics, pageops
+from pdf_processor.textmetrics import text_width
+
+# --- 폰트 설정 (pdf_processor.fonts에서 프로세스당 한 번 등록) ---
 REGULAR_FONT_NAME = "NotoSansKR-Regular"
 BOLD_FONT_NAME = "NotoSansKR-Bold"
-REGULAR_FONT_FILE = "NotoSansKR-Regular.ttf"
-BOLD_FONT_FILE = "NotoSansKR-Bold.ttf"
-
-try:
-    # PyInstaller가 생성한 임시 경로 확인
-    if getattr(sys, '_MEIPASS', None):
-        font_path = os.path.join(sys._MEIPASS, 'pdf_processor', 'fonts')
-    else:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        font_path = os.path.join(base_dir, '..', '..', 'fonts')
-    
-    regular_font_path = os.path.join(font_path, REGULAR_FONT_FILE)
-    bold_font_path = os.path.join(font_path, BOLD_FONT_FILE)
-    
-    if os.path.exists(regular_font_path) and os.path.exists(bold_font_path):
-        # 일반 폰트와 볼드 폰트 등록
-        pdfmetrics.registerFont(TTFont(REGULAR_FONT_NAME, regular_font_path))
-        pdfmetrics.registerFont(TTFont(BOLD_FONT_NAME, bold_font_path))
-        DEFAULT_FONT_NAME = REGULAR_FONT_NAME
-        print(f"SUCCESS: Fonts '{REGULAR_FONT_NAME}' and '{BOLD_FONT_NAME}' loaded successfully.")
-    else:
-        missing_fonts = []
-        if not os.path.exists(regular_font_path):
-            missing_fonts.append(REGULAR_FONT_FILE)
-        if not os.path.exists(bold_font_path):
-            missing_fonts.append(BOLD_FONT_FILE)
-        print(f"ERROR: Font files not found: {', '.join(missing_fonts)}")
-except Exception as e:
-    print(f"CRITICAL ERROR: Failed to load fonts. Error: {e}")
-# --- End of font setup ---
 
 def hex_to_color(hex_color: str):
     return HexColor(hex_color)
@@ -65,6 +36,8 @@ def create_overlay(page_width_pt: float, page_height_pt: float, elements: List[D
         px = x_px
 
         if el_type == "text":
+            # 폰트를 사용할 수 없으면 기본 폰트(Helvetica)로 대체합니다
+            font_name = fonts.font_or_fallback(REGULAR_FONT_NAME)
             font_size_px = el.get("fontSize", 12)
             text_content = el.get("text", "")
             lines = text_content.splitlines() if text_content else []
@@ -73,7 +46,7 @@ def create_overlay(page_width_pt: float, page_height_pt: float, elements: List[D
             block_height = len(lines) * line_height
             max_width = 0
             if lines:
-                max_width = max(pdfmetrics.stringWidth(line, DEFAULT_FONT_NAME, font_size_px) for line in lines)
+                max_width = max(text_width(line, font_name, font_size_px) for line in lines)
 
             if el.get("hasBackground", False):
                 bg_color = el.get("backgroundColor", "#FFFFFF")
@@ -90,7 +63,7 @@ def create_overlay(page_width_pt: float, page_height_pt: float, elements: List[D
 
             if lines:
                 text_object = c.beginText()
-                text_object.setFont(DEFAULT_FONT_NAME, font_size_px)
+                text_object.setFont(font_name, font_size_px)
                 text_object.setFillColor(hex_to_color(el.get("color", "#000000")))
                 text_object.setLeading(line_height)
  
@@ -162,8 +135,7 @@ def create_overlay(page_width_pt: float, page_height_pt: float, elements: List[D
     packet.seek(0)
     return packet.read()
 
-def apply_edits_to_pdf(pdf_file_stream: io.BytesIO, elements_json: str) -> bytes:
-    # ... (이 함수는 변경 없음)
+def group_elements_by_page(elements_json: str) -> Dict[str, List[Dict[str, Any]]]:
     elements_by_page = {}
     try:
         all_elements = json.loads(elements_json)
@@ -175,23 +147,106 @@ def apply_edits_to_pdf(pdf_file_stream: io.BytesIO, elements_json: str) -> bytes
         if page_str not in elements_by_page:
             elements_by_page[page_str] = []
         elements_by_page[page_str].append(el)
-
-    reader = PdfReader(pdf_file_stream)
+    return elements_by_page
+
+def stamp_elements(target, pages, elements_by_page, progress=None):
+    """편집 요소 오버레이를 XObject로 추가하여 페이지에 그림
+
+    Args:
+        target: 오버레이 객체를 추가할 문서 (pageops.IncrementalUpdate 또는 pageops.WriterTarget)
+        pages: (페이지 번호, 페이지) 목록. 페이지는 그 자리에서 수정됨
+    """
+    # 이미 편집한 문서를 다시 편집해도 리소스 이름이 겹치지 않도록 실행마다 접두사를 바꿉니다
+    name_prefix = f"/PDFStudioEdit{uuid.uuid4().hex[:8]}_"
+    save_state_ref = None
+
+    if progress:
+        progress.start(len(pages))
+    for page_number, page in pages:
+        page_width_pt = float(page.mediabox.width)
+        page_height_pt = float(page.mediabox.height)
+        with metrics.phase("render"):
+            overlay_bytes = create_overlay(page_width_pt, page_height_pt, elements_by_page[str(page_number)])
+
+        with metrics.phase("merge"):
+            name = f"{name_prefix}{page_number}"
+            xobject_ref = pageops.overlay_xobject(target, overlay_bytes)
+            # merge_page와 같은 위치(페이지 좌표 원점)에 그립니다
+            draw_ref = pageops.draw_xobject_stream(target, name, 0, 0)
+            if save_state_ref is None:
+                save_state_ref = pageops.add_content_stream(target, b"q\n")
+            pageops.stamp_xobject(page, name, xobject_ref, save_state_ref, draw_ref)
+        if progress:
+            progress.advance()
+    metrics.count("pages", len(pages))
+
+def edited_page_numbers(elements_by_page, total_pages: int) -> List[int]:
+    """편집 요소가 있는 유효한 페이지 번호 목록"""
+    return sorted(
+        int(p) for p in elements_by_page if p.isdigit() and 1 <= int(p) <= total_pages
+    )
+
+def _apply_edits_incremental(reader: PdfReader, src, output_path, elements_by_page, progress=None):
+    """편집한 페이지와 오버레이 XObject만 원본 파일 뒤에 증분 업데이트로 덧붙임"""
+    page_numbers = edited_page_numbers(elements_by_page, pageops.page_count(reader))
+    update = pageops.IncrementalUpdate(src, reader)
+    pages = list(zip(page_numbers, update.pages(page_numbers)))
+    stamp_elements(update, pages, elements_by_page, progress)
+    for _, page in pages:
+        update.update_object(page.indirect_reference, page)
+    update.write(output_path)
+
+def _apply_edits_full(reader: PdfReader, elements_by_page, progress=None) -> PdfWriter:
     writer = PdfWriter()
 
+    if progress:
+        progress.start(len(reader.pages))
     for i, page in enumerate(reader.pages):
+        # PdfReader의 페이지(캐시된 문서일 수 있음) 대신 writer에 복사된 페이지에 병합합니다
+        with metrics.phase("copy"):
+            page = writer.add_page(page)
         page_num_str = str(i + 1)
         if page_num_str in elements_by_page:
             page_width_pt = float(page.mediabox.width)
             page_height_pt = float(page.mediabox.height)
             
-            overlay_bytes = create_overlay(page_width_pt, page_height_pt, elements_by_page[page_num_str])
-            overlay_pdf = PdfReader(io.BytesIO(overlay_bytes))
-            
-            page.merge_page(overlay_pdf.pages[0])
+            with metrics.phase("render"):
+                overlay_bytes = create_overlay(page_width_pt, page_height_pt, elements_by_page[page_num_str])
+            with metrics.phase("merge"):
+                overlay_pdf = PdfReader(io.BytesIO(overlay_bytes))
+                page.merge_page(overlay_pdf.pages[0])
         
-        writer.add_page(page)
-
-    output_stream = io.BytesIO()
-    writer.write(output_stream)
-    return output_stream.getvalue()
\ No newline at end of file
+        if progress:
+            progress.advance()
+    metrics.count("pages", len(writer.pages))
+    return writer
+
+def apply_edits_to_pdf(pdf_file_stream, elements_json: str, output_path=None, progress=None,
+                       save_mode: str = "full") -> Optional[bytes]:
+    """편집 요소를 PDF에 적용 (pdf_file_stream: 파일 경로 또는 바이너리 스트림)
+
+    output_path를 지정하면 결과를 파일에 바로 기록하고 None을 반환합니다.
+    지정하지 않으면 결과 PDF의 bytes를 반환합니다.
+    save_mode가 "incremental"이고 입력과 출력이 모두 파일 경로이면 편집한 페이지만
+    원본 뒤에 덧붙이는 증분 업데이트로 저장합니다.
+    """
+    elements_by_page = group_elements_by_page(elements_json)
+
+    with documents.open_reader(pdf_file_stream) as reader:
+        if (save_mode == "incremental" and output_path is not None
+                and isinstance(pdf_file_stream, (str, os.PathLike)) and pageops.supports_incremental(reader)):
+            _apply_edits_incremental(reader, pdf_file_stream, output_path, elements_by_page, progress)
+            return None
+        writer = _apply_edits_full(reader, elements_by_page, progress)
+
+        # 큰 입력은 mmap으로 열리므로 원본을 연 채로 기록합니다
+        with metrics.phase("write"):
+            if output_path is not None:
+                # 결과를 메모리에 복사본으로 만들지 않고 파일에 바로 기록
+                with open(output_path, "wb") as output_file:
+                    writer.write(output_file)
+                return None
+
+            output_stream = io.BytesIO()
+            writer.write(output_stream)
+            return output_stream.getvalue()
\ No newline at end of file
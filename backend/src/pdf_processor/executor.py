@@ -0,0 +1,161 @@
+"""
+CPU 바운드 PDF 작업을 이벤트 루프 밖에서 실행하는 공용 실행기
+
+모든 라우터는 pypdf/reportlab 작업을 직접 실행하지 않고 run_cpu()로 제출합니다.
+- 무거운 작업: CPU 코어 수만큼의 프로세스 풀
+- 가벼운 작업(작은 입력) 또는 프로세스 풀을 생성할 수 없는 환경: 스레드 풀
+- 실행 중 + 대기 중 작업이 한도를 넘으면 503을 반환해 요청이 무한정 밀리지 않도록 합니다.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from pdf_processor import config, metrics, profiling, warmup
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_process_pool: Optional[ProcessPoolExecutor] = None
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool_disabled = False
+_pending = 0
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """프로세스 풀을 지연 생성하여 반환 (생성할 수 없으면 None)"""
+    global _process_pool, _process_pool_disabled
+    if _process_pool_disabled:
+        return None
+    with _lock:
+        if _process_pool is None:
+            try:
+                # 플랫폼마다 동작이 같도록 spawn 방식을 사용합니다 (Windows/macOS 기본값과 동일)
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=config.MAX_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    # 요청마다 폰트를 파싱하거나 모듈을 불러오지 않도록 워커 시작 시 한 번 준비합니다
+                    initializer=warmup.init_worker,
+                )
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"프로세스 풀을 생성할 수 없어 스레드 풀을 사용합니다: {e}")
+                _process_pool_disabled = True
+                return None
+        return _process_pool
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """스레드 풀을 지연 생성하여 반환"""
+    global _thread_pool
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=config.MAX_THREADS,
+                thread_name_prefix="pdf-worker",
+            )
+        return _thread_pool
+
+
+def _reset_process_pool(broken: ProcessPoolExecutor):
+    """비정상 종료된 프로세스 풀을 폐기 (다음 요청에서 새로 생성)"""
+    global _process_pool
+    with _lock:
+        if _process_pool is broken:
+            _process_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def pending_tasks() -> int:
+    """현재 실행 중이거나 대기 중인 작업 수"""
+    return _pending
+
+
+def _acquire_slot():
+    global _pending
+    if _pending >= config.MAX_WORKERS + config.MAX_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="서버가 처리 중인 작업이 너무 많습니다. 잠시 후 다시 시도해 주세요",
+            headers={"Retry-After": "5"},
+        )
+    _pending += 1
+
+
+def _release_slot():
+    global _pending
+    _pending -= 1
+
+
+async def _run_measured(loop, pool, call: Callable[[], Any]) -> Any:
+    """측정 중인 요청이면 워커에서 기록한 단계별 시간과 메모리를 요청의 기록에 합치고,
+    프로파일링 중인 요청이면 워커에서 프로파일링한 통계를 요청의 프로파일에 추가"""
+    request_metrics = metrics.current_metrics()
+    session = profiling.current_session()
+    if request_metrics is None and session is None:
+        return await loop.run_in_executor(pool, call)
+    result, snapshot = await loop.run_in_executor(
+        pool, functools.partial(metrics.measured_call, call, time.time(), session is not None)
+    )
+    if request_metrics is not None:
+        request_metrics.merge(snapshot)
+    if session is not None:
+        session.add_worker_stats(snapshot["profile"])
+    return result
+
+
+async def run_cpu(func: Callable[..., Any], *args, size_hint: Optional[int] = None, **kwargs) -> Any:
+    """CPU 바운드 함수를 워커 풀에서 실행하고 결과를 기다립니다.
+
+    Args:
+        func: 모듈 최상위에 정의된 함수 (프로세스 간 전달을 위해 pickle 가능해야 함)
+        size_hint: 입력 크기(바이트). CHEAP_TASK_BYTES 이하이면 스레드 풀에서 실행
+    """
+    _acquire_slot()
+    try:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+
+        cheap = size_hint is not None and size_hint <= config.CHEAP_TASK_BYTES
+        pool = None if cheap else get_process_pool()
+        if pool is None:
+            return await _run_measured(loop, get_thread_pool(), call)
+
+        try:
+            return await _run_measured(loop, pool, call)
+        except BrokenProcessPool:
+            # 워커가 비정상 종료된 경우(메모리 부족 등) 풀을 재생성하고 요청은 실패 처리
+            logger.error("워커 프로세스가 비정상 종료되어 풀을 재생성합니다")
+            _reset_process_pool(pool)
+            raise HTTPException(status_code=500, detail="작업 처리 중 워커 프로세스가 비정상 종료되었습니다")
+    finally:
+        _release_slot()
+
+
+async def run_in_thread(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """I/O 대기 위주의 블로킹 함수를 스레드 풀에서 실행 (동시 실행 한도는 run_cpu와 공유)"""
+    _acquire_slot()
+    try:
+        loop = asyncio.get_running_loop()
+        return await _run_measured(loop, get_thread_pool(), functools.partial(func, *args, **kwargs))
+    finally:
+        _release_slot()
+
+
+def shutdown():
+    """워커 풀 종료"""
+    global _process_pool, _thread_pool
+    with _lock:
+        process_pool, thread_pool = _process_pool, _thread_pool
+        _process_pool = None
+        _thread_pool = None
+    if process_pool is not None:
+        process_pool.shutdown(wait=False, cancel_futures=True)
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=False, cancel_futures=True)
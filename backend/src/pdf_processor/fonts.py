@@ -0,0 +1,116 @@
+"""
+reportlab 폰트 등록 관리
+
+CJK 폰트는 TTFont로 파싱하는 데 시간과 메모리가 많이 들기 때문에 프로세스마다 한 번만
+등록하고 모든 라우터가 공유합니다. 폰트는 처음 사용할 때(또는 preload_fonts() 호출 시)
+스레드 안전하게 등록되며, 로딩에 걸린 시간은 font_stats()로 확인할 수 있습니다.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+logger = logging.getLogger(__name__)
+
+# 등록 이름 -> 폰트 파일 이름
+FONT_FILES = {
+    "NotoSansKR": "NotoSansKR-VariableFont_wght.ttf",
+    "NotoSansKR-Regular": "NotoSansKR-Regular.ttf",
+    "NotoSansKR-Bold": "NotoSansKR-Bold.ttf",
+}
+
+# 폰트를 사용할 수 없을 때 대신 사용할 reportlab 기본 폰트
+FALLBACK_FONT = "Helvetica"
+
+_lock = threading.Lock()
+# 등록된 폰트의 로딩 정보 (등록 이름 -> 파일 경로, 소요 시간)
+_loaded: Dict[str, Dict[str, object]] = {}
+# 등록에 실패한 폰트 (등록 이름 -> 오류 메시지). 같은 파일을 매번 다시 파싱하지 않습니다
+_failed: Dict[str, str] = {}
+
+
+class FontLoadError(RuntimeError):
+    """폰트 파일을 찾을 수 없거나 등록할 수 없는 경우"""
+
+
+def get_font_dir() -> Path:
+    """폰트 디렉토리 (PyInstaller 번들이면 임시 압축 해제 경로)"""
+    if getattr(sys, '_MEIPASS', None):
+        return Path(sys._MEIPASS) / "pdf_processor" / "fonts"
+    return Path(__file__).resolve().parent.parent / "fonts"
+
+
+def _register(name: str):
+    """폰트 파일을 파싱하여 reportlab에 등록 (_lock을 잡은 상태에서 호출)"""
+    if name not in FONT_FILES:
+        raise FontLoadError(f"알 수 없는 폰트입니다: {name}")
+    path = get_font_dir() / FONT_FILES[name]
+    if not path.exists():
+        raise FontLoadError(f"폰트 파일을 찾을 수 없습니다: {path}")
+    started = time.perf_counter()
+    try:
+        pdfmetrics.registerFont(TTFont(name, str(path)))
+    except Exception as e:
+        raise FontLoadError(f"폰트를 등록할 수 없습니다: {path} ({e})") from e
+    elapsed = time.perf_counter() - started
+    _loaded[name] = {"path": str(path), "load_seconds": round(elapsed, 4)}
+    logger.info(f"폰트 등록 완료: {name} ({elapsed * 1000:.1f}ms)")
+
+
+def ensure_font(name: str) -> str:
+    """폰트가 등록되어 있지 않으면 등록하고 등록 이름을 반환
+
+    Raises:
+        FontLoadError: 폰트 파일이 없거나 등록에 실패한 경우
+    """
+    if name in _loaded:
+        return name
+    with _lock:
+        if name in _loaded:
+            return name
+        if name in _failed:
+            raise FontLoadError(_failed[name])
+        try:
+            _register(name)
+        except FontLoadError as e:
+            _failed[name] = str(e)
+            logger.error(str(e))
+            raise
+    return name
+
+
+def font_or_fallback(name: str) -> str:
+    """폰트를 등록하여 이름을 반환하고, 사용할 수 없으면 FALLBACK_FONT를 반환"""
+    try:
+        return ensure_font(name)
+    except FontLoadError:
+        return FALLBACK_FONT
+
+
+def preload_fonts(names: Optional[Iterable[str]] = None):
+    """폰트를 미리 등록 (서버 시작 시, 워커 프로세스 시작 시 호출)
+
+    실패한 폰트는 기록만 하고 넘어가며, 실제로 사용하는 요청에서 오류가 발생합니다.
+    """
+    for name in names if names is not None else FONT_FILES:
+        try:
+            ensure_font(name)
+        except FontLoadError:
+            pass
+
+
+def font_stats() -> Dict[str, object]:
+    """현재 프로세스의 폰트 로딩 정보"""
+    with _lock:
+        return {
+            "pid": os.getpid(),
+            "loaded": {name: dict(info) for name, info in _loaded.items()},
+            "failed": dict(_failed),
+            "total_load_seconds": round(sum(info["load_seconds"] for info in _loaded.values()), 4),
+        }
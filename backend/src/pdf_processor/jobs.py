@@ -0,0 +1,363 @@
+"""
+오래 걸리는 작업을 위한 비동기 작업(Job) 관리
+
+기존 라우터 함수를 백그라운드 태스크로 실행하고, 결과 파일은 작업이 삭제되거나
+보관 시간이 지날 때까지 세션 디렉토리에 유지합니다. 보관 시간이 지난 작업은 작업을 등록/조회/삭제할 때와
+서버가 켜져 있는 동안 PURGE_INTERVAL마다 정리합니다.
+워커 함수는 current_progress()로 받은 ProgressReporter에 페이지 단위 진행률을 기록합니다.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import unquote
+
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+from starlette.responses import FileResponse, StreamingResponse
+
+from pdf_processor import config, metrics, tempstore
+from pdf_processor.utils import save_upload
+
+logger = logging.getLogger(__name__)
+
+# 보관 시간이 지난 작업을 확인하는 최대 간격(초)
+PURGE_INTERVAL = 60
+
+class ProgressReporter:
+    """작업 진행률 기록기
+
+    진행률을 작업 디렉토리의 작은 JSON 파일에 기록하므로 pickle하여 워커 프로세스에
+    넘겨도 그대로 동작합니다.
+    """
+
+    MIN_WRITE_INTERVAL = 0.2
+
+    def __init__(self, path: Path):
+        self.path = str(path)
+        self.total = 0
+        self.done = 0
+        self._last_write = 0.0
+
+    def start(self, total: int):
+        """전체 작업량(페이지 수 등) 설정"""
+        self.total = total
+        self.done = 0
+        self._write(force=True)
+
+    def advance(self, count: int = 1):
+        """완료된 작업량 추가"""
+        self.done += count
+        self._write(force=self.done >= self.total)
+
+    def _write(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_write < self.MIN_WRITE_INTERVAL:
+            return
+        self._last_write = now
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"done": self.done, "total": self.total}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # 진행률 기록 실패는 작업 자체에 영향을 주지 않습니다
+            pass
+
+    def read(self) -> Dict[str, int]:
+        """기록된 진행률 읽기"""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"done": 0, "total": 0}
+
+
+_current_progress: contextvars.ContextVar[Optional[ProgressReporter]] = contextvars.ContextVar(
+    "job_progress", default=None
+)
+
+
+def current_progress() -> Optional[ProgressReporter]:
+    """현재 실행 중인 작업의 진행률 기록기 (일반 요청이면 None)"""
+    return _current_progress.get()
+
+
+class Job:
+    """비동기 작업 상태"""
+
+    def __init__(self, operation: str, job_dir: Path):
+        self.id = uuid.uuid4().hex
+        self.operation = operation
+        self.job_dir = job_dir
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.progress = ProgressReporter(job_dir / "progress.json")
+        self.result_path: Optional[Path] = None
+        self.result_filename: Optional[str] = None
+        self.media_type: Optional[str] = None
+        self.cleanup_tasks: List[Callable] = []
+        # 작업 실행 중 라우터가 만든 세션 디렉토리 (취소되면 라우터가 정리하지 못하므로 작업이 삭제)
+        self.session_dirs: List[Path] = []
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        progress = self.progress.read()
+        if self.status == "completed":
+            # 캐시된 결과를 반환한 작업처럼 진행률을 기록하지 않은 경우에도 완료로 표시
+            progress["done"] = progress["total"]
+            percent = 100.0
+        else:
+            percent = round(progress["done"] * 100 / progress["total"], 1) if progress["total"] else None
+        data = {
+            "id": self.id,
+            "operation": self.operation,
+            "status": self.status,
+            "progress": {**progress, "percent": percent},
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == "failed":
+            data["error"] = self.error
+            data["status_code"] = self.status_code
+        if self.status == "completed" and self.result_path is not None:
+            data["result"] = {
+                "filename": self.result_filename,
+                "media_type": self.media_type,
+                "size": self.result_path.stat().st_size if self.result_path.exists() else None,
+            }
+        return data
+
+
+_jobs: Dict[str, Job] = {}
+_running: Optional[asyncio.Semaphore] = None
+_purger: Optional[asyncio.Task] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _running
+    if _running is None:
+        _running = asyncio.Semaphore(config.MAX_RUNNING_JOBS)
+    return _running
+
+
+async def _detach_upload(upload: UploadFile, job_dir: Path, index: int) -> UploadFile:
+    """요청이 끝나면 닫히는 업로드 파일을 작업 디렉토리로 복사하여 새 UploadFile로 반환"""
+    filename = Path(upload.filename or "upload").name
+    path = job_dir / f"upload_{index}_{filename}"
+    await save_upload(upload, path)
+    return UploadFile(
+        file=open(path, "rb"),
+        filename=upload.filename,
+        size=path.stat().st_size,
+        headers=upload.headers,
+    )
+
+
+async def _detach_arguments(kwargs: Dict[str, Any], job_dir: Path) -> Dict[str, Any]:
+    detached = {}
+    index = 0
+    for name, value in kwargs.items():
+        if isinstance(value, UploadFile):
+            detached[name] = await _detach_upload(value, job_dir, index)
+            index += 1
+        elif isinstance(value, list) and value and all(isinstance(v, UploadFile) for v in value):
+            files = []
+            for v in value:
+                files.append(await _detach_upload(v, job_dir, index))
+                index += 1
+            detached[name] = files
+        else:
+            detached[name] = value
+    return detached
+
+
+def _filename_from_headers(response) -> Optional[str]:
+    disposition = response.headers.get("content-disposition", "")
+    for part in disposition.split(";"):
+        part = part.strip()
+        if part.startswith("filename*="):
+            return unquote(part.split("''", 1)[-1])
+        if part.startswith("filename="):
+            return part.split("=", 1)[1].strip('"')
+    return None
+
+
+async def _store_result(job: Job, response):
+    """라우터 응답을 작업 결과로 보관"""
+    if isinstance(response, FileResponse):
+        job.result_path = Path(response.path)
+        job.result_filename = response.filename or _filename_from_headers(response) or job.result_path.name
+        job.media_type = response.media_type
+    elif isinstance(response, StreamingResponse):
+        job.result_filename = _filename_from_headers(response) or "result"
+        job.result_path = job.job_dir / f"result_{Path(job.result_filename).name}"
+        job.media_type = response.media_type
+        with open(job.result_path, "wb") as f:
+            async for chunk in response.body_iterator:
+                f.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+    else:
+        raise RuntimeError(f"지원하지 않는 응답 형식입니다: {type(response).__name__}")
+    # 응답 전송 후 실행될 정리 작업은 작업 삭제 시점까지 미룹니다
+    if response.background is not None:
+        job.cleanup_tasks.append(response.background)
+
+
+def _remove_session_dirs(job: Job):
+    for session_dir in job.session_dirs:
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+
+async def _run_job(job: Job, endpoint: Callable, kwargs: Dict[str, Any]):
+    async with _get_semaphore():
+        job.status = "running"
+        job.started_at = time.time()
+        token = _current_progress.set(job.progress)
+        # 결과를 요청보다 오래 보관하므로 작업 중 만드는 세션은 RAM 디렉토리에 만들지 않습니다
+        tempstore.detach_request()
+        job.session_dirs = tempstore.own_sessions()
+        # 작업은 요청과 따로 측정하여 /metrics에 "job:작업 이름" 라우트로 집계합니다
+        metrics_token = metrics.begin()
+        started = time.perf_counter()
+        try:
+            response = await endpoint(**kwargs)
+            await _store_result(job, response)
+            job.status = "completed"
+        except HTTPException as e:
+            job.status = "failed"
+            job.status_code = e.status_code
+            job.error = str(e.detail)
+        except Exception as e:
+            logger.exception(f"작업 실행 실패: {job.operation} ({job.id})")
+            job.status = "failed"
+            job.status_code = 500
+            job.error = str(e)
+        except asyncio.CancelledError:
+            # 취소되면 라우터의 except Exception 정리가 실행되지 않습니다
+            job.status = "failed"
+            job.status_code = 499
+            job.error = "작업이 취소되었습니다"
+            raise
+        finally:
+            if job.status != "completed":
+                # 입력과 중간 결과가 남은 세션 디렉토리 삭제
+                _remove_session_dirs(job)
+            _current_progress.reset(token)
+            job_metrics = metrics.current_metrics()
+            metrics.end(metrics_token)
+            if config.METRICS:
+                metrics.record(f"job:{job.operation}", "JOB", job.status_code or 200,
+                               time.perf_counter() - started, job_metrics)
+            job.finished_at = time.time()
+            for value in kwargs.values():
+                uploads = value if isinstance(value, list) else [value]
+                for upload in uploads:
+                    if isinstance(upload, UploadFile):
+                        await upload.close()
+
+
+async def submit_job(operation: str, endpoint: Callable, kwargs: Dict[str, Any]) -> Job:
+    """라우터 함수를 비동기 작업으로 등록하고 바로 반환"""
+    await purge_expired_jobs()
+    if len(_jobs) >= config.MAX_JOBS:
+        raise HTTPException(
+            status_code=503,
+            detail="등록된 작업이 너무 많습니다. 잠시 후 다시 시도해 주세요",
+            headers={"Retry-After": "5"},
+        )
+
+    # 작업 디렉토리는 결과를 보관하는 동안 유지되므로 디스크에 만들고 삭제는 작업이 직접 관리합니다
+    job = Job(operation, tempstore.create_session(allow_ram=False, reap=False))
+    try:
+        detached = await _detach_arguments(kwargs, job.job_dir)
+    except Exception:
+        shutil.rmtree(job.job_dir, ignore_errors=True)
+        raise
+    job.progress.start(0)
+    _jobs[job.id] = job
+    job.task = asyncio.create_task(_run_job(job, endpoint, detached))
+    return job
+
+
+async def find_job(job_id: str) -> Job:
+    """보관 시간이 지난 작업을 정리한 뒤 작업을 찾음 (없으면 404)"""
+    await purge_expired_jobs()
+    return get_job(job_id)
+
+
+def get_job(job_id: str) -> Job:
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job
+
+
+async def delete_job(job_id: str):
+    """작업을 취소(실행 중인 경우)하고 결과 파일을 정리"""
+    job = _jobs.pop(job_id, None)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    if job.task is not None and not job.task.done():
+        job.task.cancel()
+    for task in job.cleanup_tasks:
+        try:
+            await task()
+        except Exception as e:
+            logger.warning(f"작업 정리 실패: {e}")
+    _remove_session_dirs(job)
+    shutil.rmtree(job.job_dir, ignore_errors=True)
+
+
+async def purge_expired_jobs():
+    """보관 시간이 지난 완료 작업 정리"""
+    now = time.time()
+    expired = [
+        job.id for job in _jobs.values()
+        if job.finished and job.finished_at is not None and now - job.finished_at > config.JOB_RESULT_TTL
+    ]
+    for job_id in expired:
+        # 다른 요청이 정리하는 동안 이미 삭제된 작업은 건너뜁니다
+        if job_id in _jobs:
+            await delete_job(job_id)
+
+
+async def _purge_loop():
+    while True:
+        # 보관 시간이 짧으면 그만큼 자주 확인합니다
+        await asyncio.sleep(max(1, min(PURGE_INTERVAL, config.JOB_RESULT_TTL)))
+        try:
+            await purge_expired_jobs()
+        except Exception as e:
+            logger.warning(f"보관 시간이 지난 작업을 정리하지 못했습니다: {e}")
+
+
+def start():
+    """서버 시작 시 보관 시간이 지난 작업의 주기적인 정리를 시작 (이벤트 루프의 백그라운드 태스크)
+
+    요청이 없는 서버에서도 결과 파일이 JOB_RESULT_TTL보다 오래 남지 않도록 합니다.
+    """
+    global _purger
+    if _purger is None or _purger.done():
+        _purger = asyncio.create_task(_purge_loop())
+
+
+def stop():
+    global _purger
+    if _purger is not None:
+        _purger.cancel()
+        _purger = None
@@ -1,5 +1,15 @@
-import uvicorn
 import sys
+import multiprocessing
+
+# PyInstaller로 패키징된 경우 워커 프로세스는 여기서 작업을 실행하고 종료합니다.
+# 워커가 앱과 라우터를 불러오지 않도록(앱 디렉토리 생성, atexit 등록 포함) 다른 모듈보다 먼저 호출합니다
+multiprocessing.freeze_support()
+
+# 시작 시간 측정(--import-report)은 다른 모듈을 불러오기 전에 시작해야 합니다
+from pdf_processor import startup
+startup.begin(sys.argv)
+
+import uvicorn
 import socket
 from pathlib import Path
 
@@ -29,6 +39,7 @@ def main():
         
         # 포트 번호를 stdout으로 출력 (Electron이 이를 읽음)
         print(f"PORT={port}", flush=True)
+        startup.port_ready()
         
         # FastAPI 서버 실행
         uvicorn.run(
@@ -0,0 +1,378 @@
+"""
+요청별 처리 시간/메모리 측정과 /metrics 집계
+
+요청 하나가 업로드 수신, 파일 저장, PdfReader 파싱, 오버레이 렌더링, 페이지 병합, 결과 쓰기 중
+어디에서 시간을 쓰는지 확인할 수 있도록 단계(phase)별 소요 시간을 기록합니다.
+
+- 라우터와 워커 함수는 `with metrics.phase("parse"):`처럼 단계를 감싸고, 처리한 페이지 수는
+  metrics.count("pages", n)으로 기록합니다. 측정 중인 요청이 없으면 아무것도 하지 않습니다.
+  단계 안에 다른 단계가 있으면 안쪽 단계의 시간은 바깥 단계에서 빠지므로 단계별 시간은 겹치지 않습니다.
+- run_cpu()/run_in_thread()로 실행된 작업은 워커 프로세스(또는 스레드)에서 따로 기록한 뒤 결과와 함께
+  돌려받아 요청의 기록에 합칩니다. 워커 프로세스에서는 작업 중 최대 RSS도 함께 측정합니다.
+  여러 워커에서 나누어 처리한 요청은 단계별 시간이 워커들의 합이므로 전체 시간보다 길 수 있습니다.
+- MetricsMiddleware가 요청마다 기록을 만들어 Server-Timing 응답 헤더로 내보내고, 응답이 끝나면
+  히스토그램에 집계합니다. GET /metrics는 집계를 Prometheus 텍스트 형식으로 출력합니다.
+
+스트리밍 응답(ZIP 등)은 헤더를 보낸 뒤에도 처리가 계속되므로 Server-Timing에는 헤더를 보내기 전까지의
+단계만 포함되고, /metrics에는 응답이 끝난 뒤의 전체 기록이 집계됩니다.
+"""
+import contextvars
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from pdf_processor import config
+
+
+class RequestMetrics:
+    """요청 하나(또는 워커에서 실행한 작업 하나)의 측정 기록"""
+
+    def __init__(self):
+        # 단계 이름 -> 누적 시간(초)
+        self.phases: Dict[str, float] = {}
+        # pages, bytes_in, bytes_out
+        self.counts: Dict[str, int] = {}
+        self.peak_rss: Optional[int] = None
+        # 업로드된 파일의 확장자, 크기, 형식 (내용과 파일 이름은 기록하지 않음)
+        self.inputs: List[Dict[str, Any]] = []
+
+    def add_phase(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_count(self, name: str, value: int):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def note_rss(self, rss: Optional[int]):
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """프로세스 간에 전달할 수 있는 기록"""
+        return {"phases": self.phases, "counts": self.counts, "peak_rss": self.peak_rss}
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """워커에서 기록한 snapshot()을 합침"""
+        for name, seconds in snapshot["phases"].items():
+            self.add_phase(name, seconds)
+        for name, value in snapshot["counts"].items():
+            self.add_count(name, value)
+        self.note_rss(snapshot["peak_rss"])
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing 헤더 값 (단계별 시간과 페이지 수, 입력 크기, 워커 최대 RSS)"""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={total_seconds * 1000:.1f}")
+        if "pages" in self.counts:
+            entries.append(f'pages;desc="{self.counts["pages"]}"')
+        if self.counts.get("bytes_in"):
+            entries.append(f'bytes-in;desc="{self.counts["bytes_in"]}"')
+        if self.peak_rss is not None:
+            entries.append(f'peak-rss;desc="{self.peak_rss / 2**20:.1f}MB"')
+        return ", ".join(entries)
+
+
+_current: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar(
+    "request_metrics", default=None
+)
+
+
+# 실행 중인 단계의 안쪽 단계 시간 합계 (바깥 단계의 자체 시간을 계산하기 위함)
+_enclosing: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "metrics_phase", default=None
+)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """현재 측정 중인 요청의 기록 (측정하지 않으면 None)"""
+    return _current.get()
+
+
+def begin() -> contextvars.Token:
+    """현재 컨텍스트에서 새 기록을 시작 (end(token)으로 종료)"""
+    return _current.set(RequestMetrics())
+
+
+def end(token: contextvars.Token):
+    _current.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """감싼 구간의 시간(안쪽 단계 제외)을 현재 기록의 name 단계에 더함"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    parent = _enclosing.get()
+    children = [0.0]
+    token = _enclosing.set(children)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _enclosing.reset(token)
+        if parent is not None:
+            parent[0] += elapsed
+        metrics.add_phase(name, max(0.0, elapsed - children[0]))
+
+
+def count(name: str, value: int):
+    """현재 기록에 수량(처리한 페이지 수 등)을 더함"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_count(name, value)
+
+
+def note_input(filename: Optional[str], size: int, content_type: Optional[str]):
+    """업로드된 파일 정보를 현재 기록에 추가"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.inputs.append({
+            "suffix": os.path.splitext(filename or "")[1].lower(),
+            "size": size,
+            "content_type": content_type,
+        })
+
+
+# --- 메모리 ---
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_psutil_process = None
+_psutil_checked = False
+
+
+def _psutil():
+    """psutil이 설치되어 있으면 현재 프로세스의 psutil.Process (Windows/macOS용)"""
+    global _psutil_process, _psutil_checked
+    if not _psutil_checked:
+        _psutil_checked = True
+        try:
+            import psutil
+            _psutil_process = psutil.Process()
+        except Exception:
+            _psutil_process = None
+    return _psutil_process
+
+
+def rss_bytes() -> Optional[int]:
+    """현재 프로세스의 RSS(바이트, 알 수 없으면 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    process = _psutil()
+    return process.memory_info().rss if process is not None else None
+
+
+def _reset_peak_rss() -> bool:
+    """최대 RSS 기록을 현재 RSS로 초기화 (Linux에서만 가능)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 최대 RSS(바이트)
+
+    Linux에서는 마지막 _reset_peak_rss() 이후의 최대값이고, 다른 OS에서는 프로세스 시작 이후의 최대값입니다.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # macOS는 바이트, Linux는 KB 단위
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    except ImportError:
+        process = _psutil()
+        return getattr(process.memory_info(), "peak_wset", None) if process is not None else None
+
+
+def measured_call(call: Callable[[], Any], submitted_at: float,
+                  profile: bool = False) -> Tuple[Any, Dict[str, Any]]:
+    """워커에서 작업을 실행하며 따로 기록하고 (결과, 기록)을 반환 (executor가 작업을 감쌀 때 사용)
+
+    워커 프로세스는 작업을 하나씩 실행하므로 작업 전후의 최대 RSS가 그 작업의 최대 메모리입니다.
+    스레드 풀에서는 다른 요청과 메모리를 공유하므로 작업이 끝난 시점의 RSS만 기록합니다.
+    profile이 True이면 작업을 프로파일러로 실행하고 통계를 기록의 "profile"에 담습니다.
+    """
+    metrics = RequestMetrics()
+    metrics.add_phase("queue", max(0.0, time.time() - submitted_at))
+    in_worker_process = multiprocessing.parent_process() is not None and _reset_peak_rss()
+    token = _current.set(metrics)
+    profile_stats = None
+    try:
+        if profile:
+            from pdf_processor import profiling
+            result, profile_stats = profiling.profile_call(call)
+        else:
+            result = call()
+    finally:
+        _current.reset(token)
+    metrics.note_rss(peak_rss_bytes() if in_worker_process else rss_bytes())
+    return result, dict(metrics.snapshot(), profile=profile_stats)
+
+
+# --- 집계 ---
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(10 ** n for n in range(3, 10))
+PAGES_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+RSS_BUCKETS = tuple(2 ** n * 2**20 for n in range(5, 14))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Prometheus 히스토그램 (레이블 값 조합마다 버킷별 누적 개수, 합계, 개수)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # 레이블 값 -> [버킷별 개수..., 합계, 개수]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            prefix = base + "," if base else ""
+            for bound, value in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {value}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:g}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+_lock = threading.Lock()
+_duration = Histogram(
+    "pdf_request_duration_seconds", "요청 처리 시간", ("route", "method", "status"), LATENCY_BUCKETS)
+_phase_duration = Histogram(
+    "pdf_request_phase_seconds", "요청의 단계별 처리 시간 (여러 워커에서 처리하면 합계)", ("route", "phase"),
+    LATENCY_BUCKETS)
+_bytes = Histogram("pdf_request_bytes", "요청 본문(in)과 응답 본문(out) 크기", ("route", "direction"), BYTES_BUCKETS)
+_pages = Histogram("pdf_request_pages", "요청에서 처리한 페이지 수", ("route",), PAGES_BUCKETS)
+_peak_rss = Histogram(
+    "pdf_worker_peak_rss_bytes", "요청을 처리한 워커의 최대 RSS", ("route",), RSS_BUCKETS)
+HISTOGRAMS = (_duration, _phase_duration, _bytes, _pages, _peak_rss)
+
+
+def record(route: str, method: str, status: int, seconds: float, metrics: RequestMetrics):
+    """끝난 요청의 기록을 집계"""
+    with _lock:
+        _duration.observe((route, method, str(status)), seconds)
+        for name, phase_seconds in metrics.phases.items():
+            _phase_duration.observe((route, name), phase_seconds)
+        for direction in ("in", "out"):
+            if f"bytes_{direction}" in metrics.counts:
+                _bytes.observe((route, direction), metrics.counts[f"bytes_{direction}"])
+        if "pages" in metrics.counts:
+            _pages.observe((route,), metrics.counts["pages"])
+        if metrics.peak_rss is not None:
+            _peak_rss.observe((route,), metrics.peak_rss)
+
+
+def render_prometheus() -> str:
+    """집계한 히스토그램과 현재 상태를 Prometheus 텍스트 형식으로 출력"""
+    from pdf_processor import executor
+
+    with _lock:
+        lines = [line for histogram in HISTOGRAMS for line in histogram.render()]
+    lines += [
+        "# HELP pdf_pending_tasks 실행 중이거나 대기 중인 작업 수",
+        "# TYPE pdf_pending_tasks gauge",
+        f"pdf_pending_tasks {executor.pending_tasks()}",
+    ]
+    rss = rss_bytes()
+    if rss is not None:
+        lines += [
+            "# HELP pdf_server_resident_memory_bytes API 서버 프로세스의 RSS",
+            "# TYPE pdf_server_resident_memory_bytes gauge",
+            f"pdf_server_resident_memory_bytes {rss}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def _route_label(scope) -> str:
+    """경로 대신 라우트 경로 템플릿을 레이블로 사용 (/jobs/{job_id} 등으로 시계열이 늘어나지 않도록)"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """요청마다 기록을 시작하고 Server-Timing 헤더 추가, 응답이 끝나면 집계 (ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.METRICS:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        status = 500
+        content_length = None
+
+        async def receive_with_metrics():
+            message = await receive()
+            if message["type"] == "http.request":
+                metrics.add_count("bytes_in", len(message.get("body", b"")))
+                if not message.get("more_body", False):
+                    # 요청 시작부터 본문을 모두 받을 때까지 (multipart 파싱 포함)
+                    metrics.add_phase("upload", time.perf_counter() - started)
+            return message
+
+        async def send_with_metrics(message):
+            nonlocal status, content_length
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                if headers.get("content-length", "").isdigit():
+                    content_length = int(headers["content-length"])
+                headers.append("Server-Timing", metrics.server_timing(time.perf_counter() - started))
+            elif message["type"] == "http.response.body":
+                metrics.add_count("bytes_out", len(message.get("body", b"")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_with_metrics, send_with_metrics)
+        finally:
+            _current.reset(token)
+            if content_length is not None and not metrics.counts.get("bytes_out"):
+                # 파일을 직접 전송(pathsend)한 경우
+                metrics.counts["bytes_out"] = content_length
+            record(_route_label(scope), scope["method"], status, time.perf_counter() - started, metrics)
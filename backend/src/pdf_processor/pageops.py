@@ -0,0 +1,563 @@
+"""
+페이지 단위 문서 재구성 (분할/회전)
+
+- 페이지 선택은 집합으로 다루어 페이지마다 목록을 검색하지 않습니다.
+- 선택한 페이지는 페이지 트리의 /Count를 따라 바로 찾아가므로 전체 페이지를 펼치지(flatten) 않습니다.
+- 새 문서에는 선택한 페이지에서 참조하는 객체만 복사됩니다.
+- 여러 문서로 나누는 경우(n페이지씩, 범위 묶음, 책갈피) 원본을 한 번만 열어 모든 문서를 만듭니다.
+- 여러 문서를 합친 결과에서 내용이 같은 스트림(폰트, 이미지 등)은 하나만 저장합니다.
+- 모든 페이지를 유지하는 회전, 편집/워터마크의 증분 저장 모드는 원본 파일 뒤에 바뀐 페이지 객체와
+  새 객체만 덧붙이는 증분 업데이트(IncrementalUpdate)로 저장하므로 문서 크기와 관계없이
+  바뀐 페이지 수에 비례하는 시간이 걸립니다.
+- 오버레이 PDF를 Form XObject로 만들어 페이지에 그리는 함수는 PdfWriter와 증분 업데이트에서 함께 사용합니다.
+"""
+import bisect
+import hashlib
+import logging
+import shutil
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    FloatObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+    StreamObject,
+)
+
+from pdf_processor import metrics
+from pdf_processor.documents import open_reader
+from pdf_processor.utils import InvalidInputError, parse_page_ranges
+
+logger = logging.getLogger(__name__)
+
+# 하위 페이지가 상속받는 페이지 속성
+_INHERITABLE = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def page_count(reader: PdfReader) -> int:
+    """페이지 트리를 펼치지 않고 전체 페이지 수를 반환"""
+    try:
+        return int(reader.root_object["/Pages"].get_object()["/Count"])
+    except (KeyError, TypeError, ValueError):
+        return len(reader.pages)
+
+
+def select_pages(pages: str, total_pages: int, allow_all: bool = True) -> Set[int]:
+    """페이지 범위 문자열을 페이지 번호(1부터) 집합으로 변환
+
+    Raises:
+        InvalidInputError: 범위가 잘못되었거나 선택된 페이지가 없는 경우
+    """
+    if allow_all and pages.strip().lower() == "all":
+        return set(range(1, total_pages + 1))
+    try:
+        selected = set(parse_page_ranges(pages, total_pages))
+    except ValueError as e:
+        raise InvalidInputError(str(e))
+    if not selected:
+        example = " 또는 'all'" if allow_all else ""
+        raise InvalidInputError(
+            f"페이지가 선택되지 않았습니다. 예시: '1-3,5,7-9' (1부터 {total_pages}까지){example}"
+        )
+    return selected
+
+
+def _locate_pages(reader: PdfReader, indices: List[int]) -> Dict[int, Tuple[IndirectObject, Dict]]:
+    """페이지 트리에서 지정한 페이지(0부터, 정렬됨)의 참조와 상속 속성을 찾음
+
+    하위 노드의 /Count로 원하는 페이지가 없는 가지는 건너뜁니다.
+    """
+    found: Dict[int, Tuple[IndirectObject, Dict]] = {}
+
+    def wanted(start: int, end: int) -> bool:
+        pos = bisect.bisect_left(indices, start)
+        return pos < len(indices) and indices[pos] < end
+
+    def visit(node: DictionaryObject, offset: int, inherited: Dict, depth: int):
+        if depth > 64:
+            raise ValueError("페이지 트리가 너무 깊습니다")
+        inherited = dict(inherited)
+        for key in _INHERITABLE:
+            if key in node:
+                inherited[key] = node[key]
+        kids = node["/Kids"].get_object()
+        # 모든 하위 노드가 페이지 1개씩이면 /Count만으로 위치를 알 수 있으므로 필요한 것만 읽습니다
+        if int(node["/Count"]) == len(kids):
+            for index in indices[bisect.bisect_left(indices, offset):bisect.bisect_left(indices, offset + len(kids))]:
+                visit_kid(kids[index - offset], index, inherited, depth)
+            return
+        for kid in kids:
+            kid_obj = kid.get_object()
+            count = int(kid_obj["/Count"]) if "/Kids" in kid_obj else 1
+            if wanted(offset, offset + count):
+                visit_kid(kid, offset, inherited, depth)
+            offset += count
+
+    def visit_kid(kid, offset: int, inherited: Dict, depth: int):
+        kid_obj = kid.get_object()
+        if "/Kids" in kid_obj:
+            visit(kid_obj, offset, inherited, depth + 1)
+        elif isinstance(kid, IndirectObject):
+            found[offset] = (kid, inherited)
+        else:
+            raise ValueError("간접 참조가 아닌 페이지 객체입니다")
+
+    visit(reader.root_object["/Pages"].get_object(), 0, {}, 0)
+    if len(found) != len(indices):
+        raise ValueError("페이지 트리의 /Count가 실제 페이지 수와 다릅니다")
+    return found
+
+
+def selected_pages(reader: PdfReader, page_numbers: Iterable[int]) -> List[PageObject]:
+    """페이지 번호(1부터) 순서대로 상속 속성이 반영된 PageObject 복사본 목록을 반환"""
+    page_numbers = list(page_numbers)
+    indices = sorted({n - 1 for n in page_numbers})
+    try:
+        located = _locate_pages(reader, indices)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        # 페이지 트리가 비정상이면 pypdf가 전체 페이지를 펼쳐서 처리하도록 합니다
+        logger.debug(f"페이지 트리 탐색 실패, 전체 페이지를 펼칩니다: {e}")
+        located = None
+
+    # 호출하는 쪽에서 페이지를 수정해도 PdfReader의 객체(캐시된 문서일 수 있음)는 바뀌지 않도록 복사합니다
+    if located is None:
+        copies = []
+        for n in page_numbers:
+            original = reader.pages[n - 1]
+            page = PageObject(reader, original.indirect_reference)
+            page.update(original)
+            copies.append(page)
+        return copies
+
+    pages = {}
+    for index, (ref, inherited) in located.items():
+        page = PageObject(reader, ref)
+        page.update(ref.get_object())
+        for key, value in inherited.items():
+            if key not in page:
+                page[NameObject(key)] = value
+        pages[index] = page
+    return [pages[n - 1] for n in page_numbers]
+
+
+def _write_pages(reader: PdfReader, dest, page_numbers: List[int], rotate: Optional[Set[int]] = None,
+                 angle: int = 0, progress=None):
+    writer = PdfWriter()
+    with metrics.phase("copy"):
+        for page_number, page in zip(page_numbers, selected_pages(reader, page_numbers)):
+            if rotate and page_number in rotate:
+                page.rotate(angle)
+            writer.add_page(page)
+            if progress:
+                progress.advance()
+    metrics.count("pages", len(page_numbers))
+    with metrics.phase("write"), open(dest, "wb") as output_file:
+        writer.write(output_file)
+
+
+def extract_pages(src, dest, page_numbers: Iterable[int], rotate: Optional[Set[int]] = None,
+                  angle: int = 0, progress=None):
+    """지정한 페이지(1부터)만 새 PDF로 저장
+
+    선택한 페이지에서 참조하는 객체만 복사되며, rotate에 포함된 페이지는 angle만큼 회전합니다.
+    """
+    page_numbers = list(page_numbers)
+    if progress:
+        progress.start(len(page_numbers))
+    with open_reader(src) as reader:
+        _write_pages(reader, dest, page_numbers, rotate, angle, progress)
+
+
+def extract_parts(src, parts: List[Tuple[str, List[int]]]):
+    """원본을 한 번만 열어 여러 문서로 나누어 저장
+
+    Args:
+        parts: (저장 경로, 페이지 번호 목록) 목록
+    """
+    with open_reader(src) as reader:
+        for dest, page_numbers in parts:
+            _write_pages(reader, dest, page_numbers)
+
+
+def every_n_pages(total_pages: int, n: int) -> List[List[int]]:
+    """n페이지씩 나눈 페이지 번호 목록"""
+    if n < 1:
+        raise InvalidInputError("나눌 페이지 수는 1 이상이어야 합니다")
+    return [list(range(start, min(start + n, total_pages + 1))) for start in range(1, total_pages + 1, n)]
+
+
+def range_groups(spec: str, total_pages: int) -> List[List[int]]:
+    """세미콜론으로 구분한 페이지 범위 묶음(예: "1-3;4-10;11-")을 문서별 페이지 번호 목록으로 변환
+
+    각 묶음은 parse_page_ranges 형식이며, "11-"처럼 끝을 생략하면 마지막 페이지까지,
+    "-3"처럼 시작을 생략하면 첫 페이지부터입니다.
+    """
+    groups = []
+    for group in spec.split(";"):
+        parts = []
+        for part in group.replace(" ", "").split(","):
+            if part.endswith("-"):
+                part = f"{part}{total_pages}"
+            elif part.startswith("-"):
+                part = f"1{part}"
+            parts.append(part)
+        group = ",".join(p for p in parts if p)
+        if group:
+            groups.append(sorted(select_pages(group, total_pages, allow_all=False)))
+    if not groups:
+        raise InvalidInputError("나눌 페이지 범위가 없습니다. 예시: '1-3;4-10;11-'")
+    return groups
+
+
+def bookmark_groups(reader: PdfReader, total_pages: int) -> List[Tuple[str, List[int]]]:
+    """최상위 책갈피마다 (제목, 페이지 번호 목록)으로 나눔
+
+    첫 책갈피 앞의 페이지는 제목 없이 별도 문서가 됩니다.
+    """
+    starts: Dict[int, str] = {}
+    for item in reader.outline:
+        # 하위 책갈피는 목록으로 들어 있으므로 건너뜁니다
+        if isinstance(item, list):
+            continue
+        try:
+            page_number = reader.get_destination_page_number(item) + 1
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        if 1 <= page_number <= total_pages and page_number not in starts:
+            starts[page_number] = str(item.title or "")
+    if not starts:
+        raise InvalidInputError("책갈피가 없는 문서입니다")
+
+    if 1 not in starts:
+        starts[1] = ""
+    ordered = sorted(starts)
+    bounds = ordered[1:] + [total_pages + 1]
+    return [(starts[start], list(range(start, end))) for start, end in zip(ordered, bounds)]
+
+
+def _stream_digest(stream: StreamObject) -> bytes:
+    """스트림 사전(/Length 제외)과 인코딩된 데이터의 해시"""
+    digest = hashlib.sha256()
+    header = BytesIO()
+    for key in sorted(k for k in stream if k != "/Length"):
+        header.write(key.encode("latin-1"))
+        stream.raw_get(key).write_to_stream(header)
+    digest.update(header.getvalue())
+    digest.update(b"\x00")
+    digest.update(stream._data)
+    return digest.digest()
+
+
+def _replace_refs(obj: PdfObject, replaced: Dict[int, IndirectObject]) -> bool:
+    """사전/배열 안의 간접 참조를 replaced(객체 번호 -> 새 참조)에 따라 바꾸고, 바뀐 것이 있는지 반환"""
+    changed = False
+    if isinstance(obj, DictionaryObject):
+        items = list(obj.items())
+    elif isinstance(obj, ArrayObject):
+        items = list(enumerate(obj))
+    else:
+        return False
+    for key, value in items:
+        if isinstance(value, IndirectObject):
+            if value.idnum in replaced:
+                obj[key] = replaced[value.idnum]
+                changed = True
+        elif _replace_refs(value, replaced):
+            changed = True
+    return changed
+
+
+def deduplicate_streams(writer: PdfWriter, max_passes: int = 4) -> Tuple[int, int]:
+    """내용이 같은 스트림 객체를 하나로 합치고 (합친 객체 수, 줄어든 스트림 바이트 수)를 반환
+
+    이미지의 /SMask처럼 다른 스트림을 참조하는 스트림은 참조 대상이 합쳐진 뒤에야 같아지므로,
+    참조가 바뀐 스트림만 다시 비교하며 더 이상 합칠 것이 없을 때까지 반복합니다.
+    """
+    objects = writer._objects
+    canonical: Dict[bytes, IndirectObject] = {}
+    removed = saved = 0
+    candidates = [i for i, obj in enumerate(objects) if isinstance(obj, StreamObject)]
+    for _ in range(max_passes):
+        replaced: Dict[int, IndirectObject] = {}
+        for index in candidates:
+            stream = objects[index]
+            if stream is None:
+                continue
+            digest = _stream_digest(stream)
+            ref = canonical.get(digest)
+            if ref is None:
+                canonical[digest] = IndirectObject(index + 1, 0, writer)
+            elif ref.idnum != index + 1:
+                replaced[index + 1] = ref
+                saved += len(stream._data)
+                objects[index] = None
+                removed += 1
+        if not replaced:
+            break
+        candidates = []
+        for index, obj in enumerate(objects):
+            if obj is not None and _replace_refs(obj, replaced) and isinstance(obj, StreamObject):
+                candidates.append(index)
+        # 참조가 바뀐 스트림은 해시가 달라지므로 이전 해시를 지우고 다시 등록합니다
+        stale = {index + 1 for index in candidates}
+        canonical = {digest: ref for digest, ref in canonical.items() if ref.idnum not in stale}
+        if not candidates:
+            break
+    return removed, saved
+
+
+def _find_startxref(path) -> int:
+    """파일 끝의 startxref 값 (마지막 상호 참조 섹션 위치)"""
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(max(0, size - 2048))
+        tail = f.read()
+    pos = tail.rfind(b"startxref")
+    if pos < 0:
+        raise ValueError("startxref를 찾을 수 없습니다")
+    return int(tail[pos + len(b"startxref"):].split()[0])
+
+
+def _uses_xref_stream(path, startxref: int) -> bool:
+    with open(path, "rb") as f:
+        f.seek(startxref)
+        return not f.read(32).lstrip().startswith(b"xref")
+
+
+def _append_incremental_update(reader: PdfReader, src, dest, objects: Dict[int, Tuple[int, PdfObject]], size: int):
+    """원본 파일을 복사하고 바뀐 객체와 상호 참조 섹션만 뒤에 덧붙임
+
+    Args:
+        objects: 객체 번호 -> (세대 번호, 새 객체 내용)
+        size: 새 객체까지 포함한 객체 번호의 상한 (트레일러의 /Size)
+    """
+    prev = _find_startxref(src)
+    xref_stream = _uses_xref_stream(src, prev)
+
+    shutil.copyfile(src, dest)
+    with open(dest, "r+b") as f:
+        f.seek(-1, 2)
+        if f.read(1) not in (b"\n", b"\r"):
+            f.write(b"\n")
+
+        offsets: Dict[int, Tuple[int, int]] = {}
+        for idnum in sorted(objects):
+            generation, obj = objects[idnum]
+            offsets[idnum] = (f.tell(), generation)
+            f.write(f"{idnum} {generation} obj\n".encode())
+            obj.write_to_stream(f)
+            f.write(b"\nendobj\n")
+
+        trailer = DictionaryObject()
+        for key in ("/Root", "/Info", "/ID"):
+            if key in reader.trailer:
+                trailer[NameObject(key)] = reader.trailer.raw_get(key)
+        trailer[NameObject("/Prev")] = NumberObject(prev)
+
+        if xref_stream:
+            # 원본이 상호 참조 스트림을 사용하면 같은 형식으로 추가합니다 (자기 자신도 항목에 포함)
+            xref_idnum = size
+            xref_offset = f.tell()
+            offsets[xref_idnum] = (xref_offset, 0)
+            width = max(4, (xref_offset.bit_length() + 7) // 8)
+            data = BytesIO()
+            index = ArrayObject()
+            for idnum in sorted(offsets):
+                offset, generation = offsets[idnum]
+                data.write(b"\x01" + offset.to_bytes(width, "big") + generation.to_bytes(2, "big"))
+                index.extend([NumberObject(idnum), NumberObject(1)])
+            stream = StreamObject()
+            stream.set_data(data.getvalue())
+            stream.update(trailer)
+            stream.update({
+                NameObject("/Type"): NameObject("/XRef"),
+                NameObject("/Size"): NumberObject(size + 1),
+                NameObject("/W"): ArrayObject([NumberObject(1), NumberObject(width), NumberObject(2)]),
+                NameObject("/Index"): index,
+            })
+            f.write(f"{xref_idnum} 0 obj\n".encode())
+            stream.write_to_stream(f)
+            f.write(b"\nendobj\n")
+        else:
+            xref_offset = f.tell()
+            f.write(b"xref\n")
+            for idnum in sorted(offsets):
+                offset, generation = offsets[idnum]
+                f.write(f"{idnum} 1\n{offset:010d} {generation:05d} n\r\n".encode())
+            trailer[NameObject("/Size")] = NumberObject(size)
+            f.write(b"trailer\n")
+            trailer.write_to_stream(f)
+            f.write(b"\n")
+        f.write(f"startxref\n{xref_offset}\n%%EOF\n".encode())
+
+
+class IncrementalUpdate:
+    """원본 PDF 뒤에 덧붙일 증분 업데이트
+
+    바뀐 기존 객체(update_object)와 새 객체(add_object, import_object)만 모아 두었다가
+    write()에서 원본 바이트 뒤에 새 상호 참조 섹션과 함께 기록합니다.
+    """
+
+    def __init__(self, src, reader: Optional[PdfReader] = None):
+        self.src = src
+        self.reader = reader if reader is not None else PdfReader(src)
+        if not supports_incremental(self.reader):
+            raise ValueError("증분 업데이트를 적용할 수 없는 문서입니다")
+        self._next_id = int(self.reader.trailer["/Size"])
+        self._objects: Dict[int, Tuple[int, PdfObject]] = {}
+        self._imported: Dict[Tuple[int, int, int], IndirectObject] = {}
+
+    def pages(self, page_numbers: Iterable[int]) -> List[PageObject]:
+        """수정할 페이지(1부터). 수정한 뒤 update_object(page.indirect_reference, page)로 등록합니다"""
+        return selected_pages(self.reader, page_numbers)
+
+    def _reserve(self) -> IndirectObject:
+        ref = IndirectObject(self._next_id, 0, self.reader)
+        self._next_id += 1
+        return ref
+
+    def add_object(self, obj: PdfObject) -> IndirectObject:
+        """새 객체를 추가하고 참조를 반환"""
+        ref = self._reserve()
+        self._objects[ref.idnum] = (0, obj)
+        return ref
+
+    def update_object(self, ref: IndirectObject, obj: PdfObject):
+        """기존 객체의 새 내용을 등록"""
+        self._objects[ref.idnum] = (ref.generation, obj)
+
+    def import_object(self, obj: PdfObject) -> PdfObject:
+        """다른 PDF(오버레이 등)의 객체를 이 문서의 새 객체 번호로 복사"""
+        if isinstance(obj, IndirectObject):
+            key = (id(obj.pdf), obj.idnum, obj.generation)
+            ref = self._imported.get(key)
+            if ref is None:
+                ref = self._reserve()
+                self._imported[key] = ref
+                self._objects[ref.idnum] = (0, self.import_object(obj.get_object()))
+            return ref
+        if isinstance(obj, StreamObject):
+            copy = StreamObject()
+            # 이미 인코딩된 데이터를 그대로 복사합니다 (/Filter도 함께 복사)
+            copy._data = obj._data
+            for key, value in obj.items():
+                if key != "/Length":
+                    copy[NameObject(key)] = self.import_object(value)
+            return copy
+        if isinstance(obj, DictionaryObject):
+            return DictionaryObject({NameObject(k): self.import_object(v) for k, v in obj.items()})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self.import_object(v) for v in obj)
+        return obj
+
+    def write(self, dest):
+        with metrics.phase("write"):
+            _append_incremental_update(self.reader, self.src, dest, self._objects, self._next_id)
+
+
+def supports_incremental(reader: PdfReader) -> bool:
+    """증분 업데이트로 저장할 수 있는지 (암호화된 문서는 객체마다 다시 암호화해야 하므로 제외)"""
+    return not reader.is_encrypted
+
+
+class WriterTarget:
+    """PdfWriter에 객체를 추가하는 어댑터 (IncrementalUpdate와 같은 인터페이스)"""
+
+    def __init__(self, writer: PdfWriter):
+        self.writer = writer
+
+    def add_object(self, obj: PdfObject) -> IndirectObject:
+        return self.writer._add_object(obj)
+
+    def import_object(self, obj: PdfObject) -> PdfObject:
+        return obj.clone(self.writer)
+
+
+def overlay_xobject(target, overlay_pdf: bytes) -> IndirectObject:
+    """한 페이지짜리 오버레이 PDF를 Form XObject로 변환하여 문서에 추가
+
+    페이지마다 오버레이 내용을 복사하여 병합하는 대신 이 XObject를 참조하여 그리므로,
+    같은 오버레이를 여러 페이지에서 공유할 수 있습니다.
+    """
+    with metrics.phase("merge"):
+        overlay_page = PdfReader(BytesIO(overlay_pdf)).pages[0]
+        xobject = DecodedStreamObject()
+        xobject.set_data(overlay_page.get_contents().get_data())
+        xobject.update({
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): ArrayObject([FloatObject(v) for v in overlay_page.mediabox]),
+            NameObject("/Resources"): target.import_object(overlay_page["/Resources"].get_object()),
+        })
+        return target.add_object(xobject.flate_encode())
+
+
+def add_content_stream(target, data: bytes) -> IndirectObject:
+    """여러 페이지가 공유할 수 있는 내용 스트림 추가"""
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return target.add_object(stream)
+
+
+def draw_xobject_stream(target, name: str, x: float, y: float) -> IndirectObject:
+    """(x, y)에 XObject를 그리는 내용 스트림 (stamp_xobject의 q와 짝을 맞춰 Q로 시작)"""
+    return add_content_stream(target, f"Q\nq 1 0 0 1 {x:g} {y:g} cm {name} Do Q\n".encode())
+
+
+def stamp_xobject(page: DictionaryObject, name: str, xobject_ref: IndirectObject,
+                  save_state_ref: IndirectObject, draw_ref: IndirectObject):
+    """페이지 리소스에 XObject를 등록하고 기존 내용 뒤에서 그리도록 내용 스트림을 연결
+
+    기존 내용은 q ... Q로 감싸서 그래픽 상태가 오버레이에 영향을 주지 않도록 합니다.
+    여러 페이지가 공유하는 리소스 사전은 수정하지 않고 페이지 전용 복사본을 만듭니다.
+    """
+    resources = DictionaryObject(page["/Resources"].get_object()) if "/Resources" in page else DictionaryObject()
+    xobjects = DictionaryObject(resources["/XObject"].get_object()) if "/XObject" in resources else DictionaryObject()
+    xobjects[NameObject(name)] = xobject_ref
+    resources[NameObject("/XObject")] = xobjects
+    page[NameObject("/Resources")] = resources
+
+    contents = []
+    if "/Contents" in page:
+        # page["/Contents"]는 간접 참조를 풀어 버리므로 참조 그대로 가져옵니다
+        original = page.raw_get("/Contents")
+        contents = list(original.get_object()) if isinstance(original.get_object(), ArrayObject) else [original]
+    page[NameObject("/Contents")] = ArrayObject([save_state_ref] + contents + [draw_ref])
+
+
+def rotate_pages_incremental(src, dest, page_numbers: Set[int], angle: int, progress=None) -> bool:
+    """선택한 페이지의 /Rotate만 바꾸는 증분 업데이트로 저장
+
+    암호화된 문서 등 증분 업데이트를 적용할 수 없으면 아무것도 쓰지 않고 False를 반환합니다.
+    """
+    with open_reader(src) as reader:
+        if not supports_incremental(reader):
+            return False
+        indices = sorted(n - 1 for n in page_numbers)
+        try:
+            update = IncrementalUpdate(src, reader)
+            located = _locate_pages(reader, indices)
+            if progress:
+                progress.start(len(located))
+            for ref, inherited in located.values():
+                # 캐시된 PdfReader의 객체를 바꾸지 않도록 복사본을 수정합니다
+                page = DictionaryObject(ref.get_object())
+                current = int(page.get("/Rotate", inherited.get("/Rotate", 0)))
+                page[NameObject("/Rotate")] = NumberObject((current + angle) % 360)
+                update.update_object(ref, page)
+                if progress:
+                    progress.advance()
+            metrics.count("pages", len(located))
+            update.write(dest)
+        except (KeyError, TypeError, ValueError, AttributeError, OSError) as e:
+            logger.debug(f"증분 업데이트를 사용할 수 없어 전체 문서를 다시 씁니다: {e}")
+            return False
+    return True
@@ -0,0 +1,72 @@
+"""
+입력 PDF 열기
+
+pypdf의 PdfReader(경로)는 파일 전체를 read()로 읽어 BytesIO에 복사한 뒤 파싱하므로, 큰 파일은
+페이지 캐시와 별개로 파일 크기만큼의 힙 메모리를 한 번 더 사용합니다. 여기서는 MMAP_MIN_BYTES 이상인
+파일을 mmap으로 열어 그 매핑을 그대로 PdfReader의 스트림으로 넘깁니다.
+
+- 파일 내용은 복사되지 않고, pypdf가 실제로 읽는 부분(상호 참조 표, 사용하는 객체)만 디스크에서 읽힙니다.
+- 같은 파일을 여러 워커가 열어도 페이지 캐시를 공유하며, RAM 세션(tempstore)의 파일은 추가 복사 없이 사용됩니다.
+- 작은 파일은 mmap을 만들고 해제하는 비용이 더 크므로 지금처럼 한 번에 읽어 메모리에서 파싱합니다.
+
+mmap은 with 블록이 끝나면 닫히므로, PdfReader와 그 객체(페이지 등)는 결과 파일을 다 쓸 때까지
+with 블록 안에서 사용해야 합니다.
+"""
+import logging
+import mmap
+import os
+from contextlib import ExitStack, contextmanager
+from io import BytesIO
+from typing import BinaryIO, Iterator, Optional
+
+from pypdf import PdfReader
+
+from pdf_processor import config, metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _map_file(path) -> Optional[mmap.mmap]:
+    """파일을 읽기 전용으로 매핑 (매핑할 수 없는 파일이면 None)"""
+    try:
+        with open(path, "rb") as f:
+            # 매핑은 파일 핸들을 따로 유지하므로 파일은 바로 닫아도 됩니다
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        logger.debug(f"mmap을 사용할 수 없어 파일을 메모리로 읽습니다: {path} ({e})")
+        return None
+
+
+def _close_map(mapped: mmap.mmap):
+    try:
+        mapped.close()
+    except BufferError:
+        # 아직 참조 중인 버퍼가 있으면 가비지 컬렉션 때 해제됩니다
+        pass
+
+
+@contextmanager
+def open_input(path) -> Iterator[BinaryIO]:
+    """PDF 파일을 파싱용 스트림으로 열기 (MMAP_MIN_BYTES 이상이면 mmap, 미만이면 메모리)"""
+    mapped = None
+    if config.MMAP_MIN_BYTES and os.path.getsize(path) >= config.MMAP_MIN_BYTES:
+        mapped = _map_file(path)
+    if mapped is None:
+        with open(path, "rb") as f:
+            yield BytesIO(f.read())
+        return
+    try:
+        yield mapped
+    finally:
+        _close_map(mapped)
+
+
+@contextmanager
+def open_pdf(src) -> Iterator[PdfReader]:
+    """PdfReader 열기 (src: 파일 경로 또는 바이너리 스트림)"""
+    with ExitStack() as stack:
+        with metrics.phase("parse"):
+            if isinstance(src, (str, os.PathLike)):
+                src = stack.enter_context(open_input(src))
+            reader = PdfReader(src)
+        yield reader
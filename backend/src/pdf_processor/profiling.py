@@ -0,0 +1,221 @@
+"""
+느린 요청 프로파일링
+
+고객 파일에서만 재현되는 느린 요청의 원인을 확인할 수 있도록 요청을 cProfile로 실행하고,
+프로파일과 입력 정보(파일 확장자/크기, 단계별 시간 등 — 파일 내용과 이름은 제외)를
+APP_DATA_DIR/profiles에 저장합니다.
+
+- 요청 헤더 X-Profile: 1 — 그 요청을 프로파일링하여 처리 시간과 관계없이 저장하고,
+  응답 헤더 X-Profile-Id로 저장한 파일 이름을 알려 줍니다.
+- PDF_PROCESSOR_PROFILE_REQUESTS=1 — 모든 요청을 프로파일링하고 PROFILE_SLOW_MS 이상 걸린 요청만 저장합니다.
+  프로파일러 때문에 처리 시간이 늘어나므로 문제를 재현할 때만 사용합니다.
+
+실제 PDF 처리는 워커 프로세스(또는 스레드)에서 실행되므로, executor가 작업을 워커에서 프로파일링한 뒤
+통계를 돌려받아 API 서버 이벤트 루프의 프로파일과 합칩니다. 이벤트 루프 프로파일에는 동시에 처리 중인
+다른 요청의 작업이 섞일 수 있으므로 한 번에 한 요청만 이벤트 루프를 프로파일링합니다.
+저장된 .prof 파일은 `python -m pstats` 또는 snakeviz 등으로 확인할 수 있습니다.
+"""
+import contextvars
+import cProfile
+import json
+import logging
+import platform
+import pstats
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from pdf_processor import config, metrics
+from pdf_processor.utils import APP_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = APP_DATA_DIR / "profiles"
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class _Stats:
+    """pstats.Stats에 넘길 수 있는 통계 묶음 (워커에서 돌려받은 cProfile 통계)"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def profile_call(call: Callable[[], Any]) -> Tuple[Any, Optional[dict]]:
+    """함수를 cProfile로 실행하고 (결과, 통계)를 반환 (워커에서 실행)
+
+    같은 스레드에서 이미 다른 프로파일러가 실행 중이면 프로파일링하지 않고 통계로 None을 반환합니다.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return call(), None
+    try:
+        result = call()
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats
+
+
+class ProfileSession:
+    """프로파일링 중인 요청 하나의 프로파일 (이벤트 루프 + 워커 통계)"""
+
+    def __init__(self, forced: bool):
+        self.id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.forced = forced
+        self.loop_profiler: Optional[cProfile.Profile] = None
+        self.worker_stats: List[dict] = []
+        self.worker_tasks = 0
+
+    def add_worker_stats(self, stats: Optional[dict]):
+        self.worker_tasks += 1
+        if stats:
+            self.worker_stats.append(stats)
+
+    def _combined_stats(self) -> Optional[pstats.Stats]:
+        sources = [_Stats(stats) for stats in self.worker_stats]
+        if self.loop_profiler is not None:
+            self.loop_profiler.create_stats()
+            sources.append(_Stats(self.loop_profiler.stats))
+        if not sources:
+            return None
+        combined = pstats.Stats(sources[0])
+        for source in sources[1:]:
+            combined.add(source)
+        return combined
+
+    def save(self, info: Dict[str, Any]) -> Path:
+        """프로파일(.prof)과 요청 정보(.json)를 저장하고 정보 파일 경로를 반환"""
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stats = self._combined_stats()
+        if stats is not None:
+            stats.dump_stats(PROFILE_DIR / f"{self.id}.prof")
+        info_path = PROFILE_DIR / f"{self.id}.json"
+        info_path.write_text(json.dumps(dict(
+            info,
+            id=self.id,
+            profile=f"{self.id}.prof" if stats is not None else None,
+            loop_profiled=self.loop_profiler is not None,
+            worker_tasks=self.worker_tasks,
+            worker_tasks_profiled=len(self.worker_stats),
+        ), ensure_ascii=False, indent=2), encoding="utf-8")
+        _prune_profiles()
+        return info_path
+
+
+def _prune_profiles():
+    """오래된 프로파일부터 지워 PROFILE_MAX_FILES개만 보관"""
+    infos = sorted(PROFILE_DIR.glob("*.json"), key=lambda path: path.stat().st_mtime)
+    for info_path in infos[:max(0, len(infos) - config.PROFILE_MAX_FILES)]:
+        info_path.unlink(missing_ok=True)
+        info_path.with_suffix(".prof").unlink(missing_ok=True)
+
+
+_current: contextvars.ContextVar[Optional[ProfileSession]] = contextvars.ContextVar(
+    "profile_session", default=None
+)
+# 이벤트 루프를 프로파일링 중인 요청이 있는지 (한 번에 하나만)
+_loop_profiling = False
+
+
+def current_session() -> Optional[ProfileSession]:
+    """현재 요청의 프로파일 (프로파일링하지 않으면 None)"""
+    return _current.get()
+
+
+def _request_info(scope, status: int, seconds: float, session: ProfileSession,
+                  request_metrics: metrics.RequestMetrics) -> Dict[str, Any]:
+    """저장할 요청 정보 (파일 내용, 파일 이름, 폼 값은 포함하지 않음)"""
+    from pdf_processor import executor
+
+    route = scope.get("route")
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "reason": "header" if session.forced else "slow",
+        "method": scope["method"],
+        "route": getattr(route, "path", None),
+        "path": scope["path"],
+        "query_keys": sorted({key.decode("latin-1").split("=")[0]
+                              for key in scope.get("query_string", b"").split(b"&") if key}),
+        "status": status,
+        "duration_ms": round(seconds * 1000, 1),
+        "slow_threshold_ms": config.PROFILE_SLOW_MS,
+        "phases_ms": {name: round(value * 1000, 1) for name, value in request_metrics.phases.items()},
+        "counts": request_metrics.counts,
+        "peak_rss_mb": round(request_metrics.peak_rss / 2**20, 1) if request_metrics.peak_rss else None,
+        "inputs": request_metrics.inputs,
+        "workers": config.MAX_WORKERS,
+        "pending_tasks": executor.pending_tasks(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+class ProfilingMiddleware:
+    """X-Profile 헤더가 있거나 PROFILE_REQUESTS가 켜져 있으면 요청을 프로파일링 (ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _loop_profiling
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        forced = Headers(scope=scope).get(PROFILE_HEADER, "").lower() in ("1", "true")
+        if not forced and not config.PROFILE_REQUESTS:
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(forced)
+        token = _current.set(session)
+        # 입력 정보와 단계별 시간은 측정 기록에서 가져옵니다 (METRICS가 꺼져 있어도 기록)
+        metrics_token = metrics.begin() if metrics.current_metrics() is None else None
+        request_metrics = metrics.current_metrics()
+        if not _loop_profiling:
+            _loop_profiling = True
+            session.loop_profiler = cProfile.Profile()
+            try:
+                session.loop_profiler.enable()
+            except ValueError:
+                session.loop_profiler = None
+                _loop_profiling = False
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if forced:
+                    MutableHeaders(scope=message).append(PROFILE_ID_HEADER, session.id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            if session.loop_profiler is not None:
+                session.loop_profiler.disable()
+                _loop_profiling = False
+            _current.reset(token)
+            if metrics_token is not None:
+                metrics.end(metrics_token)
+            if forced or elapsed * 1000 >= config.PROFILE_SLOW_MS:
+                info = _request_info(scope, status, elapsed, session, request_metrics)
+                try:
+                    path = await run_in_threadpool(session.save, info)
+                    logger.info(f"요청 프로파일 저장 ({info['duration_ms']} ms): {path}")
+                except Exception as e:
+                    logger.warning(f"요청 프로파일을 저장하지 못했습니다: {e}")
@@ -0,0 +1,118 @@
+"""
+서버 시작 시간 측정
+
+Electron은 백엔드가 stdout에 PORT=를 출력할 때까지 기다리므로, 프로세스 시작부터 PORT= 출력까지의
+시간을 측정하여 목표 시간(STARTUP_TARGET_MS)과 비교합니다.
+
+`python -m pdf_processor --import-report` 또는 PDF_PROCESSOR_IMPORT_REPORT=1로 실행하면
+python -X importtime과 비슷하게 처음 import할 때 걸린 시간이 긴 모듈 순서로 stderr에 출력합니다.
+PyInstaller로 패키징된 실행 파일에는 -X 옵션을 줄 수 없으므로 import 훅으로 직접 측정합니다.
+
+이 모듈은 다른 모듈보다 먼저 import되어야 하므로 표준 라이브러리와 config만 사용합니다.
+"""
+import builtins
+import importlib.util
+import multiprocessing
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pdf_processor import config
+
+PROCESS_START = time.perf_counter()
+
+IMPORT_REPORT_FLAG = "--import-report"
+# 보고서에 출력하는 모듈 수
+REPORT_LIMIT = 30
+
+
+class ImportTimer:
+    """builtins.__import__를 감싸 모듈을 처음 import할 때 걸린 시간을 기록"""
+
+    def __init__(self):
+        # (모듈 이름, 자체 시간, 누적 시간, 깊이)
+        self.records: List[Tuple[str, float, float, int]] = []
+        self._children: List[float] = []
+        self._original = None
+
+    def install(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        full_name = name
+        if level:
+            try:
+                full_name = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__") or "")
+            except (ImportError, ValueError):
+                full_name = None
+        if full_name is None or full_name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            self.records.append((full_name, elapsed - children, elapsed, len(self._children)))
+
+    def total(self) -> float:
+        """최상위 import에 걸린 시간의 합(초)"""
+        return sum(cumulative for _, _, cumulative, depth in self.records if depth == 0)
+
+    def format_report(self, limit: int = REPORT_LIMIT) -> str:
+        lines = [f"{'self [ms]':>10} | {'cumulative':>10} | module"]
+        slowest = sorted(self.records, key=lambda record: record[2], reverse=True)[:limit]
+        for name, self_time, cumulative, depth in slowest:
+            lines.append(f"{self_time * 1000:10.1f} | {cumulative * 1000:10.1f} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+_timer: Optional[ImportTimer] = None
+_stats: Dict[str, Optional[float]] = {"imports_ms": None, "port_ms": None}
+
+
+def begin(argv: List[str]):
+    """--import-report 플래그나 환경 변수가 있으면 import 시간 측정을 시작"""
+    global _timer
+    if multiprocessing.parent_process() is not None:
+        # spawn 워커 프로세스가 메인 모듈을 다시 불러오는 경우
+        return
+    if IMPORT_REPORT_FLAG in argv:
+        argv.remove(IMPORT_REPORT_FLAG)
+    elif not config.IMPORT_REPORT:
+        return
+    _timer = ImportTimer()
+    _timer.install()
+
+
+def port_ready():
+    """PORT=를 출력한 직후 호출하여 시작 시간을 기록하고 보고서를 출력"""
+    global _timer
+    port_ms = (time.perf_counter() - PROCESS_START) * 1000
+    _stats["port_ms"] = round(port_ms, 1)
+    message = f"startup: {port_ms:.0f} ms to PORT= (target {config.STARTUP_TARGET_MS} ms)"
+
+    if _timer is not None:
+        _timer.uninstall()
+        _stats["imports_ms"] = round(_timer.total() * 1000, 1)
+        print(f"{message}, imports {_stats['imports_ms']:.0f} ms", file=sys.stderr)
+        print(_timer.format_report(), file=sys.stderr, flush=True)
+        _timer = None
+    elif config.STARTUP_TARGET_MS and port_ms > config.STARTUP_TARGET_MS:
+        print(f"{message} - 목표 시간을 넘었습니다. {IMPORT_REPORT_FLAG}로 원인을 확인하세요",
+              file=sys.stderr, flush=True)
+
+
+def startup_stats() -> Dict[str, Optional[float]]:
+    """프로세스 시작부터 PORT= 출력까지의 시간(ms)과 측정한 경우 import 시간(ms)"""
+    return dict(_stats, target_ms=config.STARTUP_TARGET_MS)
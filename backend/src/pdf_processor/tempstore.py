@@ -0,0 +1,424 @@
+"""
+임시 저장소 관리
+
+요청마다 만드는 세션 디렉토리를 추적하고, 비정상 종료한 이전 실행이 남긴 파일을 정리하며,
+임시 파일의 디스크 사용량 한도를 적용합니다.
+
+- 실행 디렉토리: 서버 프로세스마다 TEMP_DIR/run-<id>를 만들고 그 안의 .lock 파일을 실행하는 동안
+  잠가 둡니다. 잠금을 얻을 수 있는 다른 실행 디렉토리는 주인 프로세스가 종료된 것이므로 서버 시작 시와
+  TEMP_REAP_INTERVAL마다 삭제합니다. 워커 프로세스는 환경 변수로 받은 같은 실행 디렉토리를 사용합니다.
+- 세션: create_session()으로 만든 디렉토리는 지금처럼 라우터가 응답 후 삭제합니다. 클라이언트 연결이
+  끊기는 등으로 남은 세션은 TEMP_SESSION_TTL이 지나면 정리합니다. 작업(Job) 디렉토리는 jobs가 정리합니다.
+- 한도: 업로드를 저장하기 전에 임시 파일 전체 크기(TEMP_QUOTA_BYTES)와 디스크 여유 공간
+  (TEMP_MIN_FREE_BYTES)을 확인하고 넘으면 507을 반환합니다. 전체 크기는 주기적으로 다시 계산하며,
+  그 사이에는 저장한 업로드 크기를 더해 추정합니다 (워커가 만든 출력 파일은 다음 계산에 반영).
+- RAM 디렉토리: 요청 본문(Content-Length)이 TEMP_RAM_MAX_REQUEST_BYTES 이하이면 세션을 tmpfs
+  (Linux의 /dev/shm 등)에 만들어 일반적인 작은 요청의 디스크 I/O를 없앱니다. 출력 파일까지 고려해
+  요청 크기의 RAM_SIZE_FACTOR배를 TEMP_RAM_QUOTA_BYTES 안에서 예약하고, 한도를 넘으면 디스크에 만듭니다.
+"""
+import contextvars
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from pdf_processor import config
+from pdf_processor.utils import TEMP_DIR
+
+logger = logging.getLogger(__name__)
+
+RUN_PREFIX = "run-"
+LOCK_NAME = ".lock"
+RUN_ID_ENV = "PDF_PROCESSOR_RUN_ID"
+# 세션 하나에 예약하는 RAM = 요청 크기 x RAM_SIZE_FACTOR (입력 + 출력 + 중간 파일)
+RAM_SIZE_FACTOR = 4
+MIN_RAM_RESERVATION = 1024 * 1024
+# 잠금 파일이 아직 없는 실행 디렉토리는 만드는 중일 수 있으므로 이 시간(초)이 지나야 정리합니다
+NEW_RUN_GRACE_SECONDS = 60
+
+
+def _is_worker() -> bool:
+    return multiprocessing.parent_process() is not None
+
+
+def _init_run_id() -> str:
+    """서버 프로세스는 새 실행 ID를 만들고, 워커 프로세스는 서버가 환경 변수로 넘긴 ID를 사용"""
+    if _is_worker() and os.environ.get(RUN_ID_ENV):
+        return os.environ[RUN_ID_ENV]
+    run_id = uuid.uuid4().hex[:12]
+    os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+def _ram_root() -> Optional[Path]:
+    setting = config.TEMP_RAM_DIR
+    if setting.lower() in ("", "off", "0"):
+        return None
+    if setting.lower() == "auto":
+        if sys.platform != "linux" or not os.path.isdir("/dev/shm"):
+            return None
+        base = Path("/dev/shm")
+    else:
+        base = Path(setting)
+    user = os.getuid() if hasattr(os, "getuid") else "user"
+    return base / f"pdf-studio-{user}"
+
+
+RUN_ID = _init_run_id()
+RUN_DIR = TEMP_DIR / f"{RUN_PREFIX}{RUN_ID}"
+RAM_ROOT = _ram_root()
+RAM_RUN_DIR = RAM_ROOT / f"{RUN_PREFIX}{RUN_ID}" if RAM_ROOT is not None else None
+
+
+def _try_lock(f) -> bool:
+    """파일 잠금을 시도 (다른 프로세스가 잠그고 있으면 False)"""
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f):
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+def _acquire_run_dir():
+    """실행 디렉토리를 만들고 프로세스가 종료될 때까지 잠금 파일을 잠가 둠 (서버 프로세스에서만)"""
+    if _is_worker():
+        return None
+    RUN_DIR.mkdir(parents=True, exist_ok=True)
+    lock_file = open(RUN_DIR / LOCK_NAME, "a+b")
+    if not _try_lock(lock_file):
+        logger.warning(f"실행 디렉토리를 잠글 수 없습니다: {RUN_DIR}")
+    return lock_file
+
+
+_run_lock = _acquire_run_dir()
+
+
+class _Session:
+    __slots__ = ("created_at", "ram_bytes", "reap")
+
+    def __init__(self, ram_bytes: int, reap: bool):
+        self.created_at = time.time()
+        self.ram_bytes = ram_bytes
+        self.reap = reap
+
+
+_lock = threading.Lock()
+_sessions: Dict[Path, _Session] = {}
+_ram_reserved = 0
+_ram_failed = False
+# 마지막으로 계산한 실행 디렉토리 크기 + 그 뒤에 저장한 업로드 크기
+_disk_bytes = 0
+_stats = {"reaped_sessions": 0, "reaped_runs": 0, "reaped_bytes": 0, "quota_rejections": 0, "last_reap": None}
+
+# 현재 요청의 본문 크기 (Content-Length가 없으면 None)
+_request_bytes: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("request_bytes", default=None)
+# own_sessions()로 설정한 경우 이 컨텍스트에서 만든 세션 목록
+_owned_sessions: contextvars.ContextVar[Optional[List[Path]]] = contextvars.ContextVar(
+    "owned_sessions", default=None
+)
+
+
+def _reserve_ram(size: Optional[int]) -> int:
+    """RAM 디렉토리에 세션을 만들 수 있으면 예약한 크기를, 아니면 0을 반환 (_lock 안에서 호출)"""
+    global _ram_reserved
+    if RAM_RUN_DIR is None or _ram_failed or size is None or size > config.TEMP_RAM_MAX_REQUEST_BYTES:
+        return 0
+    wanted = max(size * RAM_SIZE_FACTOR, MIN_RAM_RESERVATION)
+    if _ram_reserved + wanted > config.TEMP_RAM_QUOTA_BYTES:
+        _forget_removed()
+        if _ram_reserved + wanted > config.TEMP_RAM_QUOTA_BYTES:
+            return 0
+    _ram_reserved += wanted
+    return wanted
+
+
+def _forget_removed():
+    """라우터가 삭제한 세션을 목록에서 빼고 RAM 예약을 반환 (_lock 안에서 호출)"""
+    global _ram_reserved
+    for path in [path for path in _sessions if not path.exists()]:
+        _ram_reserved -= _sessions.pop(path).ram_bytes
+
+
+def create_session(allow_ram: bool = True, reap: bool = True) -> Path:
+    """세션 디렉토리 생성
+
+    Args:
+        allow_ram: 요청이 작으면 RAM 디렉토리에 생성 (결과를 오래 보관하는 경우 False)
+        reap: 삭제되지 않은 채 TEMP_SESSION_TTL이 지나면 정리 (직접 수명을 관리하는 작업 디렉토리는 False)
+    """
+    global _ram_reserved, _ram_failed
+    with _lock:
+        ram_bytes = _reserve_ram(_request_bytes.get()) if allow_ram else 0
+    if ram_bytes:
+        session_dir = RAM_RUN_DIR / uuid.uuid4().hex
+        try:
+            session_dir.mkdir(parents=True)
+        except OSError as e:
+            logger.warning(f"RAM 디렉토리를 사용할 수 없어 디스크를 사용합니다: {e}")
+            with _lock:
+                _ram_reserved -= ram_bytes
+                _ram_failed = True
+            ram_bytes = 0
+    if not ram_bytes:
+        session_dir = RUN_DIR / uuid.uuid4().hex
+        session_dir.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        _sessions[session_dir] = _Session(ram_bytes, reap)
+    owned = _owned_sessions.get()
+    if owned is not None:
+        owned.append(session_dir)
+    return session_dir
+
+
+def _in_ram(path: Path) -> bool:
+    return RAM_RUN_DIR is not None and RAM_RUN_DIR in path.parents
+
+
+def _insufficient_storage(detail: str) -> HTTPException:
+    _stats["quota_rejections"] += 1
+    return HTTPException(status_code=507, detail=detail, headers={"Retry-After": "30"})
+
+
+async def ensure_space(dest: Path, incoming: int):
+    """dest에 incoming바이트를 저장할 수 있는지 확인 (한도를 넘으면 507)"""
+    if _in_ram(dest):
+        # RAM 세션은 만들 때 크기를 예약했습니다
+        return
+    if config.TEMP_QUOTA_BYTES and _disk_bytes + incoming > config.TEMP_QUOTA_BYTES:
+        # 추정치가 한도를 넘으면 삭제된 세션을 반영하여 다시 계산
+        await run_in_threadpool(refresh_usage)
+        if _disk_bytes + incoming > config.TEMP_QUOTA_BYTES:
+            raise _insufficient_storage(
+                f"임시 저장 공간이 부족합니다 (사용 중 {_disk_bytes:,}바이트, 한도 {config.TEMP_QUOTA_BYTES:,}바이트)"
+            )
+    if config.TEMP_MIN_FREE_BYTES:
+        free = shutil.disk_usage(RUN_DIR).free
+        if free - incoming < config.TEMP_MIN_FREE_BYTES:
+            raise _insufficient_storage(f"디스크 여유 공간이 부족합니다 (남은 공간 {free:,}바이트)")
+
+
+def add_usage(dest: Path, size: int):
+    """저장한 파일 크기를 사용량 추정치에 더함"""
+    global _disk_bytes
+    if not _in_ram(dest):
+        _disk_bytes += size
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += _tree_size(Path(entry.path))
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total
+
+
+def refresh_usage() -> int:
+    """실행 디렉토리(세션, 문서)의 실제 크기를 다시 계산"""
+    global _disk_bytes
+    _disk_bytes = _tree_size(RUN_DIR)
+    return _disk_bytes
+
+
+def _owner_alive(run_dir: Path) -> bool:
+    """다른 실행 디렉토리의 주인 프로세스가 실행 중인지 (잠금 파일이 잠겨 있는지)"""
+    try:
+        lock_file = open(run_dir / LOCK_NAME, "r+b")
+    except FileNotFoundError:
+        try:
+            return time.time() - run_dir.stat().st_mtime < NEW_RUN_GRACE_SECONDS
+        except OSError:
+            return False
+    except OSError:
+        return True
+    with lock_file:
+        if _try_lock(lock_file):
+            _unlock(lock_file)
+            return False
+        return True
+
+
+def _remove(path: Path) -> int:
+    size = _tree_size(path) if path.is_dir() else 0
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+    return size
+
+
+def _reap_orphan_runs() -> int:
+    """종료된 이전 실행이 남긴 디렉토리 삭제 (이전 버전이 TEMP_DIR에 바로 만든 세션 포함)"""
+    removed = 0
+    for entry in list(TEMP_DIR.iterdir()):
+        if entry == RUN_DIR:
+            continue
+        if entry.name.startswith(RUN_PREFIX) and _owner_alive(entry):
+            continue
+        _stats["reaped_bytes"] += _remove(entry)
+        removed += 1
+    if RAM_ROOT is not None and RAM_ROOT.is_dir():
+        for entry in list(RAM_ROOT.iterdir()):
+            if entry == RAM_RUN_DIR or (TEMP_DIR / entry.name).exists():
+                continue
+            _stats["reaped_bytes"] += _remove(entry)
+            removed += 1
+    return removed
+
+
+def _reap_expired_sessions() -> int:
+    """응답 후 삭제되지 않고 TEMP_SESSION_TTL이 지난 세션 삭제"""
+    global _ram_reserved
+    now = time.time()
+    with _lock:
+        _forget_removed()
+        expired = [
+            path for path, session in _sessions.items()
+            if session.reap and now - session.created_at > config.TEMP_SESSION_TTL
+        ]
+        for path in expired:
+            _ram_reserved -= _sessions.pop(path).ram_bytes
+    for path in expired:
+        _stats["reaped_bytes"] += _remove(path)
+    return len(expired)
+
+
+def reap():
+    """남은 세션과 종료된 실행의 임시 파일을 정리하고 사용량을 다시 계산"""
+    try:
+        _stats["reaped_runs"] += _reap_orphan_runs()
+        _stats["reaped_sessions"] += _reap_expired_sessions()
+    except OSError as e:
+        logger.warning(f"임시 파일 정리 중 오류가 발생했습니다: {e}")
+    refresh_usage()
+    _stats["last_reap"] = time.time()
+
+
+_stop = threading.Event()
+_reaper: Optional[threading.Thread] = None
+
+
+def _reap_loop():
+    while True:
+        reap()
+        if _stop.wait(config.TEMP_REAP_INTERVAL):
+            return
+
+
+def start():
+    """서버 시작 시 정리를 시작하고 이후 주기적으로 정리 (백그라운드 스레드, 서버 시작을 막지 않음)"""
+    global _reaper
+    if _reaper is not None or _is_worker():
+        return
+    _stop.clear()
+    _reaper = threading.Thread(target=_reap_loop, name="temp-reaper", daemon=True)
+    _reaper.start()
+
+
+def stop():
+    global _reaper
+    _stop.set()
+    _reaper = None
+
+
+def cleanup():
+    """이 실행의 임시 파일을 모두 삭제 (서버 프로세스 종료 시)"""
+    global _run_lock
+    if _is_worker():
+        return
+    stop()
+    if _run_lock is not None:
+        _unlock(_run_lock)
+        _run_lock.close()
+        _run_lock = None
+    for run_dir in (RUN_DIR, RAM_RUN_DIR):
+        if run_dir is not None and run_dir.exists():
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def stats() -> Dict[str, object]:
+    """임시 저장소 사용량과 정리 통계"""
+    with _lock:
+        _forget_removed()
+        sessions = len(_sessions)
+        ram_sessions = sum(1 for session in _sessions.values() if session.ram_bytes)
+        ram_reserved = _ram_reserved
+    return dict(
+        _stats,
+        run_dir=str(RUN_DIR),
+        disk_bytes=_disk_bytes,
+        quota_bytes=config.TEMP_QUOTA_BYTES,
+        free_bytes=shutil.disk_usage(RUN_DIR).free if RUN_DIR.exists() else None,
+        sessions=sessions,
+        ram_dir=str(RAM_RUN_DIR) if RAM_RUN_DIR is not None and not _ram_failed else None,
+        ram_sessions=ram_sessions,
+        ram_reserved_bytes=ram_reserved,
+        ram_quota_bytes=config.TEMP_RAM_QUOTA_BYTES,
+    )
+
+
+class TempStorageMiddleware:
+    """요청 본문 크기(Content-Length)를 기록하여 세션을 RAM 디렉토리에 만들지 결정 (ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        length = Headers(scope=scope).get("content-length", "")
+        token = _request_bytes.set(int(length) if length.isdigit() else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_bytes.reset(token)
+
+
+def own_sessions() -> List[Path]:
+    """이후 이 컨텍스트에서 만드는 세션을 기록할 목록을 반환 (작업이 실행 중 만든 세션을 직접 삭제하는 경우)"""
+    owned: List[Path] = []
+    _owned_sessions.set(owned)
+    return owned
+
+
+def detach_request():
+    """이후 만드는 세션을 요청 크기와 관계없이 디스크에 만들도록 설정 (요청보다 오래 실행되는 작업용)"""
+    _request_bytes.set(None)
@@ -0,0 +1,124 @@
+"""
+텍스트 폭 측정 및 줄바꿈
+
+reportlab의 stringWidth는 호출할 때마다 문자열 전체의 글리프 폭을 다시 더하기 때문에
+한 글자/한 단어씩 늘려 가며 측정하면 줄 길이에 대해 제곱 시간이 걸립니다.
+여기서는 폰트별 글리프 폭(advance) 표를 메모이즈하고 폭을 누적합으로 계산하여
+줄바꿈이 입력 길이에 대해 선형 시간이 되도록 합니다.
+
+폰트는 pdf_processor.fonts 등으로 미리 등록되어 있어야 합니다.
+"""
+import threading
+from functools import lru_cache
+from typing import Dict, List
+
+from reportlab.pdfbase import pdfmetrics
+
+# 단어 폭 캐시 크기 (폰트별)
+WORD_CACHE_SIZE = 8192
+
+
+class FontMetrics:
+    """폰트 하나의 글리프 폭 표 (폰트 크기 1000 기준 단위)"""
+
+    def __init__(self, font_name: str):
+        self.font_name = font_name
+        self._font = pdfmetrics.getFont(font_name)
+        self._advances: Dict[str, float] = {}
+        self._word_width = lru_cache(maxsize=WORD_CACHE_SIZE)(self._measure)
+        self.space = self.advance(" ")
+
+    def advance(self, char: str) -> float:
+        """글자 하나의 폭 (1000 단위)"""
+        width = self._advances.get(char)
+        if width is None:
+            width = self._font.stringWidth(char, 1000)
+            self._advances[char] = width
+        return width
+
+    def _measure(self, text: str) -> float:
+        advances = self._advances
+        total = 0.0
+        for char in text:
+            width = advances.get(char)
+            if width is None:
+                width = self.advance(char)
+            total += width
+        return total
+
+    def units(self, text: str) -> float:
+        """문자열 폭 (1000 단위). 자주 반복되는 단어는 캐시에서 가져옵니다"""
+        return self._word_width(text)
+
+    def width(self, text: str, font_size: float) -> float:
+        """문자열 폭 (포인트)"""
+        return self.units(text) * font_size / 1000
+
+
+_lock = threading.Lock()
+_metrics: Dict[str, FontMetrics] = {}
+
+
+def get_metrics(font_name: str) -> FontMetrics:
+    """폰트의 FontMetrics (프로세스마다 폰트당 하나)"""
+    metrics = _metrics.get(font_name)
+    if metrics is None:
+        with _lock:
+            metrics = _metrics.get(font_name)
+            if metrics is None:
+                metrics = FontMetrics(font_name)
+                _metrics[font_name] = metrics
+    return metrics
+
+
+def text_width(text: str, font_name: str, font_size: float) -> float:
+    """pdfmetrics.stringWidth와 같은 값을 반환하는 메모이즈 버전"""
+    return get_metrics(font_name).width(text, font_size)
+
+
+def wrap_text(text: str, font_name: str, font_size: float, max_width: float) -> List[str]:
+    """텍스트를 공백 단위로 나누어 max_width 안에 들어가도록 줄바꿈
+
+    한 줄에 들어가지 않는 긴 단어는 글자 단위로 나눕니다.
+    현재 줄의 폭을 누적하며 단어/글자마다 한 번씩만 측정하므로 선형 시간입니다.
+    """
+    metrics = get_metrics(font_name)
+    # 비교는 1000 단위로 수행하여 단어마다 곱셈을 하지 않습니다
+    limit = max_width * 1000 / font_size if font_size else float("inf")
+    space = metrics.space
+
+    lines: List[str] = []
+    current: List[str] = []
+    current_units = 0.0
+
+    for word in text.split():
+        word_units = metrics.units(word)
+        if word_units > limit:
+            if current:
+                lines.append(" ".join(current))
+            # 긴 단어는 글자 폭을 누적하여 자릅니다
+            start = 0
+            chunk_units = 0.0
+            for i, char in enumerate(word):
+                char_units = metrics.advance(char)
+                if chunk_units + char_units > limit and i > start:
+                    lines.append(word[start:i])
+                    start = i
+                    chunk_units = 0.0
+                chunk_units += char_units
+            current = [word[start:]]
+            current_units = chunk_units
+        elif not current:
+            current = [word]
+            current_units = word_units
+        elif current_units + space + word_units <= limit:
+            current.append(word)
+            current_units += space + word_units
+        else:
+            lines.append(" ".join(current))
+            current = [word]
+            current_units = word_units
+
+    if current:
+        lines.append(" ".join(current))
+    return lines
@@ -1,8 +1,14 @@
 import os
 import sys
-import uuid
+import zipfile
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from pdf_processor import config, metrics
 
 def get_app_data_dir() -> Path:
     """애플리케이션 데이터 디렉토리 가져오기"""
@@ -21,11 +27,10 @@ APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
 def get_session_dir() -> Path:
-    """세션별 임시 디렉토리 생성"""
-    session_id = str(uuid.uuid4())
-    session_dir = TEMP_DIR / session_id
-    session_dir.mkdir(parents=True, exist_ok=True)
-    return session_dir
+    """세션별 임시 디렉토리 생성 (tempstore가 추적하며, 작은 요청은 RAM 디렉토리에 생성)"""
+    from pdf_processor import tempstore
+
+    return tempstore.create_session()
 
 def parse_page_ranges(range_str: str, max_pages: int) -> List[int]:
     """페이지 범위 문자열을 페이지 번호 리스트로 변환"""
@@ -49,4 +54,128 @@ def parse_page_ranges(range_str: str, max_pages: int) -> List[int]:
             if page > max_pages:
                 raise ValueError(f"페이지 번호는 {max_pages} 이하여야 합니다")
             pages.add(page)
-    return sorted(list(pages))
\ No newline at end of file
+    return sorted(list(pages))
+
+class InvalidInputError(ValueError):
+    """사용자 입력 오류 (워커 프로세스에서 발생해도 라우터에서 400으로 변환)"""
+
+
+class _UploadTooLarge(Exception):
+    pass
+
+
+def _copy_upload(src, dest: Path, max_size: int) -> int:
+    """업로드 스트림을 청크 단위로 파일에 복사하고 저장한 바이트 수를 반환"""
+    written = 0
+    src.seek(0)
+    with open(dest, "wb") as buffer:
+        while True:
+            chunk = src.read(config.UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            written += len(chunk)
+            if max_size and written > max_size:
+                raise _UploadTooLarge()
+            buffer.write(chunk)
+    return written
+
+
+async def save_upload(file: UploadFile, dest: Path, max_size: Optional[int] = None) -> int:
+    """업로드 파일을 고정 크기 청크로 디스크에 저장
+
+    파일 전체를 메모리에 읽지 않으므로 파일 크기와 관계없이 요청당 메모리 사용량이 일정합니다.
+    최대 크기(기본값: MAX_UPLOAD_BYTES)를 넘으면 413 오류를, 임시 저장 공간이 부족하면 507 오류를 발생시킵니다.
+
+    Returns:
+        저장된 파일 크기(바이트)
+    """
+    if max_size is None:
+        max_size = config.MAX_UPLOAD_BYTES
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"업로드 파일이 너무 큽니다 (최대 {max_size:,}바이트): {file.filename}"
+    )
+    if max_size and file.size is not None and file.size > max_size:
+        raise too_large
+    from pdf_processor import tempstore
+
+    await tempstore.ensure_space(dest, file.size or 0)
+    try:
+        # 청크 복사 전체를 스레드 하나에서 실행 (청크마다 스레드를 오가지 않도록)
+        with metrics.phase("save"):
+            written = await run_in_threadpool(_copy_upload, file.file, dest, max_size)
+        tempstore.add_usage(dest, written)
+        metrics.note_input(file.filename, written, file.content_type)
+        return written
+    except _UploadTooLarge:
+        dest.unlink(missing_ok=True)
+        raise too_large
+
+
+
+class _ZipBuffer:
+    """zipfile이 쓰는 바이트를 모아 두었다가 꺼낼 수 있는 쓰기 전용 스트림 (seek 불가)"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_entry_chunks(zip_file: zipfile.ZipFile, buffer: _ZipBuffer, path: Path, arcname: str):
+    """파일 하나를 압축 파일에 쓰면서 생성된 바이트를 청크 단위로 반환"""
+    info = zipfile.ZipInfo.from_file(path, arcname)
+    info.compress_type = zipfile.ZIP_STORED
+    with open(path, "rb") as src, zip_file.open(info, "w") as dest:
+        while True:
+            chunk = src.read(config.UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            dest.write(chunk)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+async def stream_zip(entries: AsyncIterator[Tuple[str, Path]], delete_files: bool = True) -> AsyncIterator[bytes]:
+    """(압축 파일 내 이름, 파일 경로)를 받는 대로 ZIP 스트림으로 내보내는 비동기 생성기
+
+    이미 압축된 JPG/PNG 등을 묶는 용도이므로 압축하지 않고(ZIP_STORED) 저장하며,
+    크기를 미리 알 수 없는 스트림이므로 각 항목 뒤에 데이터 디스크립터를 씁니다.
+    전체 압축 파일을 디스크나 메모리에 만들지 않으므로 첫 파일이 준비되는 즉시 전송이 시작됩니다.
+    delete_files가 True이면 압축 파일에 추가한 원본 파일은 바로 삭제합니다.
+    """
+    buffer = _ZipBuffer()
+    zip_file = zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED)
+    async for arcname, path in entries:
+        entry = _zip_entry_chunks(zip_file, buffer, path, arcname)
+        while True:
+            # 파일 읽기와 CRC 계산은 스레드 풀에서 실행
+            chunk = await run_in_threadpool(next, entry, None)
+            if chunk is None:
+                break
+            if chunk:
+                yield chunk
+        if delete_files:
+            path.unlink(missing_ok=True)
+    zip_file.close()
+    yield buffer.drain()
+
+
+def content_disposition(filename: str) -> str:
+    """한글 등 비ASCII 파일 이름도 전달할 수 있는 Content-Disposition 헤더 값"""
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
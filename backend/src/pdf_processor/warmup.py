@@ -0,0 +1,143 @@
+"""
+서버 시작 후 백그라운드 예열
+
+PORT=를 출력하고 요청을 받기 시작한 뒤(ready), 첫 워터마크/변환/편집 요청이 폰트 파싱,
+reportlab 초기화, 변환기 import, 워커 프로세스 생성 비용을 치르지 않도록 백그라운드 스레드에서
+미리 준비합니다. 모든 단계가 끝나면 warm 상태가 되며 GET /health로 확인할 수 있습니다.
+
+- API 서버 프로세스: 작은 입력은 스레드 풀에서 처리되므로 폰트와 변환기를 미리 불러옵니다.
+- 워커 프로세스: 프로세스 풀은 작업을 제출할 때 워커를 하나씩 만들므로, 워커 수만큼 빈 작업을
+  동시에 제출하여 모든 워커를 시작시킵니다. 각 워커는 시작할 때 init_worker()로 예열됩니다.
+"""
+import importlib
+import io
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from pdf_processor import config, fonts
+
+logger = logging.getLogger(__name__)
+
+# 작업 함수가 정의된 모듈과 처음 사용할 때 불러오는 변환기
+WARM_MODULES = (
+    "pdf_processor.api",
+    "pdf_processor.editor",
+    "xhtml2pdf.pisa",
+    "img2pdf",
+)
+
+_lock = threading.Lock()
+_state = "idle"
+_started_at: Optional[float] = None
+_finished_at: Optional[float] = None
+# 단계 이름 -> 소요 시간(ms)
+_steps: Dict[str, float] = {}
+_error: Optional[str] = None
+
+
+def _import_modules():
+    for name in WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            # 설치되지 않은 변환기는 실제로 사용하는 요청에서 오류를 반환합니다
+            logger.warning(f"예열 중 {name}을(를) 불러올 수 없습니다: {e}")
+
+
+def _render_sample():
+    """한글 텍스트가 있는 작은 PDF를 한 번 만들어 reportlab의 지연 초기화를 미리 수행"""
+    from reportlab.pdfgen import canvas
+    from pdf_processor.textmetrics import text_width
+
+    font_name = fonts.font_or_fallback("NotoSansKR-Regular")
+    c = canvas.Canvas(io.BytesIO(), pagesize=(100, 100))
+    c.setFont(font_name, 12)
+    c.drawString(10, 10, "예열 warm-up")
+    text_width("예열 warm-up", font_name, 12)
+    c.save()
+
+
+def init_worker():
+    """워커 프로세스 초기화 (ProcessPoolExecutor의 initializer)
+
+    요청마다 폰트를 파싱하거나 모듈을 불러오지 않도록 워커 시작 시 한 번 준비합니다.
+    """
+    fonts.preload_fonts()
+    if config.WARMUP:
+        _import_modules()
+        try:
+            _render_sample()
+        except Exception as e:
+            logger.warning(f"reportlab 예열에 실패했습니다: {e}")
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _step(name: str, func):
+    started = time.perf_counter()
+    func()
+    _steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _start_workers():
+    """워커 수만큼 작업을 동시에 제출하여 모든 워커 프로세스를 시작"""
+    from pdf_processor import executor
+
+    pool = executor.get_process_pool()
+    if pool is None:
+        return
+    futures = [pool.submit(_worker_ready) for _ in range(config.MAX_WORKERS)]
+    pids = {future.result() for future in futures}
+    logger.info(f"워커 프로세스 {len(pids)}개 예열 완료")
+
+
+def _run():
+    global _state, _finished_at, _error
+    try:
+        _step("fonts", fonts.preload_fonts)
+        _step("imports", _import_modules)
+        _step("reportlab", _render_sample)
+        _step("workers", _start_workers)
+        state = "warm"
+    except Exception as e:
+        logger.warning(f"예열에 실패했습니다 (요청은 처음 사용할 때 준비됩니다): {e}")
+        _error = str(e)
+        state = "failed"
+    with _lock:
+        _state = state
+        _finished_at = time.perf_counter()
+
+
+def start():
+    """백그라운드 예열 시작 (서버가 요청을 받기 시작한 뒤 호출, 이미 시작했으면 무시)"""
+    global _state, _started_at
+    with _lock:
+        if _state != "idle" or not config.WARMUP:
+            return
+        _state = "warming"
+        _started_at = time.perf_counter()
+    threading.Thread(target=_run, name="warmup", daemon=True).start()
+
+
+def is_warm() -> bool:
+    return _state == "warm"
+
+
+def warmup_stats() -> Dict[str, object]:
+    """예열 상태 (idle/warming/warm/failed)와 단계별 소요 시간"""
+    with _lock:
+        elapsed = None
+        if _started_at is not None:
+            elapsed = round(((_finished_at or time.perf_counter()) - _started_at) * 1000, 1)
+        return {
+            "enabled": config.WARMUP,
+            "state": _state,
+            "elapsed_ms": elapsed,
+            "steps_ms": dict(_steps),
+            "error": _error,
+        }
@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# 테스트가 사용자의 애플리케이션 데이터 디렉토리(임시 파일, 캐시)를 건드리지 않도록
+# pdf_processor를 불러오기 전에 홈 디렉토리를 임시 디렉토리로 바꿉니다
+_home = tempfile.mkdtemp(prefix="pdf-processor-tests-")
+os.environ["HOME"] = _home
+os.environ["LOCALAPPDATA"] = _home
+os.environ.setdefault("PDF_PROCESSOR_TEMP_RAM_DIR", "off")
+# 테스트마다 워커 프로세스를 미리 띄우지 않도록 (작은 입력은 스레드 풀에서 처리됨)
+os.environ.setdefault("PDF_PROCESSOR_WARMUP", "0")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """라우터를 등록한 앱의 TestClient (서버 시작/종료 처리 포함)"""
+    from fastapi.testclient import TestClient
+
+    from pdf_processor.api import register_routers
+    from pdf_processor.app import app
+
+    register_routers(app)
+    with TestClient(app) as test_client:
+        yield test_client
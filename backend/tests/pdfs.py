@@ -0,0 +1,34 @@
+"""테스트용 PDF 생성"""
+from pathlib import Path
+
+from reportlab.pdfgen import canvas
+
+
+def make_pdf(path: Path, pages: int, label: str = "Page", draw=None) -> Path:
+    """페이지마다 "<label> <번호>" 텍스트가 있는 PDF (draw(canvas)로 내용 추가)"""
+    c = canvas.Canvas(str(path), pagesize=(300, 400))
+    for number in range(1, pages + 1):
+        c.setFont("Helvetica", 20)
+        c.drawString(30, 350, f"{label} {number}")
+        if draw is not None:
+            draw(c)
+        c.showPage()
+    c.save()
+    return path
+
+
+def resave(src: Path, dest: Path, **save_options) -> Path:
+    """pikepdf로 다시 저장 (object_stream_mode, linearize 등)"""
+    import pikepdf
+
+    with pikepdf.open(src) as pdf:
+        pdf.save(dest, **save_options)
+    return dest
+
+
+def syntax_errors(path: Path):
+    """qpdf가 보고한 구조 오류 목록 (정상이면 빈 목록)"""
+    import pikepdf
+
+    with pikepdf.open(path) as pdf:
+        return pdf.check_pdf_syntax()
@@ -0,0 +1,106 @@
+"""일괄 처리(/batch) 테스트
+
+ZIP 입력의 파일 수/파일 크기/임시 저장 공간 한도와, 일부 파일이 실패해도 나머지를 처리하고
+파일별 결과를 manifest.json에 기록하는지 확인합니다.
+"""
+import io
+import json
+import struct
+import zipfile
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_processor import config
+
+from pdfs import make_pdf
+
+ROTATE = {"pages": "all", "angle": "90", "include_unspecified": "true"}
+# 압축하면 수십 KB지만 풀면 BOMB_BYTES가 되는 항목
+BOMB_BYTES = 32 * 1024 * 1024
+
+
+def _zip(entries) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes(tmp_path_factory):
+    return make_pdf(tmp_path_factory.mktemp("batch") / "input.pdf", 2).read_bytes()
+
+
+@pytest.fixture(scope="module")
+def zip_bomb(pdf_bytes) -> bytes:
+    return _zip([("ok.pdf", pdf_bytes), ("bomb.pdf", b"\0" * BOMB_BYTES)])
+
+
+def _lying_header(data: bytes, claimed: int) -> bytes:
+    """첫 항목의 헤더(로컬 헤더와 중앙 디렉토리)에 기록된 압축 해제 크기를 claimed로 바꿈"""
+    data = bytearray(data)
+    struct.pack_into("<I", data, 22, claimed)
+    struct.pack_into("<I", data, data.find(b"PK\x01\x02") + 24, claimed)
+    return bytes(data)
+
+
+def _rotate(client, archive: bytes):
+    return client.post("/batch/rotate", data=ROTATE, files={"archive": ("inputs.zip", archive, "application/zip")})
+
+
+def test_zip_bomb_entry_is_rejected_before_extracting(client, zip_bomb, monkeypatch):
+    assert len(zip_bomb) < BOMB_BYTES // 100
+    monkeypatch.setattr(config, "MAX_UPLOAD_BYTES", 1024 * 1024)
+    response = _rotate(client, zip_bomb)
+    assert response.status_code == 413
+    assert "bomb.pdf" in response.json()["detail"]
+
+
+def test_zip_bomb_exceeding_temp_quota_is_rejected(client, zip_bomb, monkeypatch):
+    monkeypatch.setattr(config, "TEMP_QUOTA_BYTES", BOMB_BYTES // 2)
+    assert _rotate(client, zip_bomb).status_code == 507
+
+
+def test_too_many_entries_are_rejected(client, pdf_bytes, monkeypatch):
+    monkeypatch.setattr(config, "MAX_BATCH_FILES", 3)
+    archive = _zip([(f"{i}.pdf", pdf_bytes) for i in range(4)])
+    response = _rotate(client, archive)
+    assert response.status_code == 400
+    assert "3" in response.json()["detail"]
+
+
+def test_entry_larger_than_its_header_is_rejected(client):
+    # 헤더에는 10바이트로 기록되어 한도 검사를 통과하지만 실제로는 BOMB_BYTES인 항목
+    archive = _lying_header(_zip([("bomb.pdf", b"\0" * BOMB_BYTES)]), 10)
+    response = _rotate(client, archive)
+    assert response.status_code == 400
+    assert "bomb.pdf" in response.json()["detail"]
+
+
+def test_corrupt_member_is_reported_in_manifest(client, pdf_bytes):
+    archive = _zip([
+        ("first/report.pdf", pdf_bytes),
+        ("broken.pdf", b"%PDF-1.7\nnot really a pdf"),
+        ("second/report.pdf", pdf_bytes),
+        ("notes.txt", "PDF가 아닌 파일은 건너뜁니다".encode()),
+    ])
+    response = _rotate(client, archive)
+    assert response.status_code == 200
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as result:
+        names = result.namelist()
+        manifest = json.loads(result.read("manifest.json"))
+        rotations = [page.rotation for page in PdfReader(result.open("rotated_report (2).pdf")).pages]
+
+    assert names == ["rotated_report.pdf", "rotated_report (2).pdf", "manifest.json"]
+    assert rotations == [90, 90]
+    assert (manifest["operation"], manifest["total"], manifest["succeeded"], manifest["failed"]) == \
+        ("rotate", 3, 2, 1)
+    assert [(entry["file"], entry["status"]) for entry in manifest["files"]] == [
+        ("report.pdf", "ok"), ("broken.pdf", "error"), ("report (2).pdf", "ok"),
+    ]
+    assert manifest["files"][0]["output"] == "rotated_report.pdf"
+    assert manifest["files"][0]["size"] > 0
+    assert manifest["files"][1]["error"]
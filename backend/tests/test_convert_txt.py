@@ -0,0 +1,38 @@
+"""TXT -> PDF 변환(_convert_txt) 회귀 테스트
+
+_CompressingCanvas는 reportlab 내부 구조에 의존하므로, 설치된 reportlab에서 페이지가 끝날 때마다
+내용 스트림이 압축되는지와 변환 결과(페이지 수, 문단 순서)가 그대로인지 확인합니다.
+"""
+from pypdf import PdfReader
+
+from pdf_processor.api.convertToPdf import _CompressingCanvas, _convert_txt
+
+PARAGRAPHS = 300
+
+
+def test_pages_are_compressed_when_finished(tmp_path):
+    c = _CompressingCanvas(str(tmp_path / "out.pdf"))
+    c.drawString(50, 700, "first page")
+    c.showPage()
+    page = c._doc.Pages.pages[-1]
+    assert page.stream is None
+    assert page.Contents is not None
+    c.drawString(50, 700, "second page")
+    c.save()
+
+    reader = PdfReader(tmp_path / "out.pdf")
+    assert len(reader.pages) == 2
+    assert "first page" in reader.pages[0].extract_text()
+    assert reader.pages[0]["/Contents"].get_object()["/Filter"] in ("/FlateDecode", ["/FlateDecode"])
+
+
+def test_convert_txt_keeps_paragraph_order(tmp_path):
+    src = tmp_path / "input.txt"
+    src.write_text("".join(f"문단 {i} paragraph\n\n" for i in range(PARAGRAPHS)), encoding="utf-8")
+    _convert_txt(src, tmp_path / "output.pdf", page_size="a5")
+
+    reader = PdfReader(tmp_path / "output.pdf")
+    assert len(reader.pages) > 1
+    text = "".join(page.extract_text() for page in reader.pages)
+    positions = [text.index(f"{i} paragraph") for i in range(PARAGRAPHS)]
+    assert positions == sorted(positions)
@@ -0,0 +1,83 @@
+"""병합 시 중복 스트림 제거(pageops.deduplicate_streams) 테스트
+
+두 입력이 같은 이미지(/SMask 포함)를 사용하면 병합 결과에는 한 벌만 남고,
+모든 페이지가 원본과 똑같이 그려져야 합니다.
+"""
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+from reportlab.lib.utils import ImageReader
+
+from pdfs import make_pdf, syntax_errors
+
+pikepdf = pytest.importorskip("pikepdf")
+pdfium = pytest.importorskip("pypdfium2")
+
+from pdf_processor.api.merge import _merge_files  # noqa: E402
+
+
+def _translucent_image() -> Image.Image:
+    """알파 채널이 있어 reportlab이 /SMask를 만드는 이미지"""
+    image = Image.new("RGBA", (64, 64), (255, 0, 0, 128))
+    for i in range(64):
+        image.putpixel((i, i), (0, 0, 255, 255))
+    return image
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    image = ImageReader(_translucent_image())
+
+    def draw(c):
+        c.drawImage(image, 50, 50, 200, 200, mask="auto")
+
+    # 페이지 텍스트는 입력마다 달라서 공유하는 스트림은 이미지와 마스크뿐입니다
+    return [
+        make_pdf(tmp_path / "a.pdf", 2, label="First", draw=draw),
+        make_pdf(tmp_path / "b.pdf", 3, label="Second", draw=draw),
+    ]
+
+
+def _image_objects(path):
+    """페이지마다 (이미지 객체 번호, 마스크 객체 번호)"""
+    with pikepdf.open(path) as pdf:
+        result = []
+        for page in pdf.pages:
+            (image,) = page.Resources.XObject.values()
+            result.append((image.objgen, image.SMask.objgen))
+        return result
+
+
+def _render(path):
+    document = pdfium.PdfDocument(str(path))
+    try:
+        return [page.render(scale=0.5).to_pil().tobytes() for page in document]
+    finally:
+        document.close()
+
+
+def test_merge_deduplicates_shared_image_and_mask(inputs, tmp_path):
+    output = tmp_path / "merged.pdf"
+    stats = _merge_files(inputs, ["a.pdf", "b.pdf"], [None, None], output)
+
+    # 두 번째 입력의 이미지와 마스크가 첫 번째 입력의 것으로 합쳐집니다
+    assert stats["pages"] == 5
+    assert stats["deduplicated"] == 2
+    assert stats["bytes_saved"] > 0
+    assert syntax_errors(output) == []
+    assert len(set(_image_objects(output))) == 1
+
+    # 모든 페이지가 열리고 원본과 똑같이 그려지는지
+    assert len(PdfReader(output).pages) == 5
+    assert _render(output) == _render(inputs[0]) + _render(inputs[1])
+
+
+def test_merge_selected_pages_keeps_shared_image(inputs, tmp_path):
+    output = tmp_path / "merged.pdf"
+    stats = _merge_files(inputs, ["a.pdf", "b.pdf"], ["2", "1,3"], output)
+
+    assert stats["pages"] == 3
+    assert syntax_errors(output) == []
+    assert len(set(_image_objects(output))) == 1
+    first, second = _render(inputs[0]), _render(inputs[1])
+    assert _render(output) == [first[1], second[0], second[2]]
@@ -0,0 +1,81 @@
+"""CPU 작업 실행기(executor.run_cpu) 테스트"""
+import asyncio
+import os
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from pdf_processor import config, executor
+
+
+def _wait(event: threading.Event):
+    event.wait(5)
+    return "done"
+
+
+def _fail():
+    raise ValueError("broken input")
+
+
+def _crash():
+    # 메모리 부족 등으로 워커 프로세스가 비정상 종료된 경우
+    os._exit(1)
+
+
+def _square(value):
+    return value * value
+
+
+@pytest.fixture
+def small_limits(monkeypatch):
+    monkeypatch.setattr(config, "MAX_WORKERS", 1)
+    monkeypatch.setattr(config, "MAX_QUEUE", 1)
+
+
+def test_rejects_when_queue_is_full(small_limits):
+    async def scenario():
+        release = threading.Event()
+        running = [asyncio.ensure_future(executor.run_cpu(_wait, release, size_hint=0)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert executor.pending_tasks() == 2
+        with pytest.raises(HTTPException) as rejected:
+            await executor.run_cpu(_wait, release, size_hint=0)
+        release.set()
+        assert await asyncio.gather(*running) == ["done", "done"]
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "5"
+    assert executor.pending_tasks() == 0
+
+
+def test_pending_count_recovers_after_failure(small_limits):
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await executor.run_cpu(_fail, size_hint=0)
+        return await executor.run_cpu(_square, 7, size_hint=0)
+
+    assert asyncio.run(scenario()) == 49
+    assert executor.pending_tasks() == 0
+
+
+def test_broken_process_pool_is_replaced():
+    broken = executor.get_process_pool()
+    if broken is None:
+        pytest.skip("프로세스 풀을 사용할 수 없는 환경")
+
+    async def scenario():
+        with pytest.raises(HTTPException) as failed:
+            await executor.run_cpu(_crash)
+        assert failed.value.status_code == 500
+        return await executor.run_cpu(_square, 3)
+
+    try:
+        assert asyncio.run(scenario()) == 9
+        assert executor.get_process_pool() is not broken
+        assert executor.pending_tasks() == 0
+    finally:
+        executor.shutdown()
@@ -0,0 +1,84 @@
+"""증분 업데이트(pageops._append_incremental_update) 회귀 테스트
+
+상호 참조 표, 상호 참조 스트림(객체 스트림), 선형화된 원본 각각에 증분 업데이트를 덧붙인 뒤
+pypdf로 다시 열어 회전과 오버레이를 확인하고 qpdf로 구조를 검사합니다.
+"""
+import pytest
+from pypdf import PdfReader
+
+from pdfs import make_pdf, resave, syntax_errors
+
+pytest.importorskip("pikepdf")
+
+from pdf_processor import pageops  # noqa: E402
+from pdf_processor.api.addWatermark import _watermark_file  # noqa: E402
+
+PAGES = 4
+WATERMARK = {
+    "watermark_type": "text", "watermark_text": "SECRET", "opacity": 0.5, "rotation": 0,
+    "position": "center", "font_size": 40, "font_name": "NotoSansKR", "font_color": "#ff0000",
+    "is_bold": False,
+}
+
+
+@pytest.fixture(params=["xref-table", "object-streams", "linearized"])
+def source(request, tmp_path):
+    plain = make_pdf(tmp_path / "plain.pdf", PAGES)
+    if request.param == "xref-table":
+        return plain
+    import pikepdf
+
+    if request.param == "object-streams":
+        return resave(plain, tmp_path / "objstm.pdf", object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    return resave(plain, tmp_path / "linearized.pdf", linearize=True)
+
+
+def _rotations(path):
+    return [page.rotation for page in PdfReader(path).pages]
+
+
+def _assert_appended(src, dest):
+    """원본 바이트는 그대로 두고 뒤에 덧붙였는지"""
+    original = src.read_bytes()
+    updated = dest.read_bytes()
+    assert len(updated) > len(original)
+    assert updated[:len(original)] == original
+
+
+def test_rotate_incremental(source, tmp_path):
+    dest = tmp_path / "rotated.pdf"
+    assert pageops.rotate_pages_incremental(source, dest, {1, 3}, 90)
+
+    _assert_appended(source, dest)
+    assert syntax_errors(dest) == []
+    assert _rotations(dest) == [90, 0, 90, 0]
+    reader = PdfReader(dest)
+    assert [f"Page {n}" in page.extract_text() for n, page in enumerate(reader.pages, start=1)] == [True] * PAGES
+
+
+def test_watermark_incremental(source, tmp_path):
+    dest = tmp_path / "watermarked.pdf"
+    _watermark_file(source, dest, "2,4", WATERMARK, save_mode="incremental")
+
+    _assert_appended(source, dest)
+    assert syntax_errors(dest) == []
+    reader = PdfReader(dest)
+    assert len(reader.pages) == PAGES
+    stamped = ["SECRET" in page.extract_text() for page in reader.pages]
+    assert stamped == [False, True, False, True]
+    # 원본 내용은 그대로 남아 있어야 합니다
+    assert all(f"Page {n}" in page.extract_text() for n, page in enumerate(reader.pages, start=1))
+
+
+def test_incremental_update_on_top_of_update(source, tmp_path):
+    """증분 업데이트를 덧붙인 파일에 다시 덧붙여도 이전 수정이 유지되는지 (/Prev 연결)"""
+    rotated = tmp_path / "rotated.pdf"
+    assert pageops.rotate_pages_incremental(source, rotated, {2}, 180)
+    dest = tmp_path / "rotated_watermarked.pdf"
+    _watermark_file(rotated, dest, "1", WATERMARK, save_mode="incremental")
+
+    _assert_appended(rotated, dest)
+    assert syntax_errors(dest) == []
+    assert _rotations(dest) == [0, 180, 0, 0]
+    reader = PdfReader(dest)
+    assert ["SECRET" in page.extract_text() for page in reader.pages] == [True, False, False, False]
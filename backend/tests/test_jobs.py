@@ -0,0 +1,123 @@
+"""비동기 작업(/jobs) 수명 주기 테스트
+
+작업 등록, 진행률, 결과 다운로드, 삭제와 StreamingResponse 결과의 보관, 보관 시간이 지난 작업의
+정리를 확인합니다.
+"""
+import asyncio
+import io
+import time
+import zipfile
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_processor import config, jobs
+
+from pdfs import make_pdf
+
+
+def _submit(client, operation, path, **data):
+    with open(path, "rb") as f:
+        response = client.post(f"/jobs/{operation}", data=data, files={"file": (path.name, f, "application/pdf")})
+    assert response.status_code == 202
+    return response.json()["id"]
+
+
+def _wait_finished(client, job_id, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["status"] in ("completed", "failed"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"작업이 끝나지 않았습니다: {status}")
+
+
+def test_file_result_lifecycle(client, tmp_path):
+    src = make_pdf(tmp_path / "input.pdf", 3)
+    job_id = _submit(client, "rotate", src, angle="90", pages="all", include_unspecified="false")
+
+    status = _wait_finished(client, job_id)
+    assert status["status"] == "completed"
+    assert status["progress"]["percent"] == 100.0
+    assert status["result"]["filename"].endswith("input.pdf")
+
+    result = client.get(f"/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert [page.rotation for page in PdfReader(io.BytesIO(result.content)).pages] == [90, 90, 90]
+
+    job_dir = jobs.get_job(job_id).job_dir
+    session_dirs = list(jobs.get_job(job_id).session_dirs)
+    assert client.delete(f"/jobs/{job_id}").json() == {"id": job_id, "deleted": True}
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    assert client.get(f"/jobs/{job_id}/result").status_code == 404
+    assert not job_dir.exists()
+    assert not any(path.exists() for path in session_dirs)
+
+
+def test_streaming_result_is_drained_into_job_dir(client, tmp_path):
+    src = make_pdf(tmp_path / "book.pdf", 5)
+    job_id = _submit(client, "split", src, mode="every", every="2")
+
+    status = _wait_finished(client, job_id)
+    assert status["status"] == "completed"
+    assert status["result"]["media_type"] == "application/zip"
+    job = jobs.get_job(job_id)
+    # 스트리밍 응답은 작업 디렉토리의 파일로 모두 받아 둡니다
+    assert job.result_path.parent == job.job_dir
+    assert job.result_path.stat().st_size == status["result"]["size"]
+    # 응답 후 정리 작업(세션 디렉토리 삭제)은 작업을 삭제할 때까지 미룹니다
+    assert job.cleanup_tasks
+
+    result = client.get(f"/jobs/{job_id}/result")
+    with zipfile.ZipFile(io.BytesIO(result.content)) as archive:
+        pages = [len(PdfReader(archive.open(name)).pages) for name in archive.namelist()]
+    assert pages == [2, 2, 1]
+
+    session_dirs = list(job.session_dirs)
+    client.delete(f"/jobs/{job_id}")
+    assert not job.job_dir.exists()
+    assert not any(path.exists() for path in session_dirs)
+
+
+def test_failed_job_reports_error(client, tmp_path):
+    src = make_pdf(tmp_path / "input.pdf", 2)
+    job_id = _submit(client, "split", src, mode="every", every="0")
+
+    status = _wait_finished(client, job_id)
+    assert status["status"] == "failed"
+    assert status["status_code"] == 400
+    result = client.get(f"/jobs/{job_id}/result")
+    assert result.status_code == 400
+    client.delete(f"/jobs/{job_id}")
+
+
+def test_expired_job_is_purged_on_get(client, tmp_path, monkeypatch):
+    src = make_pdf(tmp_path / "input.pdf", 1)
+    job_id = _submit(client, "rotate", src, angle="180", pages="all", include_unspecified="false")
+    _wait_finished(client, job_id)
+    job_dir = jobs.get_job(job_id).job_dir
+
+    monkeypatch.setattr(config, "JOB_RESULT_TTL", 0)
+    time.sleep(0.01)
+    assert client.get(f"/jobs/{job_id}/result").status_code == 404
+    assert job_id not in jobs._jobs
+    assert not job_dir.exists()
+
+
+def test_expired_job_is_purged_without_requests(client, tmp_path, monkeypatch):
+    src = make_pdf(tmp_path / "input.pdf", 1)
+    job_id = _submit(client, "rotate", src, angle="270", pages="all", include_unspecified="false")
+    _wait_finished(client, job_id)
+    job_dir = jobs.get_job(job_id).job_dir
+
+    monkeypatch.setattr(config, "JOB_RESULT_TTL", 0)
+
+    async def idle_server():
+        # 요청이 없어도 주기적인 정리가 보관 시간이 지난 작업을 삭제합니다
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(jobs._purge_loop(), timeout=1.5)
+
+    asyncio.run(idle_server())
+    assert job_id not in jobs._jobs
+    assert not job_dir.exists()
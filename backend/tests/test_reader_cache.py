@@ -0,0 +1,87 @@
+"""등록된 문서의 PdfReader 캐시(documents.ReaderCache) 테스트"""
+import mmap
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from pdf_processor import config, documents, pdfinput
+
+from pdfs import make_pdf
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    return make_pdf(tmp_path / "document.pdf", 3)
+
+
+def test_miss_then_hit_and_busy_entry(pdf):
+    cache = documents.ReaderCache(10 * 1024 * 1024)
+    entry = cache.acquire(pdf)
+    assert len(entry.reader.pages) == 3
+    # 사용 중인 항목은 다른 요청에 주지 않습니다
+    assert cache.acquire(pdf) is None
+    cache.release(entry)
+    assert cache.acquire(pdf) is entry
+    cache.release(entry)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+
+
+def test_large_document_is_mapped_and_counted(pdf, monkeypatch):
+    monkeypatch.setattr(config, "MMAP_MIN_BYTES", 1)
+    cache = documents.ReaderCache(10 * 1024 * 1024)
+    entry = cache.acquire(pdf)
+    assert isinstance(entry.reader.stream, mmap.mmap)
+    assert entry.estimated_bytes >= pdf.stat().st_size
+    cache.release(entry)
+
+    cache.discard(pdf)
+    assert entry.reader.stream.closed
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicted_entry_is_closed_after_release(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "MMAP_MIN_BYTES", 1)
+    first, second = make_pdf(tmp_path / "a.pdf", 1), make_pdf(tmp_path / "b.pdf", 1)
+    cache = documents.ReaderCache(0)
+    held = cache.acquire(first)
+    other = cache.acquire(second)
+    # 한도를 넘어 먼저 등록된 항목이 빠지지만, 아직 사용 중이므로 닫지 않습니다
+    cache.release(other)
+    assert cache.stats()["entries"] == 1
+    assert not held.reader.stream.closed
+    assert len(held.reader.pages) == 1
+    cache.release(held)
+    assert held.reader.stream.closed
+
+
+def test_parse_runs_outside_lock_and_first_entry_wins(pdf, monkeypatch):
+    cache = documents.ReaderCache(10 * 1024 * 1024)
+    parsing = threading.Barrier(2, timeout=5)
+    open_pdf = pdfinput.open_pdf
+
+    @contextmanager
+    def slow_open_pdf(src):
+        # 두 요청이 모두 파싱을 시작할 때까지 기다립니다 (캐시 잠금을 잡고 있으면 교착 상태)
+        parsing.wait()
+        with open_pdf(src) as reader:
+            yield reader
+
+    monkeypatch.setattr(pdfinput, "open_pdf", slow_open_pdf)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.acquire(pdf))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(results) == 2 and all(results)
+    cached, extra = sorted(results, key=lambda entry: entry.retired)
+    assert not cached.retired and extra.retired
+    assert cache.stats()["entries"] == 1
+    cache.release(extra)
+    cache.release(cached)
+    # 나중에 파싱한 PdfReader는 캐시하지 않고, 먼저 등록된 항목을 계속 사용합니다
+    assert cache.acquire(pdf) is cached
+    cache.release(cached)
@@ -0,0 +1,230 @@
+"""작업 결과 캐시(cache) 테스트
+
+ResultCache의 적중/LRU 삭제/이전 버전 정리와, 각 엔드포인트에서 결과에 영향을 주는 파라미터가
+캐시 키에 들어가는지, 암호화 결과는 캐시하지 않는지 확인합니다.
+"""
+import asyncio
+import io
+import json
+import os
+
+import pytest
+from PIL import Image
+
+from pdf_processor import cache as result_cache
+
+from pdfs import make_pdf
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return result_cache.ResultCache(tmp_path / "cache" / "v1", 100)
+
+
+def _file(path, size):
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_get_copies_outside_lock(cache, tmp_path, monkeypatch):
+    cache.put("a" * 64, _file(tmp_path / "a.pdf", 60))
+    link_or_copy = result_cache._link_or_copy
+    during_copy = {}
+
+    def slow_copy(src, dest):
+        if dest.name != "out.pdf":
+            return link_or_copy(src, dest)
+        # 다른 파일 시스템(RAM 세션)으로의 복사 중에도 다른 요청이 캐시를 사용할 수 있어야 합니다
+        during_copy["locked"] = cache._lock.locked()
+        cache.put("b" * 64, _file(tmp_path / "b.pdf", 60))
+        during_copy["entries"] = cache.stats()["entries"]
+        link_or_copy(src, dest)
+
+    monkeypatch.setattr(result_cache, "_link_or_copy", slow_copy)
+    assert cache.get("a" * 64, tmp_path / "out.pdf")
+    # 가져가는 중인 항목은 캐시에서 빠져도 파일은 다 가져간 뒤에 삭제합니다
+    assert during_copy == {"locked": False, "entries": 1}
+    assert (tmp_path / "out.pdf").read_bytes() == b"x" * 60
+    assert not cache._path("a" * 64).exists()
+    assert cache.get("b" * 64, tmp_path / "out_b.pdf")
+    assert cache.stats()["hits"] == 2
+
+
+def test_missing_file_is_a_miss(cache, tmp_path):
+    key = "c" * 64
+    cache.put(key, _file(tmp_path / "c.pdf", 10))
+    cache._path(key).unlink()
+    assert not cache.get(key, tmp_path / "out.pdf")
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["misses"]) == (0, 0, 1)
+
+
+def test_hits_misses_and_lru_eviction(cache, tmp_path):
+    cache.put("a" * 64, _file(tmp_path / "a.pdf", 40))
+    cache.put("b" * 64, _file(tmp_path / "b.pdf", 40))
+    assert not cache.get("z" * 64, tmp_path / "z.pdf")
+    # a를 사용했으므로 가장 오래 사용하지 않은 b가 먼저 삭제됩니다
+    assert cache.get("a" * 64, tmp_path / "a_out.pdf")
+    cache.put("c" * 64, _file(tmp_path / "c.pdf", 40))
+    assert not cache._path("b" * 64).exists()
+    assert cache.get("a" * 64, tmp_path / "a_out2.pdf")
+    assert cache.get("c" * 64, tmp_path / "c_out.pdf")
+    assert not cache.get("b" * 64, tmp_path / "b_out.pdf")
+    # 캐시 크기보다 큰 결과는 저장하지 않습니다
+    cache.put("d" * 64, _file(tmp_path / "d.pdf", 101))
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (2, 80)
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["evictions"]) == (3, 2, 3, 1)
+
+
+def test_entries_survive_restart_in_use_order(cache, tmp_path):
+    cache.put("a" * 64, _file(tmp_path / "a.pdf", 40))
+    cache.put("b" * 64, _file(tmp_path / "b.pdf", 40))
+    # 재시작 후에는 파일 수정 시각으로 사용 순서를 복원합니다 (a를 b보다 나중에 사용)
+    os.utime(cache._path("b" * 64), (1000, 1000))
+    os.utime(cache._path("a" * 64), (2000, 2000))
+    (cache._path("a" * 64).parent / "leftover.1234.tmp").write_bytes(b"partial")
+
+    restarted = result_cache.ResultCache(cache.directory, 100)
+    restarted.put("c" * 64, _file(tmp_path / "c.pdf", 40))
+    assert restarted.get("a" * 64, tmp_path / "a_out2.pdf")
+    assert not restarted.get("b" * 64, tmp_path / "b_out.pdf")
+    # 저장 도중 종료되어 남은 임시 파일은 처음 읽을 때 삭제합니다
+    assert not list(cache.directory.glob("*/*.tmp"))
+
+
+def test_older_versions_are_removed(tmp_path):
+    old_entry = tmp_path / "cache" / "v1" / "ab" / ("ab" * 32)
+    old_entry.parent.mkdir(parents=True)
+    old_entry.write_bytes(b"old")
+    cache = result_cache.ResultCache(tmp_path / "cache" / "v2", 100)
+    assert cache.stats()["entries"] == 0
+    assert not old_entry.parent.parent.exists()
+
+    old_entry.parent.mkdir(parents=True)
+    cache.clear()
+    assert not old_entry.parent.parent.exists()
+    assert cache.directory.exists()
+
+
+def test_make_key_normalizes_keywords(tmp_path):
+    src = _file(tmp_path / "a.pdf", 10)
+
+    def key(operation, params, inputs=(src,)):
+        return asyncio.run(result_cache.make_key(operation, list(inputs), params))
+
+    assert key("rotate", {"pages": "ALL"}) == key("rotate", {"pages": " all "})
+    assert key("rotate", {"pages": "all"}) != key("split", {"pages": "all"})
+    # 문구의 공백은 의미가 있으므로 그대로 둡니다
+    assert key("add-watermark", {"text": "A B"}) != key("add-watermark", {"text": "A  B"})
+    assert key("rotate", {"pages": "all"}) != key("rotate", {"pages": "all"}, [_file(tmp_path / "b.pdf", 11)])
+
+
+@pytest.fixture
+def api_cache():
+    shared = result_cache.get_cache()
+    shared.clear()
+    yield shared
+    shared.clear()
+
+
+def _post(client, url, src, data, image=None):
+    with open(src, "rb") as f:
+        files = {"file": (src.name, f, "application/pdf")}
+        if image is not None:
+            files["watermark_image"] = ("mark.png", image, "image/png")
+        response = client.post(url, data=data, files=files)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _stats(cache):
+    stats = cache.stats()
+    return stats["hits"], stats["stores"]
+
+
+def _assert_key_params(client, cache, url, src, base, variants, image=None):
+    """같은 요청은 캐시에서 가져오고, 파라미터를 하나씩 바꾼 요청은 새로 처리하는지 확인"""
+    first = _post(client, url, src, base, image)
+    hits, stores = _stats(cache)
+    again = _post(client, url, src, base, image)
+    assert _stats(cache) == (hits + 1, stores)
+    assert again.content == first.content
+    for name, value in variants.items():
+        hits, stores = _stats(cache)
+        _post(client, url, src, {**base, name: value}, image)
+        assert _stats(cache) == (hits, stores + 1), name
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    return make_pdf(tmp_path / "input.pdf", 4)
+
+
+def test_rotate_key_params(client, api_cache, pdf):
+    _assert_key_params(
+        client, api_cache, "/rotate", pdf,
+        {"pages": "1-2", "angle": "90", "include_unspecified": "true"},
+        {"pages": "1-3", "angle": "180", "include_unspecified": "false"},
+    )
+    # 페이지 범위의 공백은 키에 영향을 주지 않습니다
+    hits, stores = _stats(api_cache)
+    _post(client, "/rotate", pdf, {"pages": "1 - 2", "angle": "90", "include_unspecified": "true"})
+    assert _stats(api_cache) == (hits + 1, stores)
+
+
+def test_split_key_params(client, api_cache, pdf):
+    _assert_key_params(client, api_cache, "/split", pdf, {"pages": "1-2"}, {"pages": "2-3"})
+
+
+def test_add_watermark_key_params(client, api_cache, pdf):
+    _assert_key_params(
+        client, api_cache, "/add-watermark", pdf,
+        {"watermark_type": "text", "watermark_text": "DRAFT", "pages": "all"},
+        {
+            "watermark_text": "FINAL", "opacity": "0.3", "rotation": "45", "position": "tile",
+            "font_size": "20", "font_color": "#ff0000", "font_bold": "true", "pages": "1",
+            "save_mode": "incremental",
+        },
+    )
+
+
+def test_image_watermark_key_includes_image(client, api_cache, pdf):
+    def png(color):
+        buffer = io.BytesIO()
+        Image.new("RGB", (8, 8), color).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    data = {"watermark_type": "image", "pages": "all"}
+    _post(client, "/add-watermark", pdf, data, png("red"))
+    hits, stores = _stats(api_cache)
+    _post(client, "/add-watermark", pdf, data, png("red"))
+    assert _stats(api_cache) == (hits + 1, stores)
+    _post(client, "/add-watermark", pdf, data, png("blue"))
+    assert _stats(api_cache) == (hits + 1, stores + 1)
+
+
+def test_pipeline_key_params(client, api_cache, pdf):
+    rotate = {"op": "rotate", "pages": "1", "angle": 90}
+    split_step = {"op": "split", "pages": "1-2"}
+    _assert_key_params(
+        client, api_cache, "/pipeline", pdf,
+        {"steps": json.dumps([rotate, split_step])},
+        {
+            "steps": json.dumps([{**rotate, "angle": 270}, split_step]),
+        },
+    )
+    hits, stores = _stats(api_cache)
+    _post(client, "/pipeline", pdf, {"steps": json.dumps([split_step, rotate])})
+    assert _stats(api_cache) == (hits, stores + 1)
+
+
+def test_encrypt_results_are_never_cached(client, api_cache, pdf):
+    hits, stores = _stats(api_cache)
+    for _ in range(2):
+        _post(client, "/encrypt", pdf, {"password": "secret"})
+        steps = [{"op": "rotate", "pages": "all", "angle": 90}, {"op": "encrypt", "password": "secret"}]
+        _post(client, "/pipeline", pdf, {"steps": json.dumps(steps)})
+    assert _stats(api_cache) == (hits, stores)
+    assert api_cache.stats()["entries"] == 0
@@ -0,0 +1,138 @@
+"""분할 모드(every/ranges/bookmarks)와 묶음별 병렬 분할 테스트
+
+각 결과 문서의 페이지에는 make_pdf가 그린 "Page <번호>" 텍스트가 있으므로 원본의 어떤 페이지가
+어느 문서에 들어갔는지 확인할 수 있습니다.
+"""
+import io
+import zipfile
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from pdf_processor import config, pageops
+from pdf_processor.api import split
+from pdf_processor.utils import InvalidInputError
+
+from pdfs import make_pdf
+
+PAGES = 10
+
+
+def _labels(reader):
+    return [int(page.extract_text().split()[-1]) for page in reader.pages]
+
+
+@pytest.fixture
+def source(tmp_path):
+    return make_pdf(tmp_path / "book.pdf", PAGES)
+
+
+@pytest.fixture
+def bookmarked(source, tmp_path):
+    writer = PdfWriter(clone_from=source)
+    chapter = writer.add_outline_item("Chapter 1", 2)
+    writer.add_outline_item("Section 1.1", 3, parent=chapter)
+    writer.add_outline_item("Chapter 2: A/B", 6)
+    path = tmp_path / "bookmarked.pdf"
+    writer.write(path)
+    return path
+
+
+def _split(client, path, **data):
+    with open(path, "rb") as f:
+        return client.post("/split", data=data, files={"file": (path.name, f, "application/pdf")})
+
+
+def _parts(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        return [(name, _labels(PdfReader(archive.open(name)))) for name in archive.namelist()]
+
+
+def test_every_n_pages():
+    assert pageops.every_n_pages(5, 2) == [[1, 2], [3, 4], [5]]
+    assert pageops.every_n_pages(3, 10) == [[1, 2, 3]]
+    with pytest.raises(InvalidInputError):
+        pageops.every_n_pages(3, 0)
+
+
+def test_range_groups():
+    assert pageops.range_groups("1-3; 4,6 ;8-", 10) == [[1, 2, 3], [4, 6], [8, 9, 10]]
+    assert pageops.range_groups("-2;;9-", 10) == [[1, 2], [9, 10]]
+    for spec in ("", ";", "11-12", "3-x"):
+        with pytest.raises((InvalidInputError, ValueError)):
+            pageops.range_groups(spec, 10)
+
+
+def test_bookmark_groups(bookmarked):
+    reader = PdfReader(bookmarked)
+    # 첫 책갈피 앞의 페이지는 제목 없는 문서가 되고, 하위 책갈피로는 나누지 않습니다
+    assert pageops.bookmark_groups(reader, PAGES) == [
+        ("", [1, 2]), ("Chapter 1", [3, 4, 5, 6]), ("Chapter 2: A/B", [7, 8, 9, 10]),
+    ]
+
+
+def test_split_every(client, source):
+    parts = _parts(_split(client, source, mode="every", every="4"))
+    assert parts == [
+        ("book_001_p1-4.pdf", [1, 2, 3, 4]),
+        ("book_002_p5-8.pdf", [5, 6, 7, 8]),
+        ("book_003_p9-10.pdf", [9, 10]),
+    ]
+
+
+def test_split_ranges(client, source):
+    parts = _parts(_split(client, source, mode="ranges", pages="1-2;3,5;9-"))
+    assert parts == [
+        ("book_001_p1-2.pdf", [1, 2]),
+        ("book_002_p3-5_etc.pdf", [3, 5]),
+        ("book_003_p9-10.pdf", [9, 10]),
+    ]
+
+
+def test_split_bookmarks(client, bookmarked):
+    parts = _parts(_split(client, bookmarked, mode="bookmarks"))
+    assert parts == [
+        ("bookmarked_001_p1-2.pdf", [1, 2]),
+        ("bookmarked_002_Chapter 1.pdf", [3, 4, 5, 6]),
+        ("bookmarked_003_Chapter 2_ A_B.pdf", [7, 8, 9, 10]),
+    ]
+
+
+def test_split_pages(client, source):
+    response = _split(client, source, pages="2,4-5")
+    assert response.status_code == 200
+    assert _labels(PdfReader(io.BytesIO(response.content))) == [2, 4, 5]
+
+
+@pytest.mark.parametrize("data", [
+    {"mode": "every", "every": "0"},
+    {"mode": "every"},
+    {"mode": "ranges", "pages": ""},
+    {"mode": "ranges", "pages": "11-12"},
+    {"mode": "bookmarks"},
+    {"mode": "pages", "pages": ""},
+])
+def test_invalid_parameters(client, source, data):
+    assert _split(client, source, **data).status_code == 400
+
+
+def test_parallel_chunks_keep_order(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "MAX_WORKERS", 3)
+    parts = [(f"part_{i}.pdf", [i]) for i in range(1, 8)]
+    chunks = split._chunk_parts(parts, config.MAX_WORKERS)
+    assert len(chunks) == 3
+    assert [part for chunk in chunks for part in chunk] == parts
+
+    source = make_pdf(tmp_path / "long.pdf", 30)
+    parts = _parts(_split(client, source, mode="every", every="3"))
+    assert len(parts) == 10
+    assert [labels for _, labels in parts] == [[i, i + 1, i + 2] for i in range(1, 31, 3)]
+
+
+def test_extract_parts_writes_every_part(source, tmp_path):
+    dests = [(tmp_path / "a.pdf", [1, 3]), (tmp_path / "b.pdf", [10])]
+    pageops.extract_parts(source, dests)
+    assert _labels(PdfReader(tmp_path / "a.pdf")) == [1, 3]
+    assert _labels(PdfReader(tmp_path / "b.pdf")) == [10]
@@ -0,0 +1,98 @@
+"""텍스트 폭 측정과 줄바꿈(textmetrics) 테스트
+
+폭은 pdfmetrics.stringWidth와, 줄바꿈은 기존 TXT 변환의 줄바꿈 함수와 같은 결과인지 확인합니다.
+"""
+import random
+
+import pytest
+from reportlab.pdfbase import pdfmetrics
+
+from pdf_processor import fonts
+from pdf_processor.textmetrics import text_width, wrap_text
+
+FONT_SIZE = 12
+MAX_WIDTH = 200
+
+
+@pytest.fixture(scope="module", params=["Helvetica", "NotoSansKR"])
+def font_name(request):
+    if request.param == "NotoSansKR":
+        return fonts.ensure_font("NotoSansKR")
+    return request.param
+
+
+def _old_wrapped_lines(text, font_name, font_size, max_width):
+    """user-007 이전 convertToPdf의 get_wrapped_lines (문자열 전체를 다시 측정하는 방식)"""
+    lines = []
+    current_line = ''
+    for word in text.split():
+        if pdfmetrics.stringWidth(word, font_name, font_size) > max_width:
+            if current_line:
+                lines.append(current_line)
+                current_line = ''
+            temp_word = ''
+            for char in word:
+                if pdfmetrics.stringWidth(temp_word + char, font_name, font_size) <= max_width:
+                    temp_word += char
+                else:
+                    lines.append(temp_word)
+                    temp_word = char
+            if temp_word:
+                current_line = temp_word
+        else:
+            test_line = current_line + ' ' + word if current_line else word
+            if pdfmetrics.stringWidth(test_line, font_name, font_size) <= max_width:
+                current_line = test_line
+            else:
+                lines.append(current_line)
+                current_line = word
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+
+@pytest.mark.parametrize("text", ["", " ", "Hello, world!", "가나다 ABC 123", "x" * 500, "WWW iii ..."])
+def test_width_matches_string_width(font_name, text):
+    for font_size in (0, 7.5, 12, 40):
+        assert text_width(text, font_name, font_size) == pytest.approx(
+            pdfmetrics.stringWidth(text, font_name, font_size), abs=1e-9
+        )
+
+
+def test_lines_fit_and_keep_words(font_name):
+    text = "The quick brown fox jumps over the lazy dog " * 20
+    lines = wrap_text(text, font_name, FONT_SIZE, MAX_WIDTH)
+    assert len(lines) > 1
+    assert all(pdfmetrics.stringWidth(line, font_name, FONT_SIZE) <= MAX_WIDTH for line in lines)
+    assert " ".join(lines).split() == text.split()
+
+
+def test_long_word_is_split_by_characters_and_line_continues(font_name):
+    long_word = "a" * 200
+    lines = wrap_text(f"start {long_word} end", font_name, FONT_SIZE, MAX_WIDTH)
+    assert lines[0] == "start"
+    assert "".join(lines[1:])[:200] == long_word
+    # 마지막 조각 뒤에 다음 단어가 같은 줄로 이어집니다
+    assert lines[-1].endswith(" end")
+    assert all(pdfmetrics.stringWidth(line, font_name, FONT_SIZE) <= MAX_WIDTH for line in lines)
+    assert lines == _old_wrapped_lines(f"start {long_word} end", font_name, FONT_SIZE, MAX_WIDTH)
+
+
+def test_zero_font_size_keeps_one_line(font_name):
+    text = "word " * 100
+    assert wrap_text(text, font_name, 0, MAX_WIDTH) == [text.strip()]
+    assert wrap_text(text, font_name, 0, MAX_WIDTH) == _old_wrapped_lines(text, font_name, 0, MAX_WIDTH)
+
+
+def test_matches_old_wrapper_on_random_text(font_name):
+    rng = random.Random(7)
+    alphabet = "abcdefghijklmnopqrstuvwxyzWMI가나다라마바사 .,\t"
+    for _ in range(200):
+        text = "".join(
+            rng.choice(alphabet) if rng.random() > 0.02 else "x" * rng.randint(20, 200)
+            for _ in range(rng.randint(0, 600))
+        )
+        max_width = rng.choice((60, 200, 512))
+        font_size = rng.choice((8, 12, 17.5))
+        assert wrap_text(text, font_name, font_size, max_width) == \
+            _old_wrapped_lines(text, font_name, font_size, max_width)
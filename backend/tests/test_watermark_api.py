@@ -0,0 +1,33 @@
+"""POST /add-watermark 입력 검증 테스트"""
+from pdf_processor import cache as result_cache
+
+from pdfs import make_pdf
+
+
+def test_image_watermark_without_image_is_rejected(client, tmp_path):
+    src = make_pdf(tmp_path / "input.pdf", 1)
+    stores = result_cache.get_cache().stats()["stores"]
+
+    with open(src, "rb") as f:
+        response = client.post(
+            "/add-watermark",
+            data={"watermark_type": "image"},
+            files={"file": ("input.pdf", f, "application/pdf")},
+        )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "이미지 워터마크에는 watermark_image 파일이 필요합니다"
+    # 잘못된 요청의 결과는 캐시에 저장되지 않아야 합니다
+    assert result_cache.get_cache().stats()["stores"] == stores
+
+
+def test_text_watermark_still_works(client, tmp_path):
+    src = make_pdf(tmp_path / "input.pdf", 2)
+    with open(src, "rb") as f:
+        response = client.post(
+            "/add-watermark",
+            data={"watermark_type": "text", "watermark_text": "DRAFT"},
+            files={"file": ("input.pdf", f, "application/pdf")},
+        )
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
@@ -35,16 +35,57 @@ const handleResponse = async (response: Response): Promise<Blob> => {
   return response.blob();
 };
 
+// 비동기 작업(Job) 상태
+interface JobStatus {
+  id: string;
+  operation: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  progress: { done: number; total: number; percent: number | null };
+  error?: string;
+  status_code?: number;
+  result?: { filename: string; media_type: string; size: number | null };
+}
+
+// 등록된 문서(POST /documents)
+interface DocumentInfo {
+  document_id: string;
+  filename: string;
+  size: number;
+  pages: number;
+  created_at: number;
+  last_used: number;
+}
+
+// 작업 입력: 업로드할 파일 또는 createDocument로 등록한 문서 ID
+type PdfInput = File | string;
+
+const appendInput = (formData: FormData, input: PdfInput) => {
+  if (typeof input === 'string') {
+    formData.append('document_id', input);
+  } else {
+    formData.append('file', input);
+  }
+};
+
+const parseJobResponse = async (response: Response): Promise<JobStatus> => {
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`Request failed with status ${response.status}: ${errorText.substring(0, 200)}`);
+  }
+  return response.json();
+};
+
 // PDF 처리 함수들
 const pdfApi = {
   // *** 여기가 추가된 부분입니다 ***
-  editPdf: async (file: File, elements: any[]): Promise<Blob> => {
+  editPdf: async (file: PdfInput, elements: any[], saveMode?: 'full' | 'incremental'): Promise<Blob> => {
     const port = await getBackendPort();
     console.log(`Sending edit request to port: ${port}`);
     
     const formData = new FormData();
-    formData.append('file', file);
+    appendInput(formData, file);
     formData.append('elements', JSON.stringify(elements)); // elements는 JSON 문자열로 변환
+    if (saveMode) formData.append('save_mode', saveMode);
 
     const response = await fetch(`${BASE_URL}:${port}/edit`, { // 엔드포인트는 /edit
       method: 'POST',
@@ -55,11 +96,17 @@ const pdfApi = {
   },
 
   // --- 이하 기존 함수들 (변경 없음) ---
-  splitPdf: async (file: File, pages: string): Promise<Blob> => {
+  splitPdf: async (
+    file: PdfInput,
+    pages: string,
+    splitOptions?: { mode?: 'pages' | 'every' | 'ranges' | 'bookmarks'; every?: number }
+  ): Promise<Blob> => {
     const port = await getBackendPort();
     const formData = new FormData();
-    formData.append('file', file);
+    appendInput(formData, file);
     formData.append('pages', pages);
+    if (splitOptions?.mode) formData.append('mode', splitOptions.mode);
+    if (splitOptions?.every !== undefined) formData.append('every', String(splitOptions.every));
     const response = await fetch(`${BASE_URL}:${port}/split`, {
       method: 'POST',
       body: formData,
@@ -67,12 +114,16 @@ const pdfApi = {
     return handleResponse(response);
   },
 
-  mergePdfs: async (files: File[]): Promise<Blob> => {
+  mergePdfs: async (files: File[], pageRanges?: string[]): Promise<Blob> => {
     const port = await getBackendPort();
     const formData = new FormData();
     files.forEach(file => {
       formData.append('files', file);
     });
+    // 파일마다 병합할 페이지 범위 (파일 순서대로, 'all'이면 전체)
+    pageRanges?.forEach(pages => {
+      formData.append('pages', pages);
+    });
     const response = await fetch(`${BASE_URL}:${port}/merge`, {
       method: 'POST',
       body: formData,
@@ -80,10 +131,10 @@ const pdfApi = {
     return handleResponse(response);
   },
 
-  rotatePdf: async (file: File, pages: string, angle: number, includeUnspecified: boolean): Promise<Blob> => {
+  rotatePdf: async (file: PdfInput, pages: string, angle: number, includeUnspecified: boolean): Promise<Blob> => {
     const port = await getBackendPort();
     const formData = new FormData();
-    formData.append('file', file);
+    appendInput(formData, file);
     formData.append('pages', pages);
     formData.append('angle', angle.toString());
     formData.append('include_unspecified', includeUnspecified.toString());
@@ -94,13 +145,26 @@ const pdfApi = {
     return handleResponse(response);
   },
 
-  convertToPdf: async (files: File[], sourceFormat: 'txt' | 'html' | 'image'): Promise<Blob> => {
+  convertToPdf: async (
+    files: File[],
+    sourceFormat: 'txt' | 'html' | 'image',
+    txtOptions?: {
+      pageSize?: 'letter' | 'legal' | 'a3' | 'a4' | 'a5';
+      fontSize?: number;
+      margin?: number;
+      encoding?: string;
+    }
+  ): Promise<Blob> => {
     const port = await getBackendPort();
     const formData = new FormData();
     files.forEach(file => {
       formData.append('files', file);
     });
     formData.append('source_format', sourceFormat);
+    if (txtOptions?.pageSize) formData.append('page_size', txtOptions.pageSize);
+    if (txtOptions?.fontSize !== undefined) formData.append('font_size', String(txtOptions.fontSize));
+    if (txtOptions?.margin !== undefined) formData.append('margin', String(txtOptions.margin));
+    if (txtOptions?.encoding) formData.append('encoding', txtOptions.encoding);
     const response = await fetch(`${BASE_URL}:${port}/convert-to-pdf`, {
       method: 'POST',
       body: formData,
@@ -108,7 +172,13 @@ const pdfApi = {
     return handleResponse(response);
   },
 
-  convertFromPdf: async (file: File, targetFormat: 'docx' | 'image', imageFormat?: 'jpg' | 'png', outputPath?: string): Promise<Blob> => {
+  convertFromPdf: async (
+    file: File,
+    targetFormat: 'docx' | 'image',
+    imageFormat?: 'jpg' | 'png',
+    outputPath?: string,
+    imageOptions?: { dpi?: number; pages?: string }
+  ): Promise<Blob> => {
     const port = await getBackendPort();
     const formData = new FormData();
     formData.append('file', file);
@@ -119,6 +189,12 @@ const pdfApi = {
     if (outputPath) {
       formData.append('output_path_str', outputPath);
     }
+    if (imageOptions?.dpi !== undefined) {
+      formData.append('dpi', String(imageOptions.dpi));
+    }
+    if (imageOptions?.pages) {
+      formData.append('pages', imageOptions.pages);
+    }
     const response = await fetch(`${BASE_URL}:${port}/convert-from-pdf`, {
       method: 'POST',
       body: formData,
@@ -127,7 +203,7 @@ const pdfApi = {
   },
 
   addWatermark: async (
-    file: File, 
+    file: PdfInput, 
     options: {
       watermarkType: 'text' | 'image';
       watermarkText?: string;
@@ -140,11 +216,12 @@ const pdfApi = {
       fontColor?: string;
       fontBold?: boolean;
       pages: string;
+      saveMode?: 'full' | 'incremental';
     }
   ): Promise<Blob> => {
     const port = await getBackendPort();
     const formData = new FormData();
-    formData.append('file', file);
+    appendInput(formData, file);
     formData.append('watermark_type', options.watermarkType);
     if (options.watermarkType === 'text' && options.watermarkText) {
       formData.append('watermark_text', options.watermarkText);
@@ -166,6 +243,9 @@ const pdfApi = {
       formData.append('font_bold', options.fontBold.toString());
     }
     formData.append('pages', options.pages);
+    if (options.saveMode) {
+      formData.append('save_mode', options.saveMode);
+    }
     const response = await fetch(`${BASE_URL}:${port}/add-watermark`, {
       method: 'POST',
       body: formData,
@@ -196,6 +276,125 @@ const pdfApi = {
     });
     return handleResponse(response);
   },
+
+  // 여러 작업(rotate, split, add-watermark, edit, encrypt)을 한 번의 요청으로 차례로 적용
+  runPipeline: async (file: PdfInput, steps: Array<Record<string, any>>, watermarkImage?: File): Promise<Blob> => {
+    const port = await getBackendPort();
+    const formData = new FormData();
+    appendInput(formData, file);
+    formData.append('steps', JSON.stringify(steps));
+    if (watermarkImage) formData.append('watermark_image', watermarkImage);
+    const response = await fetch(`${BASE_URL}:${port}/pipeline`, {
+      method: 'POST',
+      body: formData,
+    });
+    return handleResponse(response);
+  },
+
+  // 여러 PDF 파일(또는 PDF들을 묶은 ZIP)에 같은 작업을 적용하고 결과 PDF들과 manifest.json을 묶은 ZIP을 반환
+  batchPdfs: async (
+    operation: 'rotate' | 'add-watermark' | 'encrypt' | 'decrypt',
+    files: File[],
+    params: Record<string, string | number | boolean | File>,
+    archive?: File
+  ): Promise<Blob> => {
+    const port = await getBackendPort();
+    const formData = new FormData();
+    files.forEach(file => {
+      formData.append('files', file);
+    });
+    if (archive) formData.append('archive', archive);
+    Object.entries(params).forEach(([key, value]) => {
+      formData.append(key, value instanceof File ? value : String(value));
+    });
+    const response = await fetch(`${BASE_URL}:${port}/batch/${operation}`, {
+      method: 'POST',
+      body: formData,
+    });
+    return handleResponse(response);
+  },
+
+  // 서버 상태: ready(요청 처리 가능)와 warm(백그라운드 예열 완료)을 구분
+  getHealth: async (): Promise<{ status: string; ready: boolean; warm: boolean; [key: string]: any }> => {
+    const port = await getBackendPort();
+    const response = await fetch(`${BASE_URL}:${port}/health`);
+    if (!response.ok) {
+      throw new Error(`Request failed with status ${response.status}`);
+    }
+    return response.json();
+  },
+
+  // --- 문서 API: 한 번 업로드한 PDF를 여러 작업에서 document_id로 재사용합니다 ---
+  createDocument: async (file: File): Promise<DocumentInfo> => {
+    const port = await getBackendPort();
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await fetch(`${BASE_URL}:${port}/documents`, {
+      method: 'POST',
+      body: formData,
+    });
+    if (!response.ok) {
+      const errorText = await response.text();
+      throw new Error(`Request failed with status ${response.status}: ${errorText.substring(0, 200)}`);
+    }
+    return response.json();
+  },
+
+  deleteDocument: async (documentId: string): Promise<void> => {
+    const port = await getBackendPort();
+    await fetch(`${BASE_URL}:${port}/documents/${documentId}`, { method: 'DELETE' });
+  },
+
+  // --- 비동기 작업 API: 오래 걸리는 작업은 작업 ID를 받고 진행률을 폴링합니다 ---
+  startJob: async (operation: string, formData: FormData): Promise<JobStatus> => {
+    const port = await getBackendPort();
+    const response = await fetch(`${BASE_URL}:${port}/jobs/${operation}`, {
+      method: 'POST',
+      body: formData,
+    });
+    return parseJobResponse(response);
+  },
+
+  getJob: async (jobId: string): Promise<JobStatus> => {
+    const port = await getBackendPort();
+    const response = await fetch(`${BASE_URL}:${port}/jobs/${jobId}`);
+    return parseJobResponse(response);
+  },
+
+  getJobResult: async (jobId: string): Promise<Blob> => {
+    const port = await getBackendPort();
+    const response = await fetch(`${BASE_URL}:${port}/jobs/${jobId}/result`);
+    return handleResponse(response);
+  },
+
+  deleteJob: async (jobId: string): Promise<void> => {
+    const port = await getBackendPort();
+    await fetch(`${BASE_URL}:${port}/jobs/${jobId}`, { method: 'DELETE' });
+  },
+
+  // 작업을 등록하고 완료될 때까지 폴링한 뒤 결과를 반환 (결과를 받은 후 서버의 작업은 삭제)
+  runJob: async (
+    operation: string,
+    formData: FormData,
+    onProgress?: (status: JobStatus) => void,
+    intervalMs: number = 1000
+  ): Promise<Blob> => {
+    let status = await pdfApi.startJob(operation, formData);
+    while (status.status === 'queued' || status.status === 'running') {
+      onProgress?.(status);
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+      status = await pdfApi.getJob(status.id);
+    }
+    onProgress?.(status);
+    try {
+      if (status.status === 'failed') {
+        throw new Error(`Job failed with status ${status.status_code}: ${status.error}`);
+      }
+      return await pdfApi.getJobResult(status.id);
+    } finally {
+      await pdfApi.deleteJob(status.id).catch(() => undefined);
+    }
+  },
 };
 
 // 백엔드 포트를 받기 위한 IPC 리스너
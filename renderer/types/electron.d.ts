@@ -11,49 +11,87 @@ declare global {
   type PDFCheckboxElement = { id: string; type: 'checkbox'; /* ... */ };
   type PDFEditElement = PDFTextElement | PDFSignatureElement | PDFCheckboxElement;
 
+  // 비동기 작업 상태
+  interface JobStatus {
+    id: string;
+    operation: string;
+    status: 'queued' | 'running' | 'completed' | 'failed';
+    progress: { done: number; total: number; percent: number | null };
+    error?: string;
+    status_code?: number;
+    result?: { filename: string; media_type: string; size: number | null };
+  }
+
+  // 등록된 문서 (createDocument)
+  interface DocumentInfo {
+    document_id: string;
+    filename: string;
+    size: number;
+    pages: number;
+    created_at: number;
+    last_used: number;
+  }
+
   interface Window {
     electron: {
       pdf: {
         /**
          * PDF 파일을 편집 요소(텍스트, 서명 등)를 추가하여 수정
-         * @param file 원본 PDF 파일
+         * @param file 원본 PDF 파일 또는 createDocument로 등록한 문서 ID
          * @param elements 편집 요소 객체의 배열
+         * @param saveMode 저장 방식 ('incremental'이면 편집한 페이지만 원본 뒤에 덧붙여 저장, 기본값 'full')
          * @returns 편집된 PDF 파일의 Blob
          */
-        editPdf: (file: File, elements: PDFEditElement[]) => Promise<Blob>;
+        editPdf: (file: File | string, elements: PDFEditElement[], saveMode?: 'full' | 'incremental') => Promise<Blob>;
 
         /**
          * PDF 파일을 지정된 페이지들로 분할
-         * @param file PDF 파일
-         * @param pages 페이지 범위 문자열 (예: "1-3,5,7-9")
-         * @returns 분할된 PDF 파일의 Blob
+         * @param file PDF 파일 또는 등록한 문서 ID
+         * @param pages 페이지 범위 문자열 (예: "1-3,5,7-9"). mode가 'ranges'이면 세미콜론으로 구분한 범위 묶음 (예: "1-3;4-10;11-")
+         * @param splitOptions 여러 문서로 나누는 방식 ('every': every 페이지씩, 'ranges': 범위 묶음마다, 'bookmarks': 최상위 책갈피마다)
+         * @returns 분할된 PDF 파일의 Blob (mode가 'pages'가 아니면 PDF들을 묶은 ZIP)
          */
-        splitPdf: (file: File, pages: string) => Promise<Blob>;
+        splitPdf: (
+          file: File | string,
+          pages: string,
+          splitOptions?: { mode?: 'pages' | 'every' | 'ranges' | 'bookmarks'; every?: number }
+        ) => Promise<Blob>;
 
         /**
          * 여러 PDF 파일을 하나로 병합
          * @param files PDF 파일 배열
+         * @param pageRanges 파일마다 병합할 페이지 범위 (파일 순서대로, 예: ["1-3", "all"])
          * @returns 병합된 PDF 파일의 Blob
          */
-        mergePdfs: (files: File[]) => Promise<Blob>;
+        mergePdfs: (files: File[], pageRanges?: string[]) => Promise<Blob>;
 
         /**
          * PDF 페이지 회전
-         * @param file PDF 파일
+         * @param file PDF 파일 또는 등록한 문서 ID
          * @param pages 회전할 페이지 범위 (예: "1-3,5,7-9" 또는 "all")
          * @param angle 회전 각도 (90, 180, 270)
          * @param includeUnspecified 지정하지 않은 페이지 포함 여부
          * @returns 회전된 PDF 파일의 Blob
          */
-        rotatePdf: (file: File, pages: string, angle: number, includeUnspecified: boolean) => Promise<Blob>;
+        rotatePdf: (file: File | string, pages: string, angle: number, includeUnspecified: boolean) => Promise<Blob>;
 
         /**
          * 다른 형식의 파일을 PDF로 변환
          * @param files 변환할 파일들 (TXT, HTML, 또는 이미지)
          * @param sourceFormat 원본 파일 형식 ('txt', 'html', 또는 'image')
+         * @param txtOptions TXT 변환 옵션 (용지 크기, 글자 크기(pt), 여백(pt), 인코딩 - 기본값 'auto'는 자동 감지)
          * @returns 변환된 PDF 파일의 Blob
          */
-        convertToPdf: (files: File[], sourceFormat: 'txt' | 'html' | 'image') => Promise<Blob>;
+        convertToPdf: (
+          files: File[],
+          sourceFormat: 'txt' | 'html' | 'image',
+          txtOptions?: {
+            pageSize?: 'letter' | 'legal' | 'a3' | 'a4' | 'a5';
+            fontSize?: number;
+            margin?: number;
+            encoding?: string;
+          }
+        ) => Promise<Blob>;
 
         /**
          * PDF를 다른 형식으로 변환
@@ -61,9 +99,16 @@ declare global {
          * @param targetFormat 변환할 형식 ('docx' 또는 'image')
          * @param imageFormat 이미지 형식 ('jpg' 또는 'png', targetFormat이 'image'일 때만 사용)
          * @param outputPath (선택) DOCX 변환 시 저장할 경로
+         * @param imageOptions (선택) 이미지 변환 해상도(dpi, 기본 300)와 변환할 페이지 범위 (예: "1-3,5" 또는 "all")
          * @returns 변환된 파일의 Blob
          */
-        convertFromPdf: (file: File, targetFormat: 'docx' | 'image', imageFormat?: 'jpg' | 'png', outputPath?: string) => Promise<Blob>;
+        convertFromPdf: (
+          file: File,
+          targetFormat: 'docx' | 'image',
+          imageFormat?: 'jpg' | 'png',
+          outputPath?: string,
+          imageOptions?: { dpi?: number; pages?: string }
+        ) => Promise<Blob>;
                 
         /**
          * PDF 파일 암호화
@@ -83,12 +128,12 @@ declare global {
         
         /**
          * PDF에 워터마크 추가
-         * @param file 원본 PDF 파일
+         * @param file 원본 PDF 파일 또는 등록한 문서 ID
          * @param options 워터마크 옵션
          * @returns 워터마크가 적용된 PDF 파일의 Blob
          */
         addWatermark: (
-          file: File,
+          file: File | string,
           options: {
             watermarkType: 'text' | 'image';
             watermarkText?: string;
@@ -101,8 +146,89 @@ declare global {
             fontColor?: string;
             fontBold?: boolean;
             pages: string;
+            saveMode?: 'full' | 'incremental'; // 'incremental'이면 워터마크를 적용한 페이지만 원본 뒤에 덧붙여 저장
           }
         ) => Promise<Blob>;
+
+        /**
+         * 여러 작업을 한 번의 요청으로 차례로 적용 (문서는 한 번만 파싱하고 마지막에 한 번만 저장)
+         * @param file PDF 파일 또는 등록한 문서 ID
+         * @param steps 단계 목록. 각 단계는 op('rotate' | 'split' | 'add-watermark' | 'edit' | 'encrypt')와
+         *              해당 엔드포인트의 폼 필드와 같은 옵션 (예: { op: 'rotate', pages: '1-3', angle: 90 }).
+         *              페이지 번호는 이전 단계까지 적용한 문서 기준이며 'encrypt'는 마지막 단계만 가능
+         * @param watermarkImage 이미지 워터마크 단계에서 사용할 이미지
+         * @returns 처리된 PDF 파일의 Blob
+         */
+        runPipeline: (file: File | string, steps: Array<Record<string, any>>, watermarkImage?: File) => Promise<Blob>;
+
+        /**
+         * 여러 PDF 파일에 같은 작업을 일괄 적용
+         * @param operation 작업 이름
+         * @param files PDF 파일들
+         * @param params 해당 단일 파일 엔드포인트와 같은 폼 필드 (예: { pages: 'all', angle: 90, include_unspecified: true })
+         * @param archive PDF 파일들을 묶은 ZIP (files와 함께 사용 가능)
+         * @returns 결과 PDF들과 파일별 처리 결과(manifest.json)를 묶은 ZIP의 Blob
+         */
+        batchPdfs: (
+          operation: 'rotate' | 'add-watermark' | 'encrypt' | 'decrypt',
+          files: File[],
+          params: Record<string, string | number | boolean | File>,
+          archive?: File
+        ) => Promise<Blob>;
+
+        /**
+         * 서버 상태 확인
+         * @returns ready(요청 처리 가능), warm(폰트/변환기/워커 예열 완료) 및 예열 단계별 시간 등
+         */
+        getHealth: () => Promise<{ status: string; ready: boolean; warm: boolean; [key: string]: any }>;
+
+        /**
+         * PDF를 문서로 등록 (이후 작업에 파일 대신 document_id를 넘겨 업로드와 파싱을 생략)
+         * @param file PDF 파일
+         * @returns 등록된 문서 정보 (document_id, 페이지 수 등)
+         */
+        createDocument: (file: File) => Promise<DocumentInfo>;
+
+        /**
+         * 등록된 문서 삭제
+         * @param documentId 문서 ID
+         */
+        deleteDocument: (documentId: string) => Promise<void>;
+
+        /**
+         * 오래 걸리는 작업을 비동기 작업으로 등록
+         * @param operation 작업 이름 ('add-watermark', 'convert-from-pdf' 등 기존 엔드포인트 경로)
+         * @param formData 기존 엔드포인트와 동일한 폼 데이터
+         * @returns 작업 상태 (id 포함)
+         */
+        startJob: (operation: string, formData: FormData) => Promise<JobStatus>;
+
+        /**
+         * 작업 상태 및 페이지 단위 진행률 조회
+         */
+        getJob: (jobId: string) => Promise<JobStatus>;
+
+        /**
+         * 완료된 작업의 결과 파일 다운로드
+         */
+        getJobResult: (jobId: string) => Promise<Blob>;
+
+        /**
+         * 작업 취소 및 결과 삭제
+         */
+        deleteJob: (jobId: string) => Promise<void>;
+
+        /**
+         * 작업을 등록하고 완료될 때까지 폴링한 뒤 결과 파일의 Blob을 반환
+         * @param onProgress 폴링할 때마다 호출되는 진행률 콜백
+         * @param intervalMs 폴링 간격 (기본 1000ms)
+         */
+        runJob: (
+          operation: string,
+          formData: FormData,
+          onProgress?: (status: JobStatus) => void,
+          intervalMs?: number
+        ) => Promise<Blob>;
       };
 
       /**